@@ -0,0 +1,114 @@
+"""Budget envelope balances: live map vs. re-aggregating after each change.
+
+Generates a ten-year ledger with generate.py, gives 40 categories a
+monthly envelope (all three rollover rules), then times:
+
+* load_envelopes, which works out each envelope's carry from
+  monthly_summary;
+* building BudgetBalances from this month's TransactionStore;
+* keeping the balances current through an add, an edit and a delete,
+  with BudgetBalances against summing the month's expenses per category
+  again, from the store's frame and from monthly_summary.
+
+    python benchmarks/bench_budgets.py [rows]
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+ROWS = 1_000_000
+ENVELOPES = 40
+ROUNDS = 200
+
+
+def setup(path, rows):
+    generate.generate(path, 10, rows)
+    bw.configure(path)
+    start = date(date.today().year - 9, 1, 1)
+    with bw.session_scope() as s:
+        ids = [bw.add_category(s, f"Envelope {i}") for i in range(ENVELOPES - len(generate.SPENDING))]
+        ids += [id_ for id_, name in bw.load_categories().items() if name in generate.SPENDING]
+        for i, category_id in enumerate(ids):
+            bw.set_budget(s, category_id, 50_000, bw.ROLLOVERS[i % 3], start)
+
+
+def median_ms(fn, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main(rows):
+    with generate.scratch_dir() as workdir:
+        setup(os.path.join(workdir, "budgetwise.db"), rows)
+        run(rows)
+
+
+def run(rows):
+    start, end = bw.month_bounds(datetime.now())
+    store = bw.TransactionStore(bw.load_transactions_frame(start, end), start, end)
+    print(f"{rows:,} rows, {ENVELOPES} envelopes, {len(store):,} rows this month\n")
+    print(f"{'setup':<30}  {'ms':>9}")
+    print(f"{'load_envelopes':<30}  {median_ms(lambda: bw.load_envelopes(start), 20):>9.2f}")
+    envelopes = bw.load_envelopes(start)
+    print(f"{'BudgetBalances from store':<30}  {median_ms(lambda: bw.BudgetBalances(envelopes, store), 20):>9.2f}\n")
+
+    balances = bw.BudgetBalances(envelopes, store)
+    food = bw.DEFAULT_CATEGORIES.index("Food") + 1  # a new ledger seeds these in order
+
+    def from_frame():
+        df = store.frame()
+        df[df["type"] == "Expense"].groupby("category", observed=True)["amount"].sum()
+
+    def from_summary():
+        bw.load_month_summary(start)
+
+    cases = [("balances map", lambda: balances.statuses()), ("groupby store frame", from_frame),
+             ("monthly_summary query", from_summary)]
+    print(f"{'per change, after the write':<30}  {'ms':>9}")
+    with bw.session_scope() as s:
+        for label, refresh in cases:
+            times = []
+            for _ in range(ROUNDS):
+                tx = bw.Transaction(date=date.today(), type="Expense", category_id=food,
+                                    description="bench", amount=1250)
+                s.add(tx)
+                s.commit()
+                changed = [bw.transaction_row(tx)]
+                tx.amount = 9900
+                s.commit()
+                changed.append(bw.transaction_row(tx))
+                tx_id = tx.id
+                s.delete(tx)
+                s.commit()
+                t0 = time.perf_counter()
+                store.insert(changed[0])
+                balances.insert(changed[0])
+                refresh()
+                store.update(changed[1])
+                balances.update(changed[1])
+                refresh()
+                store.delete(tx_id)
+                balances.delete(tx_id)
+                refresh()
+                times.append((time.perf_counter() - t0) * 1000 / 3)
+            print(f"{label:<30}  {statistics.median(times):>9.3f}")
+        assert not store.check_consistency(s)
+    expenses = store.frame()[store.frame()["type"] == "Expense"]
+    for status in balances.statuses():
+        assert status.spent == int(expenses.loc[expenses["category"] == status.category, "amount"].sum())
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
@@ -0,0 +1,109 @@
+"""Footprint and grouping of type/category as strings vs. integer codes.
+
+Seeds a throwaway ledger, then compares:
+
+* storage: the same rows in a table with a text category column (the
+  schema before migration 6) and with a category_id into categories,
+  after VACUUM;
+* memory: type and category as object columns of Python strings, as
+  frames held them before, and as the Categoricals
+  load_transactions_frame returns now;
+* grouping: per-category totals, an Expense mask and per (type,
+  category) totals on both representations.
+
+    python benchmarks/bench_categories.py [rows]
+"""
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+ROWS = 1_000_000
+ROUNDS = 5
+TEXT_SQL = ("CREATE TABLE transactions (id INTEGER PRIMARY KEY, date DATE NOT NULL, "
+            "type VARCHAR(20) NOT NULL, category VARCHAR(50) NOT NULL, description TEXT, "
+            "amount INTEGER NOT NULL)")
+ID_SQL = ("CREATE TABLE categories (id INTEGER PRIMARY KEY, name VARCHAR(50) NOT NULL UNIQUE);"
+          "CREATE TABLE transactions (id INTEGER PRIMARY KEY, date DATE NOT NULL, "
+          "type VARCHAR(20) NOT NULL, category_id INTEGER NOT NULL REFERENCES categories (id), "
+          "description TEXT, amount INTEGER NOT NULL);"
+          + "".join(f"INSERT INTO categories (name) VALUES ('{name}');" for name in generate.INCOME + generate.EXPENSES))
+
+
+def table_bytes(workdir, name, ddl, insert, rows):
+    path = os.path.join(workdir, f"category-{name}.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(ddl)
+    conn.executemany(insert, rows)
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def best(fn):
+    times = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def main(n):
+    with generate.scratch_dir() as workdir:
+        bw.configure(os.path.join(workdir, "budgetwise.db"))
+        run(workdir, n)
+
+
+def run(workdir, n):
+    rows = generate.spread_rows(n, income_every=10)
+    generate.insert_rows(rows)
+    mb = 1024 * 1024
+
+    print(f"{n:,} rows\n")
+    text = table_bytes(workdir, "text", TEXT_SQL,
+                       "INSERT INTO transactions (date, type, category, description, amount) "
+                       "VALUES (?, ?, ?, ?, ?)", rows)
+    ids = table_bytes(workdir, "id", ID_SQL,
+                      "INSERT INTO transactions (date, type, category_id, description, amount) "
+                      "VALUES (?, ?, (SELECT id FROM categories WHERE name = ?), ?, ?)", rows)
+    print(f"{'storage':<24}  {'text':>10}  {'id':>10}")
+    print(f"{'table file MiB':<24}  {text / mb:>10.1f}  {ids / mb:>10.1f}")
+    print(f"{'bytes per row':<24}  {text / n:>10.1f}  {ids / n:>10.1f}\n")
+
+    t0 = time.perf_counter()
+    coded = bw.load_transactions_frame()
+    load_ms = (time.perf_counter() - t0) * 1000
+    strings = coded.astype({"type": object, "category": object})
+    print(f"load_transactions_frame: {load_ms:,.0f} ms\n")
+
+    def column_mb(frame, column):
+        return frame[column].memory_usage(index=False, deep=True) / mb
+
+    print(f"{'memory MiB':<24}  {'strings':>10}  {'codes':>10}")
+    for column in ("type", "category"):
+        print(f"{column:<24}  {column_mb(strings, column):>10.1f}  {column_mb(coded, column):>10.1f}")
+    print()
+
+    cases = [
+        ("sum by category", lambda df: df.groupby("category", observed=True)["amount"].sum()),
+        ("Expense mask", lambda df: df["type"] == "Expense"),
+        ("expenses by category",
+         lambda df: df[df["type"] == "Expense"].groupby("category", observed=True)["amount"].sum()),
+        ("sum by type, category",
+         lambda df: df.groupby(["type", "category"], observed=True)["amount"].sum()),
+    ]
+    print(f"{'grouping':<24}  {'strings ms':>10}  {'codes ms':>10}")
+    for label, fn in cases:
+        print(f"{label:<24}  {best(lambda fn=fn: fn(strings)):>10.2f}  {best(lambda fn=fn: fn(coded)):>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
@@ -0,0 +1,113 @@
+"""Following another process's writes: change log vs. reloading.
+
+Generates a ten-year ledger with generate.py and loads this month into a
+TransactionStore, as the app does. A second process then adds, edits and
+deletes transactions one at a time; after each commit, times:
+
+* ChangeWatcher.poll when nothing was committed (the app's idle cost);
+* polling and applying the changed rows to the store;
+* reloading this month's rows, and reloading the whole ledger.
+
+    python benchmarks/bench_changes.py [rows]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+ROWS = 1_000_000
+ROUNDS = 50
+
+# Run in a separate process, so the watcher sees a foreign commit: one
+# change per line read from stdin, acknowledged once committed.
+WRITER = """
+import sys
+from datetime import date
+import budgetwise as bw
+bw.configure(sys.argv[1])
+added = []
+for line in sys.stdin:
+    with bw.session_scope() as s:
+        if line.strip() == "edit":
+            s.get(bw.Transaction, added[-1]).amount = 9900
+        elif line.strip() == "delete":
+            s.query(bw.Transaction).filter(bw.Transaction.id == added.pop()).delete()
+        else:
+            tx = bw.Transaction(date=date.today(), type="Expense", category_id=3,
+                                description="bench", amount=1250)
+            s.add(tx)
+            s.flush()
+            added.append(tx.id)
+    print("ok", flush=True)
+"""
+
+
+def median_ms(fn, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main(rows):
+    with generate.scratch_dir() as workdir:
+        run(os.path.join(workdir, "budgetwise.db"), rows)
+
+
+def run(path, rows):
+    generate.generate(path, 10, rows)
+    bw.configure(path)
+    start, end = bw.month_bounds(datetime.now())
+    store = bw.TransactionStore(bw.load_transactions_frame(start, end), start, end)
+    watcher = bw.ChangeWatcher()
+    writer = subprocess.Popen([sys.executable, "-c", WRITER, path], stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE, text=True,
+                              env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+
+    def write(op):
+        writer.stdin.write(op + "\n")
+        writer.stdin.flush()
+        writer.stdout.readline()
+
+    print(f"{rows:,} rows, {len(store):,} rows this month\n")
+    print(f"{'after nothing changed':<30}  {'ms':>9}")
+    print(f"{'poll':<30}  {median_ms(lambda: watcher.poll(start, end), 200):>9.3f}\n")
+
+    times = {"poll and apply": [], "reload month": [], "reload ledger": []}
+    for i in range(ROUNDS):
+        write(("add", "edit", "delete", "add")[i % 4])
+        t0 = time.perf_counter()
+        changes = watcher.poll(start, end)
+        for row in changes.rows:
+            store.update(row)
+        for tx_id in changes.stale(store.ids()):
+            store.delete(tx_id)
+        times["poll and apply"].append((time.perf_counter() - t0) * 1000)
+        if i < 5:
+            t0 = time.perf_counter()
+            bw.TransactionStore(bw.load_transactions_frame(start, end), start, end)
+            times["reload month"].append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            bw.load_transactions_frame()
+            times["reload ledger"].append((time.perf_counter() - t0) * 1000)
+    writer.stdin.close()
+    writer.wait()
+    print(f"{'per foreign commit':<30}  {'ms':>9}")
+    for label, samples in times.items():
+        print(f"{label:<30}  {statistics.median(samples):>9.3f}")
+    with bw.session_scope() as s:
+        assert not store.check_consistency(s)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
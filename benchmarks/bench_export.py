@@ -0,0 +1,55 @@
+"""Peak memory of streaming export as the ledger grows.
+
+Each export runs in a fresh child process so its peak RSS is measured on
+its own; the figure should stay flat as the row count rises.
+
+    python benchmarks/bench_export.py [rows ...]
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def child(fmt, path):
+    import budgetwise as bw
+    bw.configure(path)
+    t0 = time.perf_counter()
+    n = bw.export_transactions(os.path.join(os.path.dirname(path), f"out.{fmt}"))
+    seconds = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{n} {seconds:.2f} {peak_mb:.1f}")
+
+
+def main(sizes):
+    import budgetwise as bw
+    import generate
+    formats = ["csv", "json"]
+    try:
+        import pyarrow  # noqa: F401
+        formats.append("parquet")
+    except ImportError:
+        pass
+    print(f"{'rows':>9}  {'format':>8}  {'seconds':>8}  {'peak RSS MB':>12}")
+    with generate.scratch_dir() as workdir:
+        path = os.path.join(workdir, "budgetwise.db")
+        bw.configure(path)
+        for n in sizes:
+            generate.insert_rows(generate.spread_rows(n), replace=True)
+            for fmt in formats:
+                out = subprocess.run([sys.executable, __file__, "--child", fmt, path],
+                                     capture_output=True, text=True, check=True).stdout.split()
+                print(f"{int(out[0]):>9}  {fmt:>8}  {float(out[1]):>8.2f}  {float(out[2]):>12.1f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main([int(a) for a in sys.argv[1:]] or SIZES)
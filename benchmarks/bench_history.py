@@ -0,0 +1,51 @@
+"""History/trends recompute time on a 10-year ledger (target: < 100 ms).
+
+Seeds a throwaway budgetwise.db, then times what the History tab does on
+every refresh: load the monthly history and compute category trends, the
+spending trend and savings-goal attainment.
+
+    python benchmarks/bench_history.py [rows]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+ROWS = 1_000_000
+ROUNDS = 20
+
+
+def recompute(goal):
+    history = bw.load_monthly_history()
+    return (bw.category_trends(history), bw.spending_trend(history),
+            bw.goal_attainment(history, goal))
+
+
+def main(n):
+    with generate.scratch_dir() as workdir:
+        bw.configure(os.path.join(workdir, "budgetwise.db"))
+        run(n)
+
+
+def run(n):
+    t0 = time.perf_counter()
+    generate.insert_rows(generate.spread_rows(n, income_every=10))
+    print(f"seeded {n:,} rows in {time.perf_counter() - t0:.1f}s")
+    recompute(100_000)  # warm up imports and the connection
+    times = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        trends, _spending, goals = recompute(100_000)
+        times.append((time.perf_counter() - t0) * 1000)
+    print(f"{len(goals)} months, {len(trends):,} (month, category) trend rows")
+    print(f"recompute: median {statistics.median(times):.1f} ms, max {max(times):.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
@@ -0,0 +1,110 @@
+"""Bulk import throughput (target: >= 100k rows/sec).
+
+Writes a synthetic bank-export CSV, imports it into a throwaway
+budgetwise.db, then imports it again to time the all-duplicates path.
+Last, the app's Import Bank Export button imports it once more through
+its TaskRunner, without a display, and the result it reports is checked.
+
+    python benchmarks/bench_import.py [rows]
+"""
+import csv
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import budgetwise as bw  # noqa: E402
+import budgetwise.importer  # noqa: E402,F401  (pandas loads here, not in the first timing)
+
+import generate  # noqa: E402
+
+CATEGORIES = ["Food", "Rent", "Utilities", "Transport", "Entertainment", "Other"]
+
+
+def write_csv(path, n):
+    """Ten years of date-ordered rows, like a concatenated statement export."""
+    start = date(2015, 1, 1)
+    with open(path, "w", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["date", "description", "category", "amount"])
+        for i in range(n):
+            w.writerow([(start + timedelta(days=i * 3650 // n)).isoformat(), f"Merchant {i % 997}",
+                        random.choice(CATEGORIES), f"{-random.uniform(1, 500):.2f}"])
+
+
+def timed_import(path):
+    t0 = time.perf_counter()
+    result = bw.import_transactions(path)
+    return time.perf_counter() - t0, result
+
+
+class HeadlessMaster:
+    """Just enough of a Tk root for TaskRunner: ``after`` calls run from pump()."""
+
+    def __init__(self):
+        self.calls = []
+
+    def after(self, ms, fn, *args):
+        self.calls.append((fn, args))
+        return len(self.calls)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def configure(self, **options):
+        pass
+
+    def pump(self, until):
+        while not until():
+            if self.calls:
+                fn, args = self.calls.pop(0)
+                fn(*args)
+            time.sleep(0.001)
+
+
+class StatusLabel(dict):
+    def configure(self, cnf=None, **options):
+        self.update(cnf or {}, **options)
+
+
+def gui_import(path):
+    """Import through BudgetWiseApp.import_file, as the button does."""
+    from budgetwise import gui
+
+    app = object.__new__(gui.BudgetWiseApp)
+    app.master = HeadlessMaster()
+    app.lbl_status = StatusLabel()
+    app.tasks = bw.TaskRunner(app.master, on_busy=app.set_busy)
+    app.load_current_month = lambda: None  # the month's reload is not part of the import
+    reported = []
+    gui.filedialog.askopenfilename = lambda **options: path
+    gui.messagebox.showinfo = lambda title, message: reported.append(message)
+    t0 = time.perf_counter()
+    app.import_file()
+    app.master.pump(lambda: reported)
+    seconds = time.perf_counter() - t0
+    app.tasks.shutdown()
+    return seconds, reported[0]
+
+
+def main(n):
+    with generate.scratch_dir() as workdir:
+        bw.configure(os.path.join(workdir, "budgetwise.db"))
+        run(os.path.join(workdir, "export.csv"), n)
+
+
+def run(path, n):
+    write_csv(path, n)
+    bw.get_engine()  # create the ledger first, so "fresh" times the import alone
+    for label in ("fresh", "re-import"):
+        seconds, result = timed_import(path)
+        print(f"{label:>10}: {n:,} rows in {seconds:.2f}s = {n / seconds:,.0f} rows/s  {result}")
+    seconds, message = gui_import(path)
+    print(f"{'app':>10}: {n:,} rows in {seconds:.2f}s = {n / seconds:,.0f} rows/s  {message}")
+    assert message.startswith(f"0 added, {n:,} duplicates skipped"), message
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
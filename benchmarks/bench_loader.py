@@ -0,0 +1,59 @@
+"""Startup load time: bulk columnar loader vs. per-row ORM hydration.
+
+    python benchmarks/bench_loader.py [rows ...]
+
+Defaults to 10k, 100k and 1M rows in a throwaway budgetwise.db.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pandas as pd  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def orm_load():
+    """The original load_transactions_df body, kept for comparison."""
+    s = bw.SessionLocal()
+    rows = s.query(bw.Transaction).options(joinedload(bw.Transaction.category)).all()
+    s.close()
+    return pd.DataFrame([
+        {
+            "id": r.id,
+            "date": pd.to_datetime(r.date),
+            "type": r.type,
+            "category": r.category.name,
+            "description": r.description,
+            "amount": r.amount,
+        }
+        for r in rows
+    ])
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    df = fn()
+    return time.perf_counter() - t0, df
+
+
+def main(sizes):
+    print(f"{'rows':>9}  {'ORM s':>8}  {'bulk s':>8}  {'speedup':>8}")
+    with generate.scratch_dir() as workdir:
+        bw.configure(os.path.join(workdir, "budgetwise.db"))
+        for n in sizes:
+            generate.insert_rows(generate.spread_rows(n), replace=True)
+            orm_s, orm_df = timed(orm_load)
+            bulk_s, bulk_df = timed(bw.load_transactions_frame)
+            assert len(orm_df) == len(bulk_df) == n
+            assert orm_df["amount"].sum() == bulk_df["amount"].sum()
+            print(f"{n:>9}  {orm_s:>8.2f}  {bulk_s:>8.2f}  {orm_s / bulk_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
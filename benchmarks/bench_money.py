@@ -0,0 +1,121 @@
+"""Footprint and aggregation of amounts as float dollars vs. int64 cents.
+
+Seeds a throwaway ledger with random two-decimal amounts, then compares:
+
+* storage: the same rows in a table with a REAL amount column (the
+  schema before migration 5) and with INTEGER cents, after VACUUM;
+* memory: the amounts as Python floats, as ORM rows carried them, and
+  as the int64 column load_transactions_frame returns;
+* aggregation: a grand total, a running balance and per (month,
+  category) totals in float64 dollars and in int64 cents, with the
+  float results' error against the exact integer ones.
+
+    python benchmarks/bench_money.py [rows]
+"""
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np  # noqa: E402
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+ROWS = 1_000_000
+ROUNDS = 5
+TABLE_SQL = ("CREATE TABLE transactions (id INTEGER PRIMARY KEY, date DATE NOT NULL, "
+             "type VARCHAR(20) NOT NULL, category VARCHAR(50) NOT NULL, description TEXT, "
+             "amount {} NOT NULL)")
+
+
+def table_bytes(workdir, column_type, rows, to_value):
+    path = os.path.join(workdir, f"amount-{column_type.lower()}.db")
+    conn = sqlite3.connect(path)
+    conn.execute(TABLE_SQL.format(column_type))
+    conn.executemany("INSERT INTO transactions (date, type, category, description, amount) "
+                     "VALUES (?, ?, ?, ?, ?)", ((*r[:4], to_value(r[4])) for r in rows))
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def allocated(build):
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def best(fn):
+    times = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000, result
+
+
+def main(n):
+    with generate.scratch_dir() as workdir:
+        bw.configure(os.path.join(workdir, "budgetwise.db"))
+        run(workdir, n)
+
+
+def run(workdir, n):
+    rows = generate.spread_rows(n, min_amount=1)
+    generate.insert_rows(rows)
+    frame = bw.load_transactions_frame()
+    cents = frame["amount"].to_numpy()
+    dollars = cents / 100
+    mb = 1024 * 1024
+
+    print(f"{n:,} rows\n")
+    real = table_bytes(workdir, "REAL", rows, lambda c: c / 100)
+    integer = table_bytes(workdir, "INTEGER", rows, lambda c: c)
+    print(f"{'storage':<24}  {'REAL $':>10}  {'INTEGER ¢':>10}")
+    print(f"{'table file MiB':<24}  {real / mb:>10.1f}  {integer / mb:>10.1f}")
+    print(f"{'bytes per row':<24}  {real / n:>10.1f}  {integer / n:>10.1f}\n")
+
+    as_floats = allocated(lambda: [float(v) for v in dollars.tolist()])
+    as_array = allocated(lambda: cents.copy())
+    print(f"{'memory for amounts':<24}  {'MiB':>10}")
+    print(f"{'Python floats':<24}  {as_floats / mb:>10.1f}")
+    print(f"{'int64 cents':<24}  {as_array / mb:>10.1f}\n")
+
+    months = frame["date"].to_numpy().astype("datetime64[M]").astype(np.int64)
+    codes = frame["category"].cat.codes.to_numpy()
+    cells = (months - months.min()) * len(generate.EXPENSES) + codes
+    size = int(cells.max()) + 1
+
+    def float_cells():
+        return np.bincount(cells, weights=dollars, minlength=size)
+
+    def int_cells():
+        sums = np.zeros(size, dtype=np.int64)
+        np.add.at(sums, cells, cents)
+        return sums
+
+    cases = [
+        ("grand total", lambda: dollars.sum(), lambda: cents.sum()),
+        ("python sum()", lambda: sum(dollars.tolist()), lambda: sum(cents.tolist())),
+        ("running balance", lambda: np.cumsum(dollars), lambda: np.cumsum(cents)),
+        ("month x category", float_cells, int_cells),
+    ]
+    print(f"{'aggregation':<24}  {'float ms':>10}  {'int ms':>10}  {'float error ¢':>14}")
+    for label, with_floats, with_ints in cases:
+        float_ms, approx = best(with_floats)
+        int_ms, exact = best(with_ints)
+        error = np.max(np.abs(np.asarray(approx) * 100 - np.asarray(exact)))
+        print(f"{label:<24}  {float_ms:>10.2f}  {int_ms:>10.2f}  {error:>14.6f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
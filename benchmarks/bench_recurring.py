@@ -0,0 +1,112 @@
+"""Catch-up of recurring rules after years with the app closed.
+
+Creates 50 rules starting ten years ago (daily, weekly, fortnightly,
+monthly and yearly) in a throwaway ledger, then times:
+
+* computing every occurrence with recurring.occurrences against walking
+  the calendar a day at a time and testing each day against the rule;
+* run_due_rules writing the ten years in one transaction;
+* a second run with nothing due;
+* a replay with every rule's next_due reset to its start, where every
+  occurrence is already in the ledger and the unique recurrence_key
+  turns each insert into a no-op.
+
+    python benchmarks/bench_recurring.py [years]
+"""
+import calendar
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+YEARS = 10
+# (frequency, interval, rules)
+MIX = [("Daily", 1, 5), ("Weekly", 1, 10), ("Weekly", 2, 10), ("Monthly", 1, 20), ("Yearly", 1, 5)]
+FOOD = bw.DEFAULT_CATEGORIES.index("Food") + 1  # a new ledger seeds these in order
+
+
+def rules(years, today):
+    start = today - timedelta(days=365 * years)
+    out = []
+    for frequency, interval, count in MIX:
+        for i in range(count):
+            out.append((start + timedelta(days=i * 3), frequency, interval))
+    return out
+
+
+def falls_on(day, start, frequency, interval):
+    """Day-by-day test of whether a rule falls on ``day``."""
+    if frequency in ("Daily", "Weekly"):
+        return (day - start).days % (interval * (7 if frequency == "Weekly" else 1)) == 0
+    months = (day.year - start.year) * 12 + day.month - start.month
+    step = interval * (12 if frequency == "Yearly" else 1)
+    last = calendar.monthrange(day.year, day.month)[1]
+    return months % step == 0 and day.day == min(start.day, last)
+
+
+def day_by_day(schedule, today):
+    count = 0
+    for start, frequency, interval in schedule:
+        day = start
+        while day <= today:
+            count += falls_on(day, start, frequency, interval)
+            day += timedelta(days=1)
+    return count
+
+
+def arithmetic(schedule, today):
+    return sum(len(bw.occurrences(frequency, interval, start, start, today))
+               for start, frequency, interval in schedule)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - t0) * 1000, result
+
+
+def main(years):
+    with generate.scratch_dir() as workdir:
+        bw.configure(os.path.join(workdir, "budgetwise.db"))
+        run(years)
+
+
+def run(years):
+    today = date.today()
+    schedule = rules(years, today)
+    with bw.session_scope() as s:
+        for start, frequency, interval in schedule:
+            bw.add_rule(s, start, "Expense", FOOD, f"{frequency} every {interval}", 999,
+                        frequency, interval)
+
+    print(f"{len(schedule)} rules over {years} years\n")
+    slow_ms, slow = timed(day_by_day, schedule, today)
+    fast_ms, fast = timed(arithmetic, schedule, today)
+    assert slow == fast, (slow, fast)
+    print(f"{'occurrences':<28}  {'ms':>9}  {'rows':>8}")
+    print(f"{'day by day':<28}  {slow_ms:>9.1f}  {slow:>8,}")
+    print(f"{'by index':<28}  {fast_ms:>9.1f}  {fast:>8,}\n")
+
+    print(f"{'run_due_rules':<28}  {'ms':>9}  {'inserted':>8}")
+    ms, result = timed(bw.run_due_rules, today)
+    print(f"{'catch-up':<28}  {ms:>9.1f}  {result.inserted:>8,}")
+    ms, result = timed(bw.run_due_rules, today)
+    print(f"{'nothing due':<28}  {ms:>9.1f}  {result.inserted:>8,}")
+    with bw.get_engine().begin() as conn:
+        conn.exec_driver_sql("UPDATE recurring_rules SET next_due = start")
+    ms, result = timed(bw.run_due_rules, today)
+    print(f"{'replay, all present':<28}  {ms:>9.1f}  {result.inserted:>8,}")
+
+    store = bw.TransactionStore(bw.load_transactions_frame())
+    with bw.session_scope() as s:
+        assert not store.check_consistency(s)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else YEARS)
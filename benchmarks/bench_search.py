@@ -0,0 +1,83 @@
+"""Search latency over a large ledger (target: milliseconds).
+
+Seeds a throwaway budgetwise.db with synthetic merchant descriptions,
+then times text, facet and combined queries: the first page alone, the
+first page with its capped match count (what the Search tab shows), an
+exact count, and page 50.
+
+    python benchmarks/bench_search.py [rows]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+ROWS = 1_000_000
+ROUNDS = 20
+MERCHANTS = ["Starbucks", "Walmart", "Amazon", "Shell", "Netflix", "Uber", "Target", "Costco",
+             "Spotify", "Chipotle", "Safeway", "Lyft", "Airbnb", "Delta", "Apple", "Whole Foods"]
+WORDS = ["store", "online", "purchase", "card", "payment", "refund", "monthly", "fee",
+         "transfer", "downtown", "market", "express", "order", "subscription", "fuel"]
+
+QUERIES = [
+    ("rare word", dict(text="zanzibar")),
+    ("merchant", dict(text="netflix")),
+    ("merchant prefix", dict(text="chipo")),
+    ("two words", dict(text="whole foods market")),
+    ("common word", dict(text="purchase")),
+    ("word + facets", dict(text="uber", categories=["Transport"], min_amount=2_000, max_amount=8_000)),
+    ("word + year", dict(text="amazon", start=date(2020, 1, 1), end=date(2021, 1, 1))),
+    ("facets only", dict(types=["Expense"], categories=["Food"], min_amount=10_000)),
+    ("date range", dict(start=date(2019, 3, 1), end=date(2019, 4, 1))),
+    ("everything", dict()),
+]
+
+
+def description(i):
+    if i % 100_000 == 0:
+        return "zanzibar trip deposit"
+    return f"{random.choice(MERCHANTS)} {random.choice(WORDS)} #{random.randint(1000, 9999)}"
+
+
+def timed(fn):
+    times = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), result
+
+
+def main(n):
+    with generate.scratch_dir() as workdir:
+        bw.configure(os.path.join(workdir, "budgetwise.db"))
+        run(n)
+
+
+def run(n):
+    t0 = time.perf_counter()
+    generate.insert_rows(generate.spread_rows(n, describe=description))
+    print(f"seeded {n:,} rows in {time.perf_counter() - t0:.1f}s")
+    print(f"{'query':<16}  {'matches':>9}  {'page ms':>8}  {'page+count ms':>13}  "
+          f"{'exact count ms':>14}  {'page 50 ms':>10}")
+    for label, filters in QUERIES:
+        page_ms, _ = timed(lambda filters=filters: bw.search_transactions(**filters, count_limit=0))
+        count_ms, _ = timed(lambda filters=filters: bw.search_transactions(**filters))
+        exact_ms, exact = timed(lambda filters=filters: bw.search_transactions(**filters, limit=1,
+                                                                               count_limit=None))
+        deep_ms, _ = timed(lambda filters=filters: bw.search_transactions(**filters, offset=50 * 200,
+                                                                          count_limit=0))
+        print(f"{label:<16}  {exact.total:>9,}  {page_ms:>8.2f}  {count_ms:>13.2f}  "
+              f"{exact_ms:>14.2f}  {deep_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
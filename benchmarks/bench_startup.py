@@ -0,0 +1,58 @@
+"""Import time of the core library vs. the full desktop client.
+
+Each case runs in a fresh interpreter so nothing is cached between them.
+``budgetwise.gui`` pulls in everything the old single-module app imported
+at startup (Tk, matplotlib, pandas, an open and migrated database), so it
+is the before figure for scripts that only need the ledger.
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RUNS = 7
+HEAVY = ("sqlalchemy", "pandas", "matplotlib", "tkinter")
+
+CASES = [
+    ("import budgetwise", "import budgetwise"),
+    ("open database", "import budgetwise; budgetwise.get_engine()"),
+    ("export module", "import budgetwise.export"),
+    ("ledger + pandas", "import budgetwise.ledger"),
+    ("desktop client", "import budgetwise.gui; budgetwise.get_engine()"),
+]
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t0
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(code, workdir):
+    env = dict(os.environ, PYTHONPATH=ROOT, BUDGETWISE_DB=os.path.join(workdir, "budgetwise.db"),
+               MPLBACKEND="Agg")
+    out = subprocess.run([sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY)],
+                         capture_output=True, text=True, check=True, env=env, cwd=workdir).stdout
+    seconds, _, loaded = out.strip().partition(" ")
+    return float(seconds), loaded or "-"
+
+
+def main(runs):
+    print(f"{'case':<16}  {'median ms':>9}  loaded")
+    with tempfile.TemporaryDirectory(prefix="budgetwise-bench-") as workdir:
+        for label, code in CASES:
+            times = []
+            for _ in range(runs):
+                seconds, loaded = measure(code, workdir)
+                times.append(seconds)
+            print(f"{label:<16}  {statistics.median(times) * 1000:>9.1f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
@@ -0,0 +1,86 @@
+"""Mutation latency: incremental TransactionStore vs. full reload.
+
+Seeds a throwaway budgetwise.db with N rows, then times add/edit/delete
+round-trips (SQLite commit + in-memory update). Run from the repo root:
+
+    python benchmarks/bench_store.py
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+ROUNDS = 50
+RELOAD_MAX = 10_000  # the old path is too slow to time beyond this
+FOOD = bw.DEFAULT_CATEGORIES.index("Food") + 1  # a new ledger seeds these in order
+SEEDED = ["Food", "Rent", "Transport"]
+
+
+def mutate(s, apply):
+    """One add, one edit and one delete, each followed by ``apply``."""
+    tx = bw.Transaction(date=date.today(), type="Expense", category_id=FOOD,
+                        description="bench", amount=1250)
+    s.add(tx)
+    s.commit()
+    apply("insert", tx)
+    tx.amount = 9900
+    s.commit()
+    apply("update", tx)
+    tx_id = tx.id
+    s.delete(tx)
+    s.commit()
+    apply("delete", tx_id)
+
+
+def run(n):
+    generate.insert_rows(generate.spread_rows(n, SEEDED), replace=True)
+    store = bw.TransactionStore(bw.load_transactions_frame())
+
+    def incremental(op, arg):
+        if op == "delete":
+            store.delete(arg)
+        else:
+            getattr(store, op)(bw.transaction_row(arg))
+
+    def reload(op, arg):
+        bw.load_transactions_frame()
+
+    results = {}
+    for name, apply in (("incremental", incremental), ("full reload", reload)):
+        if name == "full reload" and n > RELOAD_MAX:
+            continue
+        s = bw.SessionLocal()
+        times = []
+        for _ in range(ROUNDS if name == "incremental" else 5):
+            t0 = time.perf_counter()
+            mutate(s, apply)
+            times.append((time.perf_counter() - t0) * 1000 / 3)
+        s.close()
+        results[name] = statistics.median(times)
+
+    s = bw.SessionLocal()
+    problems = store.check_consistency(s)
+    s.close()
+    assert not problems, problems
+    return results
+
+
+def main():
+    print(f"{'rows':>8}  {'incremental ms/op':>18}  {'full reload ms/op':>18}")
+    with generate.scratch_dir() as workdir:
+        bw.configure(os.path.join(workdir, "budgetwise.db"))
+        for n in SIZES:
+            r = run(n)
+            reload_ms = f"{r['full reload']:.2f}" if "full reload" in r else "-"
+            print(f"{n:>8}  {r['incremental']:>18.2f}  {reload_ms:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Commit latency with SQLite's stock settings vs. the tuned connection.
+
+"before" opens the database with SQLite's defaults (rollback journal,
+synchronous=FULL, no mmap, 2 MiB cache); "after" uses SQLITE_DEFAULTS
+(WAL, synchronous=NORMAL, mmap, 64 MiB cache). Each case commits single
+rows, then batches, through session_scope on a fresh database file.
+
+    python benchmarks/bench_writes.py [commits]
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+COMMITS = 300
+BATCH = 100
+CONFIGS = [
+    ("before", dict(journal_mode="delete", synchronous="full", mmap_size=0,
+                    cache_size=-2_000, cached_statements=128)),
+    ("after", {}),
+]
+FOOD = bw.DEFAULT_CATEGORIES.index("Food") + 1  # a new ledger seeds these in order
+
+
+def rows(n, offset):
+    start = date(2020, 1, 1)
+    return [bw.Transaction(date=start + timedelta(days=(offset + i) % 3650), type="Expense",
+                           category_id=FOOD, description=f"row {offset + i}", amount=1250)
+            for i in range(n)]
+
+
+def commit_times(commits, per_commit):
+    times = []
+    for c in range(commits):
+        batch = rows(per_commit, c * per_commit)
+        t0 = time.perf_counter()
+        with bw.session_scope() as s:
+            s.add_all(batch)
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def main(commits):
+    print(f"{'config':>7}  {'rows/commit':>11}  {'median ms':>9}  {'p95 ms':>7}  {'rows/s':>9}")
+    with generate.scratch_dir() as workdir:
+        for label, options in CONFIGS:
+            bw.configure(os.path.join(workdir, f"{label}.db"), **options)
+            bw.get_engine()
+            for per_commit, n in ((1, commits), (BATCH, max(commits // 10, 5))):
+                times = commit_times(n, per_commit)
+                p95 = sorted(times)[int(len(times) * 0.95) - 1]
+                rate = per_commit * n / (sum(times) / 1000)
+                print(f"{label:>7}  {per_commit:>11}  {statistics.median(times):>9.2f}  {p95:>7.2f}  "
+                      f"{rate:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else COMMITS)
@@ -0,0 +1,172 @@
+"""Synthetic ledger generator for benchmarks.
+
+Fills a budgetwise.db with ``years`` of transactions up to today, across
+the default categories: a salary on the 1st and 15th, rent, utilities
+and a savings transfer every month, a scholarship each January and
+August, and day-to-day food, transport, entertainment and other
+spending with log-normal amounts and merchant descriptions. The fixed
+rows come first; day-to-day spending makes up the rest of ``rows``, or
+about three purchases a day when ``rows`` is not given.
+
+The same seed gives the same ledger. Rows go in through the bulk path
+(triggers suspended), then monthly_summary and the search index are
+rebuilt once.
+
+    python benchmarks/generate.py budgetwise.db --years 10 --rows 100000
+
+Benches that need an exact row count over a plain ledger instead seed it
+with ``spread_rows`` and ``insert_rows``, in a ``scratch_dir``.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np  # noqa: E402
+
+import budgetwise as bw  # noqa: E402
+
+PURCHASES_PER_DAY = 3
+EXPENSES = ["Food", "Rent", "Utilities", "Transport", "Entertainment", "Other"]
+INCOME = ["Salary", "Scholarship"]
+# category: (share of day-to-day purchases, median dollars, log-normal sigma, merchants)
+SPENDING = {
+    "Food": (0.55, 18, 0.8, ["Safeway groceries", "Trader Joe's", "Whole Foods Market", "Chipotle",
+                             "Starbucks coffee", "Blue Bottle coffee", "Pizza Hut", "Farmers market",
+                             "Thai Basil takeout", "Corner deli lunch"]),
+    "Transport": (0.2, 12, 0.6, ["Uber trip", "Lyft ride", "Shell gas station", "Chevron fuel",
+                                 "Metro card top-up", "City parking", "Amtrak ticket"]),
+    "Entertainment": (0.15, 25, 0.7, ["Netflix subscription", "Spotify premium", "AMC movie tickets",
+                                      "Steam games", "Concert tickets", "Bowling night", "Book store"]),
+    "Other": (0.1, 30, 1.0, ["Amazon order", "Target", "Pharmacy", "Hardware store", "Post office",
+                             "Dry cleaning", "Gift shop"]),
+}
+
+
+def fixed_rows(months, rng):
+    """Salary, rent, utilities, savings and scholarship rows for ``months``."""
+    rows = []
+    for i, month in enumerate(months):
+        first = month.astype("datetime64[D]")
+        raise_pct = 1 + 0.03 * (i // 12)  # a raise every year
+        rows.append((first, "Income", "Salary", "Payroll deposit", round(240_000 * raise_pct)))
+        rows.append((first + 14, "Income", "Salary", "Payroll deposit", round(240_000 * raise_pct)))
+        rows.append((first, "Expense", "Rent", "Monthly rent", round(150_000 * raise_pct)))
+        winter = month.astype(object).month in (12, 1, 2)
+        rows.append((first + 9, "Expense", "Utilities", "Electric & water bill",
+                     int(rng.normal(16_000 if winter else 11_000, 1_500))))
+        rows.append((first + 20, "Expense", "Savings", "Transfer to savings", 50_000))
+        if month.astype(object).month in (1, 8):
+            rows.append((first + 4, "Income", "Scholarship", "Scholarship disbursement", 300_000))
+    return rows
+
+
+def purchases(count, start, end, rng):
+    """``count`` day-to-day purchases between ``start`` and ``end``, as column arrays."""
+    names = list(SPENDING)
+    shares = np.array([SPENDING[name][0] for name in names])
+    days = np.sort(rng.integers(0, (end - start).astype(np.int64) + 1, count))
+    picks = rng.choice(len(names), count, p=shares / shares.sum())
+    amounts = np.empty(count, dtype=np.int64)
+    descriptions = np.empty(count, dtype=object)
+    for i, name in enumerate(names):
+        _, median, sigma, merchants = SPENDING[name]
+        mask = picks == i
+        amounts[mask] = np.maximum(100, np.rint(rng.lognormal(np.log(median * 100), sigma, mask.sum())))
+        descriptions[mask] = np.array(merchants, dtype=object)[rng.integers(0, len(merchants), mask.sum())]
+    return start + days, np.array(names, dtype=object)[picks], descriptions, amounts
+
+
+def generate(path, years=10, rows=None, seed=0, today=None):
+    """Create the ledger at ``path`` and return the number of rows written."""
+    if os.path.exists(path):
+        raise ValueError(f"{path} already exists")
+    rng = np.random.default_rng(seed)
+    end = np.datetime64(today or date.today(), "D")
+    start = (end.astype("datetime64[M]") - 12 * years + 1).astype("datetime64[D]")
+    months = np.arange(start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1)
+    fixed = [row for row in fixed_rows(months, rng) if row[0] <= end]
+    if rows is None:
+        rows = len(fixed) + PURCHASES_PER_DAY * int((end - start).astype(np.int64) + 1)
+    if rows < len(fixed):
+        raise ValueError(f"{years} years need at least {len(fixed):,} rows")
+    days, categories, descriptions, amounts = purchases(rows - len(fixed), start, end, rng)
+
+    bw.configure(path)
+    params = [(str(day), *rest) for day, *rest in fixed]
+    params += zip(days.astype(str).tolist(), ["Expense"] * len(days), categories.tolist(),
+                  descriptions.tolist(), amounts.tolist())
+    params.sort()  # date order, as a ledger fills up over time
+    insert_rows(params)
+    with bw.session_scope() as s:
+        bw.upsert_setting(s, "monthly_savings_goal", "500")
+    return len(params)
+
+
+def spread_rows(n, expenses=EXPENSES, income_every=None, describe="row {}".format, min_amount=100, seed=0):
+    """``n`` (date, type, category, description, amount) rows spread evenly
+    over ten years from 2015, with uniformly random categories and amounts.
+    Every ``income_every``-th row is income, eight times larger."""
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    rows = []
+    for i in range(n):
+        if income_every and i % income_every == 0:
+            type_, category, scale = "Income", rng.choice(INCOME), 8
+        else:
+            type_, category, scale = "Expense", rng.choice(expenses), 1
+        rows.append(((start + timedelta(days=i * 3650 // n)).isoformat(), type_, category, describe(i),
+                     rng.randint(min_amount, 50_000) * scale))
+    return rows
+
+
+def insert_rows(rows, replace=False):
+    """Bulk-insert (date, type, category, description, amount) rows into the
+    configured ledger, first deleting its transactions if ``replace``, then
+    rebuild monthly_summary and the search index once."""
+    ids = {name: id_ for id_, name in bw.load_categories().items()}
+    with bw.get_engine().begin() as conn:
+        raw = conn.connection.driver_connection
+        if replace:
+            raw.execute("DELETE FROM transactions")
+        raw.execute("INSERT INTO bulk_load_guard (id) VALUES (1)")
+        raw.executemany("INSERT INTO transactions (date, type, category_id, description, amount) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        ((day, type_, ids[category], description, amount)
+                         for day, type_, category, description, amount in rows))
+        raw.execute("DELETE FROM bulk_load_guard")
+    bw.rebuild_monthly_summary()
+    bw.rebuild_search_index()
+
+
+@contextmanager
+def scratch_dir():
+    """A temporary directory for bench ledgers, removed on exit."""
+    with tempfile.TemporaryDirectory(prefix="budgetwise-bench-") as workdir:
+        try:
+            yield workdir
+        finally:
+            bw.configure()  # close the engine's connections before the files go
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("path")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--rows", type=int, help="default: about three purchases a day")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        count = generate(args.path, args.years, args.rows, args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{count:,} transactions over {args.years} years written to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Reproducible benchmark suite with a checked-in baseline.
+
+For each ledger size, a ledger is made with generate.py (10 years, fixed
+seed) and these are timed, each the median of ``--repeat`` runs:
+
+``cold_start``
+    a fresh interpreter from the first import to a drawn dashboard;
+``load_all``, ``load_month``
+    load_transactions_frame for the whole ledger and for this month;
+``refresh``
+    a dashboard refresh with nothing changed;
+``add``, ``edit``, ``delete``
+    one transaction committed and applied to the month's TransactionStore;
+``chart``
+    drawing the dashboard chart and the History charts from scratch.
+
+With a display (use ``xvfb.sh`` on a headless box) the app itself runs
+in a withdrawn Tk root, so refresh and chart go through the widgets.
+Without one, or with ``--data``, the same steps run without Tk: the
+queries and analytics behind a refresh, and the same charts on an Agg
+canvas. benchmarks/baseline.json keeps a baseline per mode, and a run
+is compared with its own mode's; until a mode has one, only the timings
+that do the same work in both modes (SHARED) are checked, against the
+other mode's.
+
+``--check`` compares the run with its baseline and exits with status 1
+if any timing is slower than its threshold allows: more than
+``relative`` above the baseline *and* more than ``min_ms`` slower, so
+that sub-millisecond noise never fails a run. ``--save-baseline``
+records the run as its mode's new baseline, keeping the other mode's
+and the thresholds. Baselines only mean something on the machine they
+were recorded on.
+
+    python benchmarks/suite.py --sizes 10000 100000 --check
+    benchmarks/xvfb.sh --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from datetime import date, datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import budgetwise as bw  # noqa: E402
+
+import generate  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+YEARS = 10
+SEED = 0
+REPEAT = 5
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+THRESHOLDS = {
+    "default": {"relative": 0.25, "min_ms": 5.0},
+    "cold_start": {"relative": 0.5, "min_ms": 50.0},  # a whole interpreter: noisy
+}
+MODES = ("data", "gui")
+SHARED = ("load_all", "load_month", "add", "edit", "delete")  # no Tk in either mode
+
+PROBES = {
+    "gui": """
+import time
+t0 = time.perf_counter()
+import tkinter as tk
+from budgetwise.gui import BudgetWiseApp
+root = tk.Tk()
+root.withdraw()
+app = BudgetWiseApp(root)
+while app.refresh_started is not None or app.lbl_status["text"]:  # the month loads, then draws
+    root.update()
+root.update_idletasks()
+print(time.perf_counter() - t0)
+app.close()
+""",
+    "data": """
+import time
+t0 = time.perf_counter()
+from datetime import datetime
+import budgetwise as bw
+start, end = bw.month_bounds(datetime.now())
+bw.TransactionStore(bw.load_transactions_frame(start, end), start, end)
+bw.month_totals(bw.load_month_summary(start), bw.load_settings()["monthly_savings_goal"])
+bw.load_monthly_history()
+print(time.perf_counter() - t0)
+""",
+}
+
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def has_display():
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+    except Exception:
+        return False
+    return True
+
+
+def ledger(rows, data_dir):
+    """Path of a generated ledger with ``rows`` rows, made on first use.
+
+    Cached ledgers are keyed by month, since this month's rows are part
+    of what is timed.
+    """
+    path = os.path.join(data_dir, f"ledger-{rows}-seed{SEED}-{date.today():%Y-%m}.db")
+    if not os.path.exists(path):
+        print(f"generating {rows:,} rows...", file=sys.stderr)
+        generate.generate(path, YEARS, rows, SEED)
+    return path
+
+
+def cold_start(path, mode, repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT, BUDGETWISE_DB=path)
+    if mode == "data":
+        env["MPLBACKEND"] = "Agg"
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBES[mode]], capture_output=True, text=True,
+                             check=True, env=env, cwd=os.path.dirname(path)).stdout
+        times.append(float(out.split()[-1]) * 1000)
+    return statistics.median(times)
+
+
+def writes(repeat):
+    """Median ms of an add, an edit and a delete, each with its store update."""
+    start, end = bw.month_bounds(datetime.now())
+    store = bw.TransactionStore(bw.load_transactions_frame(start, end), start, end)
+    food = bw.DEFAULT_CATEGORIES.index("Food") + 1  # a new ledger seeds these in order
+    times = {"add": [], "edit": [], "delete": []}
+    with bw.session_scope() as s:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            tx = bw.Transaction(date=date.today(), type="Expense", category_id=food,
+                                description="bench", amount=1250)
+            s.add(tx)
+            s.commit()
+            store.insert(bw.transaction_row(tx))
+            t1 = time.perf_counter()
+            tx.amount = 9900
+            s.commit()
+            store.update(bw.transaction_row(tx))
+            t2 = time.perf_counter()
+            tx_id = tx.id
+            s.delete(tx)
+            s.commit()
+            store.delete(tx_id)
+            t3 = time.perf_counter()
+            for name, ms in zip(times, ((t1 - t0), (t2 - t1), (t3 - t2))):
+                times[name].append(ms * 1000)
+        assert not store.check_consistency(s)
+    return {name: statistics.median(ms) for name, ms in times.items()}
+
+
+def data_refresh():
+    """What a dashboard refresh loads and computes, without the widgets."""
+    start, _ = bw.month_bounds(datetime.now())
+    summary = bw.load_month_summary(start)
+    bw.month_totals(summary, bw.load_settings()["monthly_savings_goal"])
+    history = bw.load_monthly_history()
+    bw.category_trends(history)
+    return summary, history
+
+
+def data_chart(summary, history, goal):
+    """The dashboard and History charts, drawn on an Agg canvas."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 8))
+    FigureCanvasAgg(fig)
+    bars_ax, spend_ax, goal_ax = fig.subplots(3, 1)
+    labels, values = bw.category_spending(summary)
+    bars_ax.bar(labels, [v / 100 for v in values])
+    spending = bw.spending_trend(history) / 100
+    for column in spending.columns:
+        spend_ax.plot(spending.index, spending[column], label=column)
+    spend_ax.legend(fontsize=8)
+    goals = bw.goal_attainment(history, goal)
+    goal_ax.bar(goals.index, goals["net"] / 100, width=20)
+    goal_ax.axhline(goal / 100, linestyle="--", linewidth=1)
+    fig.tight_layout()
+    fig.canvas.draw()
+
+
+def run_data(repeat):
+    results = {"load_all": median_ms(bw.load_transactions_frame, repeat)}
+    start, end = bw.month_bounds(datetime.now())
+    results["load_month"] = median_ms(lambda: bw.load_transactions_frame(start, end), repeat)
+    results["refresh"] = median_ms(data_refresh, repeat)
+    summary, history = data_refresh()
+    goal = bw.load_settings()["monthly_savings_goal"]
+    results["chart"] = median_ms(lambda: data_chart(summary, history, goal), repeat)
+    results.update(writes(repeat))
+    return results
+
+
+def run_gui(repeat):
+    import tkinter as tk
+    from budgetwise.gui import BudgetWiseApp
+
+    root = tk.Tk()
+    root.withdraw()
+    app = BudgetWiseApp(root)
+
+    def settle():
+        """Pump events until the refresh is drawn and no task is in flight."""
+        while app.refresh_started is not None or app.lbl_status["text"]:
+            root.update()
+        root.update_idletasks()
+
+    def refresh():
+        app.refresh_dashboard()
+        settle()
+
+    def chart():
+        app.chart_key = None
+        app.chart_state.clear()
+        app.draw_chart()
+        app.draw_history()
+        root.update_idletasks()  # the canvases draw when idle
+
+    try:
+        settle()
+        results = {"load_all": median_ms(app.load_transactions_df, repeat)}
+        start, end = app.store.start, app.store.end
+        results["load_month"] = median_ms(lambda: app.load_transactions_df(start, end), repeat)
+        results["refresh"] = median_ms(refresh, repeat)
+        results["chart"] = median_ms(chart, repeat)
+        results.update(writes(repeat))
+    finally:
+        app.close()
+    return results
+
+
+def run(sizes, mode, repeat, data_dir):
+    results = {}
+    for rows in sizes:
+        path = ledger(rows, data_dir)
+        bw.configure(path)
+        timings = {"cold_start": cold_start(path, mode, repeat)}
+        timings.update(run_gui(repeat) if mode == "gui" else run_data(repeat))
+        results[str(rows)] = {name: round(ms, 3) for name, ms in timings.items()}
+        print(f"{rows:>9,}  " + "  ".join(f"{name} {ms:,.1f}" for name, ms in results[str(rows)].items()),
+              file=sys.stderr)
+    return results
+
+
+def check(run, baseline, thresholds):
+    """Lines describing each timing slower than the baseline allows."""
+    thresholds = dict(THRESHOLDS, **thresholds)
+    failures = []
+    for rows, timings in run["results"].items():
+        for name, ms in timings.items():
+            base = baseline["results"].get(rows, {}).get(name)
+            if base is None:
+                continue
+            limit = dict(thresholds["default"], **thresholds.get(name, {}))
+            if ms > base * (1 + limit["relative"]) and ms - base > limit["min_ms"]:
+                failures.append(f"{rows:>9} {name:<12} {ms:10.1f} ms  baseline {base:10.1f} ms  "
+                                f"(+{(ms / base - 1) * 100:.0f}%)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, metavar="ROWS")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--data", action="store_true", help="run without Tk even with a display")
+    parser.add_argument("--data-dir", help="keep generated ledgers here between runs")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--check", action="store_true", help="exit 1 on a regression against the baseline")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    mode = "data" if args.data or not has_display() else "gui"
+    with ExitStack() as scratch:
+        data_dir = args.data_dir or scratch.enter_context(generate.scratch_dir())
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"{mode} mode, ledgers in {data_dir}", file=sys.stderr)
+        results = run(args.sizes, mode, args.repeat, data_dir)
+    result = {
+        "mode": mode,
+        "repeat": args.repeat,
+        "seed": SEED,
+        "years": YEARS,
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "recorded": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baselines = json.load(f)
+    if args.save_baseline:
+        baselines = {"thresholds": baselines.get("thresholds", THRESHOLDS),
+                     **{m: baselines[m] for m in MODES if m in baselines}, mode: result}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+        print(f"{mode} baseline saved to {args.baseline}", file=sys.stderr)
+    elif args.check:
+        baseline = baselines.get(mode)
+        if baseline is None:
+            other = next((m for m in MODES if m in baselines), None)
+            if other is None:
+                parser.error(f"no baseline at {args.baseline}; record one with --save-baseline")
+            print(f"no {mode} baseline yet: checking {', '.join(SHARED)} against the {other} one; "
+                  f"record one with --save-baseline", file=sys.stderr)
+            baseline = dict(baselines[other], results={
+                rows: {name: ms for name, ms in timings.items() if name in SHARED}
+                for rows, timings in baselines[other]["results"].items()})
+        failures = check(result, baseline, baselines.get("thresholds", {}))
+        for line in failures:
+            print("REGRESSION " + line, file=sys.stderr)
+        if failures:
+            sys.exit(1)
+        print("no regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+#!/bin/sh
+# Run the benchmark suite against a virtual X display, so the app's
+# widgets are timed on a headless machine. Arguments go to suite.py.
+set -e
+cd "$(dirname "$0")"
+exec xvfb-run --auto-servernum --server-args="-screen 0 1600x900x24" python suite.py "$@"
@@ -0,0 +1,103 @@
+"""BudgetWise: a personal budget ledger on SQLite.
+
+The ledger, import and export functions work without Tk; the desktop app
+lives in ``budgetwise.gui`` and starts with ``python -m budgetwise``.
+Names below are imported on first access, so ``import budgetwise`` stays
+cheap and pandas is only loaded by the code paths that need it.
+"""
+import importlib
+
+_EXPORTS = {
+    "configure": "db",
+    "db_path": "db",
+    "get_engine": "db",
+    "SessionLocal": "db",
+    "SQLITE_DEFAULTS": "db",
+    "session_scope": "db",
+    "sqlite_options": "db",
+    "Base": "models",
+    "Category": "models",
+    "Transaction": "models",
+    "Setting": "models",
+    "MonthlySummary": "models",
+    "RecurringRule": "models",
+    "Budget": "models",
+    "DEFAULT_CATEGORIES": "schema",
+    "MIGRATIONS": "schema",
+    "migrate_schema": "schema",
+    "BUDGET_ALERT_PERCENT": "ledger",
+    "TRANSACTION_COLUMNS": "ledger",
+    "TRANSACTION_TYPES": "ledger",
+    "TransactionStore": "ledger",
+    "load_month_summary": "ledger",
+    "load_monthly_history": "ledger",
+    "load_settings": "ledger",
+    "load_transactions_frame": "ledger",
+    "month_bounds": "ledger",
+    "rebuild_monthly_summary": "ledger",
+    "rebuild_search_index": "ledger",
+    "transaction_row": "ledger",
+    "upsert_setting": "ledger",
+    "add_category": "categories",
+    "category_labels": "categories",
+    "delete_category": "categories",
+    "load_categories": "categories",
+    "rename_category": "categories",
+    "cents_str": "money",
+    "format_money": "money",
+    "to_cents": "money",
+    "FREQUENCIES": "recurring",
+    "RecurringResult": "recurring",
+    "add_rule": "recurring",
+    "delete_rule": "recurring",
+    "load_rules": "recurring",
+    "next_occurrence": "recurring",
+    "occurrences": "recurring",
+    "run_due_rules": "recurring",
+    "ROLLOVERS": "budgets",
+    "BudgetBalances": "budgets",
+    "Envelope": "budgets",
+    "EnvelopeStatus": "budgets",
+    "delete_budget": "budgets",
+    "load_envelopes": "budgets",
+    "set_budget": "budgets",
+    "ChangeWatcher": "changes",
+    "Changes": "changes",
+    "trim_change_log": "changes",
+    "consolidated_summary": "consolidate",
+    "ledger_name": "consolidate",
+    "MonthTotals": "analytics",
+    "TREND_WINDOWS": "analytics",
+    "category_spending": "analytics",
+    "category_trends": "analytics",
+    "goal_attainment": "analytics",
+    "month_totals": "analytics",
+    "monthly_totals": "analytics",
+    "spending_trend": "analytics",
+    "IMPORT_FIELDS": "importer",
+    "ImportResult": "importer",
+    "import_transactions": "importer",
+    "EXPORT_FORMATS": "export",
+    "export_transactions": "export",
+    "iter_monthly_report": "export",
+    "iter_transactions": "export",
+    "SearchPage": "search",
+    "search_facets": "search",
+    "search_transactions": "search",
+    "TaskRunner": "tasks",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
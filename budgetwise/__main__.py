@@ -0,0 +1,5 @@
+from .cli import main
+from .diagnostics import profiled
+
+with profiled():
+    main()
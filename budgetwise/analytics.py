@@ -0,0 +1,135 @@
+"""Aggregations over monthly summary frames.
+
+Totals are integer cents and are summed as integers, so they are exact;
+only averages and percentages come out as floats.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+MonthTotals = namedtuple("MonthTotals", "income expenses net goal remaining progress")
+
+
+def month_totals(summary, goal=0):
+    """Income, expenses, net and savings-goal progress for a month summary."""
+    totals = summary.groupby("type")["total"].sum()
+    income = int(totals.get("Income", 0))
+    expenses = int(totals.get("Expense", 0))
+    net = income - expenses
+    remaining = max(goal - max(net, 0), 0)
+    progress = min(max(net, 0) / goal * 100 if goal > 0 else 0, 100)
+    return MonthTotals(income, expenses, net, goal, remaining, progress)
+
+
+def category_spending(summary):
+    """Return (categories, totals) of the expense rows, in summary order."""
+    expenses = summary[summary["type"] == "Expense"]
+    return tuple(expenses["category"]), list(expenses["total"])
+
+
+TREND_WINDOWS = (3, 6, 12)
+
+
+def monthly_totals(history, type="Expense"):
+    """Month x category totals of one ``type`` from a monthly history frame.
+
+    The index runs over every month from the first to the last in
+    ``history``, with months that have no rows filled in as zero, so
+    shifts and rolling windows count calendar months.
+    """
+    months, offsets = _month_offsets(history)
+    mask = (history["type"] == type).to_numpy()
+    categories = history["category"][mask].astype("category").cat.remove_unused_categories()
+    width = len(categories.cat.categories)
+    cells = offsets[mask] * width + categories.cat.codes.to_numpy()
+    sums = _sum_into(cells, history["total"].to_numpy()[mask], len(months) * width)
+    return pd.DataFrame(sums.reshape(len(months), width), index=months,
+                        columns=pd.Index(categories.cat.categories.astype(str), name="category"))
+
+
+def category_trends(history, type="Expense", windows=TREND_WINDOWS):
+    """Per-category monthly totals with month-over-month, year-over-year
+    and rolling-average columns.
+
+    Returns a long frame indexed by (month, category) with columns
+    ``total``, ``mom``/``mom_pct``, ``yoy``/``yoy_pct`` and ``avg_<n>``
+    for each window. Changes against a zero month are NaN in percent; a
+    rolling average is NaN until the window is full.
+    """
+    wide = monthly_totals(history, type)
+    measures = {
+        "total": wide,
+        "mom": wide.diff(),
+        "mom_pct": _percent_change(wide, 1),
+        "yoy": wide.diff(12),
+        "yoy_pct": _percent_change(wide, 12),
+    }
+    for window in windows:
+        measures[f"avg_{window}"] = wide.rolling(window).mean()
+    index = pd.MultiIndex.from_product([wide.index, wide.columns], names=["month", "category"])
+    return pd.DataFrame({name: m.to_numpy().ravel() for name, m in measures.items()}, index=index)
+
+
+def spending_trend(history, windows=TREND_WINDOWS):
+    """Total expenses per month with the same rolling averages."""
+    total = _type_totals(history, "Expense")
+    frame = pd.DataFrame({"total": total})
+    for window in windows:
+        frame[f"avg_{window}"] = total.rolling(window).mean()
+    return frame
+
+
+def goal_attainment(history, goal, windows=TREND_WINDOWS):
+    """Savings-goal progress for every month in ``history``.
+
+    ``progress`` and ``remaining`` follow the dashboard's month_totals;
+    ``attained`` marks months whose net reached the goal, and
+    ``rate_<n>`` is the share of attained months over the trailing window.
+    """
+    income = _type_totals(history, "Income")
+    expenses = _type_totals(history, "Expense")
+    net = income - expenses
+    saved = net.clip(lower=0)
+    frame = pd.DataFrame({"income": income, "expenses": expenses, "net": net})
+    frame["goal"] = goal
+    frame["remaining"] = (goal - saved).clip(lower=0)
+    if goal > 0:
+        frame["progress"] = (saved / goal * 100).clip(upper=100)
+        frame["attained"] = saved >= goal
+    else:
+        frame["progress"] = 0.0
+        frame["attained"] = False
+    for window in windows:
+        frame[f"rate_{window}"] = frame["attained"].astype(np.float64).rolling(window, min_periods=1).mean() * 100
+    return frame
+
+
+def _percent_change(wide, periods):
+    previous = wide.shift(periods)
+    return (wide - previous) / previous.where(previous != 0) * 100
+
+
+def _month_offsets(history):
+    """Gap-free month index for ``history`` and each row's position in it."""
+    codes = history["month"].to_numpy().astype("datetime64[M]").astype(np.int64)
+    if not len(codes):
+        return pd.DatetimeIndex([], name="month", freq="MS"), codes
+    first = codes.min()
+    months = pd.date_range(np.datetime64(int(first), "M"), periods=int(codes.max() - first) + 1,
+                           freq="MS", name="month")
+    return months, codes - first
+
+
+def _type_totals(history, type):
+    months, offsets = _month_offsets(history)
+    mask = (history["type"] == type).to_numpy()
+    sums = _sum_into(offsets[mask], history["total"].to_numpy()[mask], len(months))
+    return pd.Series(sums, index=months)
+
+
+def _sum_into(cells, totals, size):
+    """Integer totals per cell; np.bincount would sum its weights as floats."""
+    sums = np.zeros(size, dtype=np.int64)
+    np.add.at(sums, cells, totals.astype(np.int64))
+    return sums
@@ -0,0 +1,192 @@
+"""Monthly budget envelopes and their live balances.
+
+An envelope gives one category an amount to spend each month. Its
+rollover rule decides what the months before leave behind:
+
+``None``
+    every month starts from the budgeted amount;
+``Unspent``
+    money left over adds to the next month, overspending is forgiven;
+``All``
+    leftovers and overspending both carry, so the envelope is a running
+    balance since its first month.
+
+What carries into a month is worked out once, from monthly_summary, when
+the envelopes are loaded. BudgetBalances then follows the month's
+spending through the same inserts, updates and deletes TransactionStore
+takes, so the balance of every envelope is always at hand.
+"""
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from . import diagnostics
+from .db import get_engine
+from .ledger import BUDGET_ALERT_PERCENT, month_bounds
+from .models import Budget, Category
+
+ROLLOVERS = ("None", "Unspent", "All")
+
+Envelope = namedtuple("Envelope", "category_id category amount rollover carry")
+EnvelopeStatus = namedtuple("EnvelopeStatus",
+                            "category budget carry available spent remaining percent state")
+
+_STATES = ("ok", "warning", "over")
+
+_ENVELOPES_SQL = (
+    "SELECT b.category_id, c.name, b.amount, b.rollover, b.start "
+    "FROM budgets b JOIN categories c ON c.id = b.category_id ORDER BY c.name"
+)
+# Expenses per month, as months since 1970, of the envelopes that roll over.
+_SPENT_BEFORE_SQL = (
+    "SELECT category_id, (year - 1970) * 12 + month - 1, total FROM monthly_summary "
+    "WHERE type = 'Expense' AND (year - 1970) * 12 + month - 1 < ? AND category_id IN "
+    "(SELECT category_id FROM budgets WHERE rollover != 'None')"
+)
+
+
+def set_budget(session, category_id, amount, rollover="None", start=None):
+    """Give a category a monthly envelope of ``amount`` cents, or change it.
+
+    A new envelope starts in the month of ``start`` (default: this month);
+    an existing one keeps its start, and its carry is worked out again
+    with the new amount and rule. Returns the envelope's id.
+    """
+    if amount <= 0:
+        raise ValueError("A budget must be more than zero")
+    if rollover not in ROLLOVERS:
+        raise ValueError(f"Rollover must be one of {', '.join(ROLLOVERS)}")
+    if session.get(Category, category_id) is None:
+        raise ValueError(f"No category with id {category_id}")
+    budget = session.query(Budget).filter(Budget.category_id == category_id).first()
+    if budget is None:
+        budget = Budget(category_id=category_id, start=month_bounds(start or date.today())[0])
+        session.add(budget)
+    budget.amount = amount
+    budget.rollover = rollover
+    session.flush()
+    return budget.id
+
+
+def delete_budget(session, category_id):
+    """Remove a category's envelope; its transactions are untouched."""
+    if not session.query(Budget).filter(Budget.category_id == category_id).delete():
+        raise ValueError(f"No budget for category {category_id}")
+
+
+@diagnostics.timed("load_envelopes")
+def load_envelopes(day=None):
+    """Envelopes by category name, each with what carries into the month of ``day``."""
+    day = day or date.today()
+    month = (day.year - 1970) * 12 + day.month - 1
+    with get_engine().connect() as conn:
+        raw = conn.connection.driver_connection
+        budgets = raw.execute(_ENVELOPES_SQL).fetchall()
+        spent = {}
+        for category_id, spent_month, total in raw.execute(_SPENT_BEFORE_SQL, (month,)):
+            spent.setdefault(category_id, {})[spent_month] = total
+    envelopes = []
+    for category_id, name, amount, rollover, start in budgets:
+        first = (int(start[:4]) - 1970) * 12 + int(start[5:7]) - 1
+        months = np.zeros(max(month - first, 0), dtype=np.int64)
+        for spent_month, total in spent.get(category_id, {}).items():
+            if spent_month >= first:
+                months[spent_month - first] = total
+        envelopes.append(Envelope(category_id, name, amount, rollover, carry(amount, rollover, months)))
+    return envelopes
+
+
+def carry(amount, rollover, spent):
+    """What an envelope of ``amount`` a month carries after months that spent ``spent``."""
+    if rollover == "All":
+        return int(amount * len(spent) - spent.sum())
+    left = 0
+    if rollover == "Unspent":
+        for total in spent.tolist():
+            left = max(left + amount - total, 0)
+    return left
+
+
+class BudgetBalances:
+    """Spending against each envelope over a TransactionStore's month.
+
+    Starts from the store's rows; after that, pass every row given to the
+    store's insert, update and delete here too. Only expenses in budgeted
+    categories are kept, one dict entry each, so a change costs the same
+    however large the ledger is and a status is read without summing.
+    Rows outside the store's window are ignored, as the store ignores them.
+    """
+
+    def __init__(self, envelopes, store, alert_percent=BUDGET_ALERT_PERCENT):
+        self.envelopes = {envelope.category: envelope for envelope in envelopes}
+        self.store = store
+        self.alert_percent = alert_percent
+        self.spent = dict.fromkeys(self.envelopes, 0)
+        self._rows = {}
+        df = store.frame()
+        if len(df):
+            budgeted = ((df["type"] == "Expense") & df["category"].isin(list(self.envelopes))).to_numpy()
+            rows = df[budgeted]
+            self._rows = dict(zip(rows["id"].tolist(), zip(rows["category"].tolist(), rows["amount"].tolist())))
+            for category, amount in self._rows.values():
+                self.spent[category] += amount
+        self._alerted = {category: self.status(category).state for category in self.envelopes}
+        self._touched = set()
+
+    def __len__(self):
+        return len(self.envelopes)
+
+    def insert(self, row):
+        if (row["type"] != "Expense" or row["category"] not in self.envelopes
+                or not self.store.covers(row["date"])):
+            return
+        self._rows[int(row["id"])] = (row["category"], row["amount"])
+        self.spent[row["category"]] += row["amount"]
+        self._touched.add(row["category"])
+
+    def update(self, row):
+        self.delete(row["id"])
+        self.insert(row)
+
+    def delete(self, tx_id):
+        found = self._rows.pop(int(tx_id), None)
+        if found is not None:
+            category, amount = found
+            self.spent[category] -= amount
+            self._touched.add(category)
+
+    def status(self, category):
+        """EnvelopeStatus of one envelope as of now."""
+        envelope = self.envelopes[category]
+        spent = self.spent[category]
+        available = envelope.amount + envelope.carry
+        remaining = available - spent
+        percent = spent / available * 100 if available > 0 else 100.0
+        if remaining < 0:
+            state = "over"
+        elif percent >= self.alert_percent:
+            state = "warning"
+        else:
+            state = "ok"
+        return EnvelopeStatus(category, envelope.amount, envelope.carry, available, spent,
+                              remaining, percent, state)
+
+    def statuses(self):
+        """EnvelopeStatus of every envelope, in category name order."""
+        return [self.status(category) for category in self.envelopes]
+
+    def alerts(self):
+        """Envelopes that reached their alert line, or went over, since the last call.
+
+        Each crossing is reported once; an envelope that drops back below
+        is reported again when it next crosses.
+        """
+        crossed = []
+        for category in self._touched:
+            status = self.status(category)
+            if _STATES.index(status.state) > _STATES.index(self._alerted[category]):
+                crossed.append(status)
+            self._alerted[category] = status.state
+        self._touched.clear()
+        return sorted(crossed, key=lambda status: status.category)
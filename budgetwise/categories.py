@@ -0,0 +1,93 @@
+"""The categories lookup table, and category codes for in-memory frames.
+
+Transactions and monthly_summary refer to a category by its id, so a
+rename touches a single row. Frames carry categories as pandas
+Categoricals decoded straight from those ids, without building a string
+per row.
+"""
+import numpy as np
+import pandas as pd
+
+from .db import get_engine
+from .models import Budget, Category, RecurringRule, Transaction
+
+_NAME_LENGTH = Category.__table__.c.name.type.length
+
+
+def load_categories():
+    """Category names keyed by id, in the order they were created."""
+    with get_engine().connect() as conn:
+        return read_categories(conn.connection.driver_connection)
+
+
+def read_categories(raw):
+    """load_categories on an open DBAPI connection."""
+    return dict(raw.execute("SELECT id, name FROM categories ORDER BY id").fetchall())
+
+
+def add_category(session, name):
+    """Create a category and return its id."""
+    name = _check_name(session, name)
+    category = Category(name=name)
+    session.add(category)
+    session.flush()
+    return category.id
+
+
+def rename_category(session, category_id, name):
+    """Rename a category; its transactions and monthly totals follow it."""
+    category = _get(session, category_id)
+    if name.strip() != category.name:
+        category.name = _check_name(session, name)
+
+
+def delete_category(session, category_id):
+    """Delete a category no transaction or recurring rule uses, with its budget."""
+    category = _get(session, category_id)
+    for model, what in ((Transaction, "transactions"), (RecurringRule, "recurring transactions")):
+        if session.query(model.id).filter(model.category_id == category_id).limit(1).first():
+            raise ValueError(f"{category.name} is still used by {what}")
+    session.query(Budget).filter(Budget.category_id == category_id).delete()
+    session.delete(category)
+
+
+def category_ids(raw, names):
+    """Map category names to ids, creating the missing categories."""
+    names = list(names)
+    if not names:
+        return {}
+    raw.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)", [(n,) for n in names])
+    rows = raw.execute(f"SELECT name, id FROM categories WHERE name IN ({', '.join('?' * len(names))})",
+                       names).fetchall()
+    return dict(rows)
+
+
+def category_labels(ids, categories):
+    """Categorical of category names for an array of category ids.
+
+    ``categories`` maps id -> name, as load_categories returns; it must
+    cover every id. Each name is stored once, as a category, and the rows
+    hold small integer codes.
+    """
+    known = np.fromiter(categories, dtype=np.int64, count=len(categories))
+    codes = np.full(int(known.max(initial=0)) + 1, -1, dtype=np.int32)
+    codes[known] = np.arange(len(known), dtype=np.int32)
+    return pd.Categorical.from_codes(codes[ids], categories=list(categories.values()))
+
+
+def _get(session, category_id):
+    category = session.get(Category, category_id)
+    if category is None:
+        raise ValueError(f"No category with id {category_id}")
+    return category
+
+
+def _check_name(session, name):
+    name = name.strip()
+    if not name:
+        raise ValueError("A category needs a name")
+    if len(name) > _NAME_LENGTH:
+        raise ValueError(f"Category names are at most {_NAME_LENGTH} characters")
+    if session.query(Category.id).filter(Category.name == name).first():
+        raise ValueError(f"There is already a category called {name}")
+    return name
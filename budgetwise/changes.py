@@ -0,0 +1,145 @@
+"""Following a ledger that other windows and processes write to.
+
+SQLite moves a connection's ``PRAGMA data_version`` whenever another
+connection commits to the file, and reading it costs microseconds. When
+it moves, ChangeWatcher reads what transaction_log gained since its last
+look: ranges of ids of transactions that were added, edited or deleted,
+and the names of the other tables that changed. Only the rows in those
+ranges are read back, so a window follows other windows' edits without
+reloading the ledger, and reloads budgets, rules or settings only when
+they changed.
+"""
+import threading
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+from sqlalchemy import text
+
+from . import diagnostics
+from .categories import read_categories
+from .db import get_engine
+from .ledger import TRANSACTION_SELECT, TRANSACTION_TYPES, _as_date
+from .schema import LOGGED_TABLES
+
+RELOAD_SPAN = 50_000  # ids changed at once beyond which reloading is cheaper
+MAX_RANGES = 500  # separate ranges read back in one statement
+LOG_KEEP = 10_000  # log entries trim_change_log leaves
+
+
+class Changes(namedtuple("Changes", "rows ranges reload tables")):
+    """What other connections committed since the last poll.
+
+    ``rows`` are the current rows, as transaction_row dicts, with ids in
+    ``ranges``, a list of inclusive (first, last) id pairs. A loaded id
+    inside a range but missing from ``rows`` was deleted, or moved out of
+    the dates polled for. ``tables`` is a frozenset of the names in
+    LOGGED_TABLES that changed. ``reload`` means the change cannot be
+    followed row by row: categories changed, too much changed at once, or
+    the log was trimmed past the last poll. Everything should be loaded
+    again; ``rows`` and ``ranges`` are empty then, and after a trim
+    ``tables`` names them all.
+    """
+
+    def elsewhere(self):
+        """Whether some ids in ``ranges`` are not in ``rows``: deleted, or
+        dated outside the dates polled for."""
+        return sum(last - first + 1 for first, last in self.ranges) > len(self.rows)
+
+    def stale(self, ids):
+        """Those of ``ids`` that fall in a changed range but are not in ``rows``."""
+        ids = np.asarray(ids, dtype=np.int64)
+        changed = np.zeros(len(ids), dtype=bool)
+        for first, last in self.ranges:
+            changed |= (ids >= first) & (ids <= last)
+        found = np.fromiter((row["id"] for row in self.rows), dtype=np.int64, count=len(self.rows))
+        return ids[changed & ~np.isin(ids, found)].tolist()
+
+
+class ChangeWatcher:
+    """Reports commits other connections make to the configured ledger.
+
+    data_version is kept per connection and the engine gives each thread
+    its own, so the watcher keeps the last one it read on each thread, and
+    can be polled from a reader pool, one poll at a time. Commits from
+    this process's other threads, like the TaskRunner's writer, are
+    reported too; applying a row that is already applied changes nothing.
+    Commits made on the polling thread itself are not reported.
+    """
+
+    def __init__(self):
+        with get_engine().connect() as conn:
+            raw = conn.connection.driver_connection
+            self.seq = raw.execute("SELECT COALESCE(MAX(seq), 0) FROM transaction_log").fetchone()[0]
+            self.categories = read_categories(raw)
+        self.data_versions = {}  # thread ident -> data_version last read there
+
+    @diagnostics.timed("watcher.poll")
+    def poll(self, start=None, end=None):
+        """Changes since the last poll, or None if nothing was committed.
+
+        ``start``/``end`` bound the half-open date range of the rows read
+        back, as for load_transactions_frame.
+        """
+        with get_engine().connect() as conn:
+            raw = conn.connection.driver_connection
+            version = raw.execute("PRAGMA data_version").fetchone()[0]
+            thread = threading.get_ident()
+            if version == self.data_versions.get(thread):
+                return None
+            self.data_versions[thread] = version
+            oldest = raw.execute("SELECT MIN(seq) FROM transaction_log").fetchone()[0]
+            logged = raw.execute("SELECT seq, first_id, last_id, table_name FROM transaction_log "
+                                 "WHERE seq > ? ORDER BY seq", (self.seq,)).fetchall()
+            if not logged:
+                return None  # a commit that logged nothing, like a trim of the log
+            trimmed = oldest > self.seq + 1
+            self.seq = logged[-1][0]
+            tables = frozenset(LOGGED_TABLES if trimmed else
+                               (name for *_, name in logged if name != "transactions"))
+            ranges = _merge((first, last) for _, first, last, name in logged if name == "transactions")
+            categories = read_categories(raw) if "categories" in tables else self.categories
+            if (categories != self.categories or trimmed or len(ranges) > MAX_RANGES
+                    or sum(last - first + 1 for first, last in ranges) > RELOAD_SPAN):
+                self.categories = categories
+                return Changes([], [], True, tables)
+            if not ranges:
+                return Changes([], [], False, tables)
+            sql = (f"SELECT {TRANSACTION_SELECT} FROM transactions t WHERE ("
+                   + " OR ".join(["t.id BETWEEN ? AND ?"] * len(ranges)) + ")")
+            params = [id_ for pair in ranges for id_ in pair]
+            if start is not None:
+                sql += " AND t.date >= ?"
+                params.append(_as_date(start).isoformat())
+            if end is not None:
+                sql += " AND t.date < ?"
+                params.append(_as_date(end).isoformat())
+            rows = [{
+                "id": tx_id,
+                "date": date.fromisoformat(day[:10]),
+                "type": TRANSACTION_TYPES[expense],
+                "category": categories[category_id],
+                "description": description,
+                "amount": amount,
+            } for tx_id, day, expense, category_id, description, amount in raw.execute(sql, params)]
+        return Changes(rows, ranges, False, tables)
+
+
+def trim_change_log(session, keep=LOG_KEEP):
+    """Drop all but the newest ``keep`` log entries.
+
+    A watcher that had not read the dropped entries yet reloads instead.
+    """
+    session.execute(text("DELETE FROM transaction_log WHERE seq <= "
+                         "(SELECT MAX(seq) FROM transaction_log) - :keep"), {"keep": keep})
+
+
+def _merge(ranges):
+    """Sorted ranges with overlapping and adjacent ones joined."""
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return [tuple(pair) for pair in merged]
@@ -0,0 +1,119 @@
+"""Command line entry point: ``python -m budgetwise``.
+
+Commands import pandas, Tk and matplotlib only when they need them, so
+scripted exports and maintenance start quickly.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from .db import configure, db_path
+from .export import EXPORT_FORMATS, export_transactions
+
+
+def _parse_day(text):
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {text}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="budgetwise", description="Personal budget tracker.")
+    parser.add_argument("--db", default=db_path(), metavar="PATH",
+                        help="SQLite database file (default: $BUDGETWISE_DB or budgetwise.db)")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("rebuild-summary", help="recompute the monthly summary table from the ledger")
+    imp = commands.add_parser("import", help="bulk-import a CSV or OFX bank export")
+    imp.add_argument("file")
+    imp.add_argument("--format", choices=["csv", "ofx"], help="default: from the file extension")
+    imp.add_argument("--date-format", default="%Y-%m-%d", help="strptime format of CSV dates")
+    imp.add_argument("--category", default="Other", help="category for rows without one")
+    imp.add_argument("--column", action="append", default=[], metavar="FIELD=HEADER",
+                     help="map a field (date, type, category, description, amount) to a CSV header")
+    imp.add_argument("--chunk-size", type=int, default=50_000)
+    exp = commands.add_parser("export", help="export transactions or monthly totals")
+    exp.add_argument("file")
+    exp.add_argument("--format", choices=EXPORT_FORMATS, help="default: from the file extension")
+    exp.add_argument("--report", action="store_true", help="export monthly totals instead of transactions")
+    exp.add_argument("--from", dest="start", type=_parse_day, metavar="YYYY-MM-DD")
+    exp.add_argument("--to", dest="end", type=_parse_day, metavar="YYYY-MM-DD", help="inclusive")
+    exp.add_argument("--type", dest="types", action="append", choices=["Income", "Expense"])
+    exp.add_argument("--category", dest="categories", action="append")
+    con = commands.add_parser("consolidate", help="monthly totals across several ledger files")
+    con.add_argument("ledgers", nargs="+", metavar="[NAME=]PATH")
+    con.add_argument("--from", dest="start", type=_parse_day, metavar="YYYY-MM-DD")
+    con.add_argument("--to", dest="end", type=_parse_day, metavar="YYYY-MM-DD", help="inclusive")
+    con.add_argument("--by-ledger", action="store_true", help="keep each ledger's totals apart")
+    con.add_argument("--out", metavar="FILE", help="write CSV to FILE instead of printing a table")
+    args = parser.parse_args(argv)
+    configure(args.db)
+
+    if args.command == "export":
+        try:
+            count = export_transactions(
+                args.file, fmt=args.format, report=args.report, start=args.start,
+                end=args.end + timedelta(days=1) if args.end else None,
+                types=args.types, categories=args.categories,
+            )
+        except ValueError as error:
+            parser.error(str(error))
+        print(f"{count} rows written to {args.file}")
+        return
+
+    if args.command == "import":
+        try:
+            columns = dict(c.split("=", 1) for c in args.column)
+        except ValueError:
+            parser.error("--column must look like FIELD=HEADER")
+        from .importer import import_transactions
+
+        try:
+            result = import_transactions(
+                args.file, fmt=args.format, columns=columns, date_format=args.date_format,
+                default_category=args.category, chunk_size=args.chunk_size,
+                progress=lambda read, inserted: print(f"\r{read:,} read, {inserted:,} inserted",
+                                                      end="", file=sys.stderr),
+            )
+        except ValueError as error:
+            parser.error(str(error))
+        print(file=sys.stderr)
+        print(f"{result.inserted} inserted, {result.duplicates} duplicates, {result.rejected} rejected")
+        return
+
+    if args.command == "consolidate":
+        from .consolidate import consolidated_summary, ledger_name
+        from .money import cents_str, format_money
+
+        ledgers = {}
+        for spec in args.ledgers:
+            name, path = spec.split("=", 1) if "=" in spec else (ledger_name(spec), spec)
+            if name in ledgers:
+                parser.error(f"two ledgers named {name}; name them with NAME=PATH")
+            ledgers[name] = path
+        try:
+            frame = consolidated_summary(ledgers, args.start,
+                                         args.end + timedelta(days=1) if args.end else None,
+                                         by_ledger=args.by_ledger)
+        except ValueError as error:
+            parser.error(str(error))
+        frame["month"] = frame["month"].dt.strftime("%Y-%m")
+        if args.out:
+            frame["total"] = frame["total"].map(cents_str)
+            frame.to_csv(args.out, index=False)
+            print(f"{len(frame)} rows written to {args.out}")
+        else:
+            frame["total"] = frame["total"].map(format_money)
+            print(frame.to_string(index=False))
+        return
+
+    if args.command == "rebuild-summary":
+        from .ledger import rebuild_monthly_summary
+
+        rows = rebuild_monthly_summary()
+        print(f"monthly_summary rebuilt: {rows} rows")
+        return
+
+    from .gui import run
+
+    run()
@@ -0,0 +1,63 @@
+"""Monthly totals across several ledgers.
+
+Each household keeps its own ledger file, opened with ``--db`` or
+``BUDGETWISE_DB``, so ledgers never see each other's rows and each can
+be written by its own windows and processes. A consolidated summary
+attaches the files read-only to one in-memory connection and adds up
+their monthly_summary tables in a single query; categories are matched
+by name, as their ids differ from ledger to ledger.
+"""
+import os
+import sqlite3
+from pathlib import Path
+from urllib.request import pathname2url
+
+from .ledger import history_frame, month_range
+
+_SUMMARY_VERSION = 6  # monthly_summary by category id, categories in their own table
+
+
+def ledger_name(path):
+    """Name a ledger file goes by in a consolidated summary: its file name without extension."""
+    return Path(path).stem
+
+
+def consolidated_summary(ledgers, start=None, end=None, by_ledger=False):
+    """Per (month, type, category) totals in cents over several ledger files.
+
+    ``ledgers`` is a list of paths, or a dict of name to path; listed paths
+    are named by ledger_name. ``start``/``end`` bound a half-open date
+    range by the months they fall in, as for load_monthly_history, and the
+    frame has its columns. With ``by_ledger`` the totals are kept apart
+    per ledger, in an extra ``ledger`` column.
+    """
+    if not isinstance(ledgers, dict):
+        ledgers = {ledger_name(path): path for path in ledgers}
+    if not ledgers:
+        raise ValueError("No ledgers to consolidate")
+    conn = sqlite3.connect(":memory:", uri=True)
+    try:
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if len(ledgers) > limit:
+            raise ValueError(f"At most {limit} ledgers can be consolidated at once")
+        selects, params = [], []
+        where, range_params = month_range(start, end)
+        for i, (name, path) in enumerate(ledgers.items()):
+            if not os.path.isfile(path):
+                raise ValueError(f"No ledger at {path}")
+            conn.execute(f"ATTACH DATABASE ? AS l{i}", (f"file:{pathname2url(os.path.abspath(path))}?mode=ro",))
+            if conn.execute(f"PRAGMA l{i}.user_version").fetchone()[0] < _SUMMARY_VERSION:
+                raise ValueError(f"{path} is from an older version; open it once to upgrade it")
+            selects.append(f"SELECT ? AS ledger, year, month, type, name, total FROM l{i}.monthly_summary "
+                           f"JOIN l{i}.categories ON l{i}.categories.id = l{i}.monthly_summary.category_id"
+                           + (" WHERE " + " AND ".join(where) if where else ""))
+            params += [name, *range_params]
+        key = "year, month, type, name" + (", ledger" if by_ledger else "")
+        sql = (f"SELECT {'ledger, ' if by_ledger else ''}year, month, type, name, SUM(total) "
+               f"FROM ({' UNION ALL '.join(selects)}) GROUP BY {key} ORDER BY {key}")
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    if not by_ledger:
+        return history_frame(rows)
+    return history_frame([row[1:] for row in rows], [row[0] for row in rows])
@@ -0,0 +1,195 @@
+"""Database location, connection tuning and the lazily created engine.
+
+Nothing touches the disk until the first call to ``get_engine``, which
+creates the tables and applies pending migrations. Point it elsewhere with
+``configure`` or the ``BUDGETWISE_DB`` environment variable.
+
+Each thread reuses one pooled SQLite connection, tuned on connect with the
+pragmas in ``SQLITE_DEFAULTS``. Any of them can be overridden per database
+by a ``sqlite.<name>`` row in the settings table, or per process through
+``configure``; changes apply the next time the engine is created.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+from sqlalchemy import URL, create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import SingletonThreadPool
+
+from . import diagnostics
+
+DEFAULT_DB_PATH = "budgetwise.db"
+
+SQLITE_SETTING_PREFIX = "sqlite."
+SQLITE_DEFAULTS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negative: KiB, so 64 MiB
+    "busy_timeout": 5_000,  # ms to wait for another writer's lock
+    "cached_statements": 256,  # prepared statements kept per connection
+}
+_CHOICES = {
+    "journal_mode": {"delete", "truncate", "persist", "memory", "wal", "off"},
+    "synchronous": {"off", "normal", "full", "extra"},
+}
+# Threads that may hold a connection at once: the Tk thread, the task
+# runner's readers and writer, and scripts' own workers. Going over makes
+# the pool close the oldest thread's connection, so leave headroom.
+_POOL_SIZE = 16
+
+_db_path = os.environ.get("BUDGETWISE_DB", DEFAULT_DB_PATH)
+_overrides = {}
+_engine = None
+_lock = threading.Lock()
+
+
+def configure(path=None, **options):
+    """Use the database at ``path`` (default: the current one) from now on.
+
+    Keyword arguments override ``SQLITE_DEFAULTS`` and stored settings for
+    this process. The current engine, if any, is closed and the next use
+    reopens it.
+    """
+    global _db_path, _overrides, _engine
+    options = {name: _check_option(name, value) for name, value in options.items()}
+    with _lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+        if path is not None:
+            _db_path = os.fspath(path)
+        _overrides = options
+
+
+def db_path():
+    return _db_path
+
+
+def sqlite_options():
+    """Effective tuning options for the configured database."""
+    options = dict(SQLITE_DEFAULTS)
+    options.update(_stored_options(_db_path))
+    options.update(_overrides)
+    return options
+
+
+def get_engine():
+    """Return the engine, creating and migrating the database on first use."""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                from .schema import migrate_schema
+
+                engine = _create_engine(_db_path, sqlite_options())
+                migrate_schema(engine)
+                _engine = engine
+    return _engine
+
+
+def SessionLocal():
+    """Open an ORM session on the configured database."""
+    return Session(bind=get_engine())
+
+
+@contextmanager
+def session_scope(bind=None):
+    """Yield a session, committing on success and rolling back on error.
+
+    The session is always closed, which hands its connection back to the
+    pool for the next operation on this thread.
+    """
+    s = Session(bind=bind if bind is not None else get_engine())
+    try:
+        yield s
+        s.commit()
+    except BaseException:
+        s.rollback()
+        raise
+    finally:
+        s.close()
+
+
+def _create_engine(path, options):
+    engine = create_engine(
+        URL.create("sqlite", database=path),  # the path is not parsed as a URL
+        echo=False,
+        poolclass=SingletonThreadPool,
+        pool_size=_POOL_SIZE,
+        connect_args={
+            "check_same_thread": False,  # dispose() closes every thread's connection
+            "cached_statements": options["cached_statements"],
+        },
+    )
+    pragmas = [f"PRAGMA {name} = {options[name]}"
+               for name in ("journal_mode", "synchronous", "mmap_size", "cache_size", "busy_timeout")]
+    pragmas.append("PRAGMA foreign_keys = ON")  # a category in use cannot be deleted
+
+    @event.listens_for(engine, "connect")
+    def tune(dbapi_conn, record):
+        for sql in pragmas:
+            dbapi_conn.execute(sql)
+
+    _time_statements(engine)
+    return engine
+
+
+def _time_statements(engine):
+    """Record every statement the engine executes in budgetwise.diagnostics,
+    as ``sql SELECT``, ``sql INSERT`` and so on."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def finish(conn, cursor, statement, parameters, context, executemany):
+        ms = (time.perf_counter() - conn.info["statement_start"].pop()) * 1000
+        diagnostics.record(f"sql {statement.split(None, 1)[0].upper()}", ms, statement=statement)
+
+    @event.listens_for(engine, "handle_error")
+    def failed(context):
+        started = context.connection.info.get("statement_start") if context.connection else None
+        if started:
+            started.pop()
+
+
+def _stored_options(path):
+    """Read ``sqlite.*`` settings straight from the file, before any engine exists."""
+    try:
+        conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return {}  # no database yet
+    try:
+        rows = conn.execute("SELECT key, value FROM settings WHERE key LIKE ?",
+                            (SQLITE_SETTING_PREFIX + "%",)).fetchall()
+    except sqlite3.OperationalError:
+        rows = []  # no settings table yet
+    finally:
+        conn.close()
+    stored = {}
+    for key, value in rows:
+        name = key[len(SQLITE_SETTING_PREFIX):]
+        try:
+            stored[name] = _check_option(name, value)
+        except ValueError:
+            continue  # a bad stored value must not stop the app from opening
+    return stored
+
+
+def _check_option(name, value):
+    if name not in SQLITE_DEFAULTS:
+        raise ValueError(f"Unknown SQLite option: {name}")
+    if name in _CHOICES:
+        value = str(value).lower()
+        if value not in _CHOICES[name]:
+            raise ValueError(f"{name} must be one of {', '.join(sorted(_CHOICES[name]))}")
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer, got {value!r}")
@@ -0,0 +1,138 @@
+"""Timings of hot paths: rolling histograms, a JSON-lines trace, cProfile.
+
+Code run under ``timed(name)``, and every statement the engine executes,
+is recorded in a rolling histogram per name. The desktop app shows them in
+a hidden Diagnostics tab (Ctrl+Shift+D). The engine does not see
+statements sent straight to the DBAPI connection, so the functions that
+do that, such as search, the monthly history, bulk import, the recurring
+catch-up and the change watcher's poll, are timed as a whole instead.
+
+Two environment variables collect more, e.g. for a bug report:
+
+``BUDGETWISE_TRACE=path``
+    append every timing to ``path`` as one JSON object per line.
+``BUDGETWISE_PROFILE=path``
+    run the session under cProfile and write its stats to ``path`` on
+    exit, for ``python -m pstats path``. Only the main thread is profiled:
+    that is the one a stall freezes, and the database work of the task
+    threads shows up in the timings.
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+TRACE_ENV = "BUDGETWISE_TRACE"
+PROFILE_ENV = "BUDGETWISE_PROFILE"
+
+# Upper bounds of the histogram buckets in ms; one more bucket holds the rest.
+BUCKETS_MS = (0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000)
+WINDOW = 500  # latest timings kept per name
+
+TimingStats = namedtuple("TimingStats", "name calls window mean_ms p50_ms p95_ms max_ms buckets")
+
+_histograms = {}
+_lock = threading.Lock()
+_trace = None
+_trace_path = os.environ.get(TRACE_ENV)
+
+
+class Histogram:
+    """Call count and the last ``window`` durations of one timed path."""
+
+    def __init__(self, window=WINDOW):
+        self.calls = 0
+        self.recent = deque(maxlen=window)
+
+    def add(self, ms):
+        self.calls += 1
+        self.recent.append(ms)
+
+    def stats(self, name):
+        recent = sorted(self.recent)
+        n = len(recent)
+        buckets = [0] * (len(BUCKETS_MS) + 1)
+        for ms in recent:
+            buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        return TimingStats(name, self.calls, n, sum(recent) / n, recent[n // 2],
+                           recent[min(n - 1, n * 95 // 100)], recent[-1], tuple(buckets))
+
+
+def record(name, ms, **fields):
+    """Add a duration in ms under ``name``; ``fields`` only go to the trace."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(ms)
+        if _trace_path:
+            _write_trace(name, ms, fields)
+
+
+@contextmanager
+def timed(name, **fields):
+    """Time the block, or every call of the decorated function, as ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000, **fields)
+
+
+def stats():
+    """TimingStats of every name recorded so far, by name."""
+    with _lock:
+        return [h.stats(name) for name, h in sorted(_histograms.items())]
+
+
+def reset():
+    """Forget every timing; the trace file is kept."""
+    with _lock:
+        _histograms.clear()
+
+
+def trace_path():
+    return _trace_path
+
+
+def start_trace(path):
+    """Append timings to ``path`` from now on; None stops tracing."""
+    global _trace, _trace_path
+    with _lock:
+        if _trace is not None:
+            _trace.close()
+            _trace = None
+        _trace_path = os.fspath(path) if path else None
+
+
+def _write_trace(name, ms, fields):
+    global _trace
+    if _trace is None:
+        _trace = open(_trace_path, "a", buffering=1, encoding="utf-8")
+    entry = {"ts": round(time.time(), 6), "name": name, "ms": round(ms, 3),
+             "thread": threading.current_thread().name, **fields}
+    _trace.write(json.dumps(entry, default=str) + "\n")
+
+
+def profile_path():
+    return os.environ.get(PROFILE_ENV) or None
+
+
+@contextmanager
+def profiled(path=None):
+    """Run the block under cProfile if ``path`` or BUDGETWISE_PROFILE is set."""
+    path = path or profile_path()
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
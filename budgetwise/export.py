@@ -0,0 +1,155 @@
+"""Streaming export of transactions and monthly totals."""
+import csv
+import json
+from datetime import timedelta
+from itertools import islice
+
+from .db import session_scope
+from .models import Category, MonthlySummary, Transaction
+
+EXPORT_FORMATS = ("csv", "json", "parquet")
+
+# (column, parquet type) for each export kind.
+TRANSACTION_EXPORT_COLUMNS = [
+    ("id", "int64"), ("date", "date32"), ("type", "string"),
+    ("category", "string"), ("description", "string"), ("amount", "double"),
+]
+REPORT_EXPORT_COLUMNS = [
+    ("year", "int32"), ("month", "int32"), ("type", "string"),
+    ("category", "string"), ("total", "double"), ("count", "int64"),
+]
+# Stored in cents, exported in dollars.
+_CENTS_COLUMNS = {"amount", "total"}
+
+
+def iter_transactions(start=None, end=None, types=None, categories=None, batch_size=5_000):
+    """Yield matching transactions as tuples, in date order.
+
+    Rows are streamed from SQLite ``batch_size`` at a time as plain column
+    tuples, so nothing accumulates in the session's identity map and memory
+    stays bounded however large the ledger is. ``start``/``end`` bound a
+    half-open date range; ``types``/``categories`` restrict to those values.
+    Amounts are in dollars.
+    """
+    with session_scope() as s:
+        q = s.query(*_query_columns(Transaction, TRANSACTION_EXPORT_COLUMNS)).join(Transaction.category)
+        cents = _cents_position(TRANSACTION_EXPORT_COLUMNS)
+        if start is not None:
+            q = q.filter(Transaction.date >= start)
+        if end is not None:
+            q = q.filter(Transaction.date < end)
+        if types:
+            q = q.filter(Transaction.type.in_(types))
+        if categories:
+            q = q.filter(Category.name.in_(categories))
+        q = q.order_by(Transaction.date, Transaction.id).yield_per(batch_size)
+        for row in q:
+            yield _in_dollars(row, cents)
+
+
+def iter_monthly_report(start=None, end=None, types=None, categories=None):
+    """Yield monthly_summary rows for the months overlapping [start, end), totals in dollars."""
+    with session_scope() as s:
+        q = (s.query(*_query_columns(MonthlySummary, REPORT_EXPORT_COLUMNS))
+             .join(Category, Category.id == MonthlySummary.category_id))
+        cents = _cents_position(REPORT_EXPORT_COLUMNS)
+        if start is not None:
+            q = q.filter(MonthlySummary.year * 12 + MonthlySummary.month >= start.year * 12 + start.month)
+        if end is not None:
+            last = end - timedelta(days=1)
+            q = q.filter(MonthlySummary.year * 12 + MonthlySummary.month <= last.year * 12 + last.month)
+        if types:
+            q = q.filter(MonthlySummary.type.in_(types))
+        if categories:
+            q = q.filter(Category.name.in_(categories))
+        q = q.order_by(MonthlySummary.year, MonthlySummary.month, MonthlySummary.type, Category.name)
+        for row in q.yield_per(1_000):
+            yield _in_dollars(row, cents)
+
+
+def export_transactions(path, fmt=None, report=False, start=None, end=None, types=None,
+                        categories=None, batch_size=5_000, progress=None):
+    """Write filtered transactions, or monthly totals if ``report``, to ``path``.
+
+    Output is written incrementally, one batch of at most ``batch_size``
+    rows at a time, in CSV, JSON (an array of objects) or Parquet (needs
+    pyarrow). ``progress(rows_written)`` is called after each batch.
+    Returns the number of rows written.
+    """
+    fmt = (fmt or path.rsplit(".", 1)[-1]).lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if report:
+        columns, rows = REPORT_EXPORT_COLUMNS, iter_monthly_report(start, end, types, categories)
+    else:
+        columns, rows = TRANSACTION_EXPORT_COLUMNS, iter_transactions(start, end, types, categories,
+                                                                       batch_size)
+    written = 0
+
+    def batches():
+        nonlocal written
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+            written += len(batch)
+            if progress:
+                progress(written)
+
+    try:
+        _EXPORT_WRITERS[fmt](path, columns, batches())
+    finally:
+        rows.close()
+    return written
+
+
+def _query_columns(model, columns):
+    """ORM expressions for export ``columns``; the category name comes from a join."""
+    return [Category.name if c == "category" else getattr(model, c) for c, _ in columns]
+
+
+def _cents_position(columns):
+    return next(i for i, (c, _) in enumerate(columns) if c in _CENTS_COLUMNS)
+
+
+def _in_dollars(row, position):
+    # Exact: dividing whole cents by 100 gives the double nearest the
+    # two-decimal amount, which is what float() of that amount returns.
+    return (*row[:position], row[position] / 100, *row[position + 1:])
+
+
+def _write_csv(path, columns, batches):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow([c for c, _ in columns])
+        for batch in batches:
+            writer.writerows(batch)
+
+
+def _write_json(path, columns, batches):
+    names = [c for c, _ in columns]
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("[")
+        sep = "\n  "
+        for batch in batches:
+            for row in batch:
+                fh.write(sep + json.dumps(dict(zip(names, row)), default=str))
+                sep = ",\n  "
+        fh.write("\n]\n")
+
+
+def _write_parquet(path, columns, batches):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from error
+    schema = pa.schema([(c, pa.type_for_alias(t)) for c, t in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in batches:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+_EXPORT_WRITERS = {"csv": _write_csv, "json": _write_json, "parquet": _write_parquet}
@@ -0,0 +1,1487 @@
+"""Tkinter desktop client over the budgetwise ledger."""
+import functools
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from .analytics import (
+    TREND_WINDOWS, category_spending, category_trends, goal_attainment, month_totals,
+    spending_trend,
+)
+from . import diagnostics
+from .budgets import BudgetBalances, delete_budget, load_envelopes, set_budget
+from .categories import add_category, delete_category, load_categories, rename_category
+from .changes import ChangeWatcher, trim_change_log
+from .consolidate import ledger_name
+from .db import db_path
+from .importer import import_transactions
+from .ledger import (
+    TransactionStore, load_month_summary, load_monthly_history, load_settings,
+    load_transactions_frame, month_bounds, transaction_row, upsert_setting,
+)
+from .models import Transaction
+from .money import cents_str, format_money, to_cents
+from .recurring import add_rule, delete_rule, load_rules, run_due_rules
+from .search import search_transactions
+from .tasks import TaskRunner
+
+
+class VirtualTable(ttk.Frame):
+    """Treeview that materializes only the visible window of a large table.
+
+    Rows are kept as sorted column arrays. A small pool of Treeview items,
+    one per visible line, is reused as the view scrolls, and each render
+    rewrites only the items whose values changed. The first column must be
+    a unique row id; it is used to keep the selection on the same row while
+    scrolling.
+    """
+
+    def __init__(self, master, columns, formatters=None, style="TFrame", **tree_kw):
+        super().__init__(master, style=style)
+        self.columns = list(columns)
+        self.formatters = formatters or {}
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", **tree_kw)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self._source = None
+        self._data = {col: np.empty(0, dtype=object) for col in self.columns}
+        self._count = 0
+        self._top = 0
+        self._rows = 1
+        self._items = []
+        self._shown = []
+        self._selected_id = None
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", self._on_wheel)
+        self.tree.bind("<Button-5>", self._on_wheel)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    @diagnostics.timed("table.set_rows")
+    def set_rows(self, df, sort_by, descending=False):
+        """Show ``df`` ordered by the ``sort_by`` columns, then id.
+
+        Passing the same DataFrame object again only re-renders.
+        """
+        if df is not self._source:
+            self._source = df
+            keys = [df[self.columns[0]].to_numpy()] + [df[c].to_numpy() for c in reversed(sort_by)]
+            order = np.lexsort(keys) if len(df) else np.empty(0, dtype=np.intp)
+            if descending:
+                order = order[::-1]
+            self._data = {col: _take(df[col], order) for col in self.columns}
+            self._count = len(df)
+        self._render()
+
+    def _row_values(self, i):
+        return tuple(self.formatters.get(col, _display)(self._data[col][i]) for col in self.columns)
+
+    @diagnostics.timed("table.render")
+    def _render(self):
+        self._top = max(0, min(self._top, self._count - self._rows))
+        stop = min(self._top + self._rows, self._count)
+        wanted = [self._row_values(i) for i in range(self._top, stop)]
+
+        while len(self._items) < len(wanted):
+            self._items.append(self.tree.insert("", tk.END, values=()))
+            self._shown.append(None)
+        while len(self._items) > len(wanted):
+            self.tree.delete(self._items.pop())
+            self._shown.pop()
+        for slot, values in enumerate(wanted):
+            if self._shown[slot] != values:
+                self.tree.item(self._items[slot], values=values)
+                self._shown[slot] = values
+
+        selected = tuple(iid for iid, values in zip(self._items, wanted) if values[0] == self._selected_id)
+        if selected != self.tree.selection():
+            self.tree.selection_set(selected)
+
+        if self._count:
+            self.scrollbar.set(self._top / self._count, stop / self._count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll_to(self, top):
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _on_resize(self, event):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        rows = max(1, event.height // rowheight - 1)  # one row's worth for the heading
+        if rows != self._rows:
+            self._rows = rows
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * self._count))
+        else:
+            step = self._rows if unit == "pages" else 1
+            self._scroll_to(self._top + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(max(0, self._top - 3))
+        else:
+            self._scroll_to(self._top + 3)
+        return "break"
+
+    def _on_select(self, event):
+        sel = self.tree.selection()
+        if sel:
+            self._selected_id = self.tree.item(sel[0])["values"][0]
+
+
+def _take(column, order):
+    # Categoricals keep their codes; names are looked up for visible rows only.
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.array.take(order)
+    return column.to_numpy()[order]
+
+
+def _display(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return value
+
+
+def _money(cents):
+    return "" if np.isnan(cents) else format_money(cents)
+
+
+def _money_change(cents):
+    return "" if np.isnan(cents) else f"{'+' if cents >= 0 else '-'}{format_money(abs(cents))}"
+
+
+def _percent_change(value):
+    return "" if np.isnan(value) else f"{value:+.1f}%"
+
+
+def _sparkline(counts):
+    """One bar per histogram bucket, scaled to the fullest."""
+    top = max(counts) or 1
+    return "".join(_BARS[-(-count * (len(_BARS) - 1) // top)] for count in counts)
+
+
+def _describe_budget(envelope):
+    return (f"{envelope.category} · {format_money(envelope.amount)} a month · "
+            f"{ROLLOVER_LABELS[envelope.rollover]}")
+
+
+def _budget_left(status):
+    if status.remaining >= 0:
+        return f"{format_money(status.remaining)} left of {format_money(status.available)}"
+    return f"{format_money(-status.remaining)} over {format_money(status.available)}"
+
+
+def _describe_rule(rule):
+    repeats = next((label for label, schedule in REPEATS.items()
+                    if schedule == (rule["frequency"], rule["interval"])),
+                   f"Every {rule['interval']} × {rule['frequency']}")
+    due = rule["next_due"].isoformat() if rule["next_due"] else "ended"
+    return (f"{rule['description'] or rule['category']} · {rule['type']} "
+            f"{format_money(rule['amount'])} · {repeats} · next {due}")
+
+
+SEARCH_PAGE_SIZE = 500
+
+# "Repeats" choices on the Add Transaction tab: (frequency, interval).
+REPEATS = {"Never": None, "Weekly": ("Weekly", 1), "Every 2 Weeks": ("Weekly", 2),
+           "Monthly": ("Monthly", 1), "Yearly": ("Yearly", 1)}
+RECURRING_CHECK_MS = 60 * 60 * 1000  # also picks up occurrences due after midnight
+
+ROLLOVER_LABELS = {"None": "starts fresh each month", "Unspent": "carries over what's left",
+                   "All": "carries over leftovers and overspending"}
+BUDGET_STYLES = {"ok": "Horizontal.TProgressbar", "warning": "Warning.Horizontal.TProgressbar",
+                 "over": "Over.Horizontal.TProgressbar"}
+BUDGET_COLUMNS = 3  # envelopes per row on the dashboard
+
+WATCH_MS = 1000  # how often to look for other windows' and processes' changes
+
+DIAGNOSTIC_COLUMNS = ("name", "calls", "window", "mean", "p50", "p95", "max", "histogram")
+DIAGNOSTIC_HEADINGS = {"name": "Timed", "calls": "Calls", "window": "Last N", "mean": "Mean ms",
+                       "p50": "p50 ms", "p95": "p95 ms", "max": "Max ms",
+                       "histogram": f"≤{diagnostics.BUCKETS_MS[0]} … >{diagnostics.BUCKETS_MS[-1]:,} ms"}
+DIAGNOSTICS_REFRESH_MS = 1000
+_BARS = " ▁▂▃▄▅▆▇█"
+
+CHART_TITLES = {"category": "Spending by Category", "income_expense": "Income vs Expenses"}
+
+TREND_COLUMNS = ("category", "total", "mom", "mom_pct", "yoy", "yoy_pct",
+                 *(f"avg_{window}" for window in TREND_WINDOWS))
+TREND_HEADINGS = {"category": "Category", "total": "Total", "mom": "vs Last Month", "mom_pct": "%",
+                  "yoy": "vs Last Year", "yoy_pct": "%",
+                  **{f"avg_{window}": f"{window}-Mo Avg" for window in TREND_WINDOWS}}
+
+
+class BudgetWiseApp:
+    """Main application for personal budget tracking with visualizations."""
+    
+    def __init__(self, master):
+        self.master = master
+        self.master.title(f"BudgetWise — Midnight Finance Edition · {ledger_name(db_path())}")
+        self.master.geometry("1550x880")
+        
+        # Theme colors
+        self.bg = "#0D1117"
+        self.card = "#161B22"
+        self.card2 = "#1D242D"
+        self.navy = "#0A192F"
+        self.accent = "#00C6D7"
+        self.gold = "#F9D342"
+        self.text = "#C9D1D9"
+        self.master.configure(bg=self.bg)
+
+        self.settings = self.load_settings()
+        self.categories = load_categories()
+        self.watcher = ChangeWatcher()  # before loading, so nothing written meanwhile is missed
+        start, end = month_bounds(datetime.now())
+        self.store = TransactionStore(None, start, end)  # empty until the first look loads it
+        self.balances = BudgetBalances([], self.store, self.settings["budget_alert_percent"])
+        self.month_stale = True
+        self.watching = False
+        self.watch_after = None
+        self.summary = pd.DataFrame(columns=["type", "category", "total"])
+        self.summary_version = 0
+        self.history = pd.DataFrame(columns=["month", "type", "category", "total"])
+        self.history_goal = None
+        self.search_page = None
+        self.current_chart = "category"
+        self.refresh_started = None
+        self.tasks = TaskRunner(self.master, on_busy=self.set_busy, on_error=self.show_error)
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.style_ui()
+        self.build_ui()
+        self.refresh_dashboard()
+        self.run_search()
+        self.schedule_recurring()
+        self.tasks.write(trim_change_log)
+        self.schedule_watch()
+
+    def close(self):
+        """Let queued writes finish before the window goes away."""
+        self.tasks.shutdown()
+        self.master.destroy()
+
+    def set_busy(self, busy):
+        self.master.configure(cursor="watch" if busy else "")
+        self.lbl_status["text"] = "Working…" if busy else ""
+
+    def request_refresh(self):
+        """Refresh the dashboard once for a burst of changes."""
+        self.tasks.coalesce("refresh", self.refresh_dashboard)
+
+    @property
+    def transactions_df(self):
+        return self.store.frame()
+
+    @diagnostics.timed("load_transactions_df")
+    def load_transactions_df(self, start=None, end=None):
+        """Load transactions in [start, end) (default: all) into a DataFrame."""
+        return load_transactions_frame(start, end)
+
+    def load_current_month(self):
+        """Reload this month's rows and budget balances off the Tk thread.
+
+        The change watcher's next look does the loading, and runs now
+        unless one is under way; as it polls and loads together, a write
+        committed meanwhile is either loaded or polled next time. The
+        store and balances in use stay until the new ones replace them.
+        """
+        self.month_stale = True
+        if not self.watching:
+            if self.watch_after is not None:
+                self.master.after_cancel(self.watch_after)
+            self.schedule_watch()
+
+    def show_error(self, error):
+        messagebox.showerror("Error", str(error))
+
+    def load_settings(self):
+        return load_settings()
+
+    def save_setting(self, key, value, on_done=None):
+        self.tasks.write(lambda s: upsert_setting(s, key, value), on_done=on_done)
+
+    def style_ui(self):
+        st = ttk.Style()
+        st.theme_use("clam")
+        st.configure("Dark.TFrame", background=self.bg)
+        st.configure("Card.TFrame", background=self.card, relief="flat")
+        st.configure("Text.TLabel", background=self.bg, foreground=self.text, font=("Inter", 11))
+        st.configure("Bold.TLabel", background=self.bg, foreground=self.gold, font=("Inter", 13, "bold"))
+        st.configure("Accent.TButton", font=("Inter", 11, "bold"), padding=8,
+                     background=self.accent, foreground="#000000", borderwidth=0)
+        st.map("Accent.TButton",
+               background=[("active", "#33DCEB"), ("pressed", "#0094A3")],
+               foreground=[("active", "#000"), ("pressed", "#000")])
+        st.configure("Treeview",
+                     background=self.card2,
+                     fieldbackground=self.card2,
+                     foreground=self.text,
+                     rowheight=28,
+                     borderwidth=0,
+                     font=("Inter", 10))
+        st.configure("Treeview.Heading",
+                     background=self.navy,
+                     foreground=self.gold,
+                     font=("Inter", 11, "bold"))
+        st.configure("TNotebook", background=self.bg)
+        st.configure("TNotebook.Tab",
+                     background=self.card2,
+                     foreground=self.text,
+                     padding=(14, 8),
+                     font=("Inter", 11, "bold"))
+        st.configure(
+                    "TProgressbar",
+                    troughcolor="#0A0F14",
+                    background="#009EAA",
+                    lightcolor="#33DCEB",
+                    darkcolor="#006A72",
+                        )
+        st.configure("Warning.Horizontal.TProgressbar", troughcolor="#0A0F14", background=self.gold,
+                     lightcolor=self.gold, darkcolor="#B8961E")
+        st.configure("Over.Horizontal.TProgressbar", troughcolor="#0A0F14", background="#FF6F6F",
+                     lightcolor="#FF9090", darkcolor="#B84A4A")
+        st.map("TNotebook.Tab",
+               background=[("selected", self.accent)],
+               foreground=[("selected", "#000")])
+
+    def build_ui(self):
+        nb = ttk.Notebook(self.master)
+        nb.pack(fill=tk.BOTH, expand=True, padx=14, pady=14)
+        self.tab_dashboard = ttk.Frame(nb, style="Dark.TFrame")
+        self.tab_history = ttk.Frame(nb, style="Dark.TFrame")
+        self.tab_search = ttk.Frame(nb, style="Dark.TFrame")
+        self.tab_add = ttk.Frame(nb, style="Dark.TFrame")
+        self.tab_budgets = ttk.Frame(nb, style="Dark.TFrame")
+        self.tab_settings = ttk.Frame(nb, style="Dark.TFrame")
+        nb.add(self.tab_dashboard, text="Dashboard")
+        nb.add(self.tab_history, text="History")
+        nb.add(self.tab_search, text="Search")
+        nb.add(self.tab_add, text="Add Transaction")
+        nb.add(self.tab_budgets, text="Budgets")
+        nb.add(self.tab_settings, text="Settings")
+        self.notebook = nb
+        # Hidden until Ctrl+Shift+D; see toggle_diagnostics.
+        self.tab_diagnostics = ttk.Frame(nb, style="Dark.TFrame")
+        self.build_dashboard()
+        self.build_history()
+        self.build_search()
+        self.build_add_transaction()
+        self.build_budgets()
+        self.build_settings_tab()
+        self.build_diagnostics()
+        self.master.bind("<Control-Shift-D>", self.toggle_diagnostics)
+
+    def build_dashboard(self):
+        top = ttk.Frame(self.tab_dashboard, style="Dark.TFrame")
+        top.pack(fill=tk.X, pady=10)
+
+        self.lbl_income = ttk.Label(top, style="Bold.TLabel")
+        self.lbl_expenses = ttk.Label(top, style="Bold.TLabel")
+        self.lbl_balance = ttk.Label(top, style="Bold.TLabel")
+        self.lbl_goal = ttk.Label(top, style="Bold.TLabel")
+        self.lbl_remaining = ttk.Label(top, style="Bold.TLabel")
+
+        self.lbl_income.grid(row=0, column=0, padx=20, sticky="w")
+        self.lbl_expenses.grid(row=0, column=1, padx=20, sticky="w")
+        self.lbl_balance.grid(row=0, column=2, padx=20, sticky="w")
+        self.lbl_goal.grid(row=1, column=0, padx=20, sticky="w")
+        self.lbl_remaining.grid(row=1, column=1, padx=20, sticky="w")
+
+        self.lbl_status = ttk.Label(top, style="Text.TLabel")
+        self.lbl_status.grid(row=0, column=3, padx=20, sticky="e")
+
+        pb_frame = ttk.Frame(top, style="Dark.TFrame")
+        pb_frame.grid(row=1, column=2, padx=20)
+        self.progress_var = tk.DoubleVar()
+        self.progress = ttk.Progressbar(pb_frame, variable=self.progress_var,
+                                        maximum=100, length=320)
+        self.progress.pack()
+
+        # Budget bars, shown by show_budgets while there are envelopes.
+        self.budget_strip = ttk.Frame(self.tab_dashboard, style="Dark.TFrame")
+        self.budget_bars = {}
+        self.shown_balances = None
+
+        body = ttk.Frame(self.tab_dashboard, style="Dark.TFrame")
+        body.pack(fill=tk.BOTH, expand=True)
+        self.dashboard_body = body
+
+        table_card = ttk.Frame(body, style="Card.TFrame", padding=14)
+        table_card.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 12))
+
+        self.table = VirtualTable(
+            table_card,
+            columns=("id", "date", "type", "category", "description", "amount"),
+            displaycolumns=("date", "type", "category", "description", "amount"),
+            formatters={
+                "id": int,
+                "date": lambda d: pd.Timestamp(d).strftime("%Y-%m-%d"),
+                "amount": format_money,
+            },
+            style="Card.TFrame",
+        )
+        self.tree = self.table.tree
+
+        for col in ("id", "date", "type", "category", "description", "amount"):
+            self.tree.heading(col, text=col.capitalize())
+
+        self.table.pack(fill=tk.BOTH, expand=True)
+        
+        btn_frame = ttk.Frame(table_card, style="Card.TFrame")
+        btn_frame.pack(pady=10)
+        ttk.Button(btn_frame, text="Edit Selected", style="Accent.TButton",
+                   command=self.edit_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Delete Selected", style="Accent.TButton",
+                   command=self.delete_selected).pack(side=tk.LEFT, padx=5)
+
+        chart_card = ttk.Frame(body, style="Card.TFrame", padding=14)
+        chart_card.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+
+        btns = ttk.Frame(chart_card, style="Card.TFrame")
+        btns.pack(pady=5)
+        ttk.Button(btns, text="Spending by Category", style="Accent.TButton",
+                   command=lambda: self.switch_chart("category")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btns, text="Income vs Expenses", style="Accent.TButton",
+                   command=lambda: self.switch_chart("income_expense")).pack(side=tk.LEFT, padx=5)
+
+        self.figure = Figure(figsize=(5.5, 3.4), dpi=100)
+        self.figure.patch.set_facecolor(self.card)
+        self.chart_canvas = FigureCanvasTkAgg(self.figure, master=chart_card)
+        self.chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.chart_canvas.mpl_connect("draw_event", self.on_chart_draw)
+        self.chart_axes = {}
+        self.chart_ax = None
+        self.chart_state = {}
+        self.chart_key = None
+        self.chart_bg = None
+
+    def build_history(self):
+        controls = ttk.Frame(self.tab_history, style="Dark.TFrame")
+        controls.pack(fill=tk.X, pady=10)
+        ttk.Label(controls, text="Month", style="Bold.TLabel").pack(side=tk.LEFT, padx=(20, 8))
+        self.var_history_month = tk.StringVar()
+        self.combo_history_month = ttk.Combobox(controls, textvariable=self.var_history_month,
+                                                state="readonly", width=10)
+        self.combo_history_month.pack(side=tk.LEFT)
+        self.combo_history_month.bind("<<ComboboxSelected>>", lambda e: self.show_trends())
+        ttk.Label(controls, text="Type", style="Bold.TLabel").pack(side=tk.LEFT, padx=(20, 8))
+        self.var_history_type = tk.StringVar(value="Expense")
+        combo_type = ttk.Combobox(controls, textvariable=self.var_history_type,
+                                  values=["Expense", "Income"], state="readonly", width=10)
+        combo_type.pack(side=tk.LEFT)
+        combo_type.bind("<<ComboboxSelected>>", lambda e: self.show_trends())
+
+        body = ttk.Frame(self.tab_history, style="Dark.TFrame")
+        body.pack(fill=tk.BOTH, expand=True)
+
+        table_card = ttk.Frame(body, style="Card.TFrame", padding=14)
+        table_card.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 12))
+        formatters = {col: _money for col in TREND_COLUMNS[1:]}
+        formatters.update(mom=_money_change, yoy=_money_change,
+                          mom_pct=_percent_change, yoy_pct=_percent_change)
+        self.trend_table = VirtualTable(table_card, columns=TREND_COLUMNS, formatters=formatters,
+                                        style="Card.TFrame")
+        for col in TREND_COLUMNS:
+            self.trend_table.tree.heading(col, text=TREND_HEADINGS[col])
+            anchor = "w" if col == "category" else "e"
+            self.trend_table.tree.column(col, width=150 if col == "category" else 100, anchor=anchor)
+        self.trend_table.pack(fill=tk.BOTH, expand=True)
+
+        chart_card = ttk.Frame(body, style="Card.TFrame", padding=14)
+        chart_card.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self.history_figure = Figure(figsize=(5.5, 5.2), dpi=100)
+        self.history_figure.patch.set_facecolor(self.card)
+        self.history_canvas = FigureCanvasTkAgg(self.history_figure, master=chart_card)
+        self.history_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def build_diagnostics(self):
+        controls = ttk.Frame(self.tab_diagnostics, style="Dark.TFrame")
+        controls.pack(fill=tk.X, pady=10)
+        ttk.Button(controls, text="Reset", style="Accent.TButton",
+                   command=self.reset_diagnostics).pack(side=tk.LEFT, padx=(20, 8))
+        trace = diagnostics.trace_path() or f"off (set {diagnostics.TRACE_ENV})"
+        profile = diagnostics.profile_path() or f"off (set {diagnostics.PROFILE_ENV})"
+        ttk.Label(controls, text=f"Trace: {trace}    Profile: {profile}",
+                  style="Text.TLabel").pack(side=tk.LEFT, padx=14)
+
+        card = ttk.Frame(self.tab_diagnostics, style="Card.TFrame", padding=14)
+        card.pack(fill=tk.BOTH, expand=True)
+        self.diagnostics_tree = ttk.Treeview(card, columns=DIAGNOSTIC_COLUMNS, show="headings")
+        for col in DIAGNOSTIC_COLUMNS:
+            self.diagnostics_tree.heading(col, text=DIAGNOSTIC_HEADINGS[col])
+            wide = col in ("name", "histogram")
+            self.diagnostics_tree.column(col, width=260 if wide else 90, anchor="w" if wide else "e")
+        self.diagnostics_tree.pack(fill=tk.BOTH, expand=True)
+        self.diagnostics_job = None
+
+    def toggle_diagnostics(self, event=None):
+        if self.tab_diagnostics.winfo_ismapped():
+            self.notebook.hide(self.tab_diagnostics)
+            return
+        self.notebook.add(self.tab_diagnostics, text="Diagnostics")
+        self.notebook.select(self.tab_diagnostics)
+        if self.diagnostics_job is None:
+            self.show_diagnostics()
+
+    def show_diagnostics(self):
+        """Fill the Diagnostics table, then again every second until the tab is hidden."""
+        self.diagnostics_job = None
+        if self.notebook.tab(self.tab_diagnostics, "state") == "hidden":
+            return
+        tree = self.diagnostics_tree
+        tree.delete(*tree.get_children())
+        for row in diagnostics.stats():
+            tree.insert("", tk.END, values=(
+                row.name, f"{row.calls:,}", row.window,
+                *(f"{ms:,.2f}" for ms in (row.mean_ms, row.p50_ms, row.p95_ms, row.max_ms)),
+                _sparkline(row.buckets),
+            ))
+        self.diagnostics_job = self.master.after(DIAGNOSTICS_REFRESH_MS, self.show_diagnostics)
+
+    def reset_diagnostics(self):
+        diagnostics.reset()
+        self.diagnostics_tree.delete(*self.diagnostics_tree.get_children())
+
+    def build_search(self):
+        controls = ttk.Frame(self.tab_search, style="Dark.TFrame")
+        controls.pack(fill=tk.X, pady=10)
+        self.var_search = tk.StringVar()
+        self.var_search_type = tk.StringVar(value="All")
+        self.var_search_cat = tk.StringVar(value="All")
+        self.var_search_min = tk.StringVar()
+        self.var_search_max = tk.StringVar()
+        self.var_search_from = tk.StringVar()
+        self.var_search_to = tk.StringVar()
+
+        ttk.Label(controls, text="Search", style="Bold.TLabel").grid(row=0, column=0, padx=(20, 8), sticky="w")
+        entry = ttk.Entry(controls, textvariable=self.var_search, width=48)
+        entry.grid(row=0, column=1, columnspan=5, sticky="we")
+        entry.bind("<KeyRelease>", lambda e: self.tasks.coalesce("search", self.run_search, delay_ms=150))
+        entry.bind("<Return>", lambda e: self.run_search())
+
+        self.combo_search_cat = ttk.Combobox(controls, textvariable=self.var_search_cat,
+                                             values=["All", *self.category_names], state="readonly", width=14)
+        filters = [
+            ("Type", ttk.Combobox(controls, textvariable=self.var_search_type,
+                                  values=["All", "Income", "Expense"], state="readonly", width=10)),
+            ("Category", self.combo_search_cat),
+            ("Min $", ttk.Entry(controls, textvariable=self.var_search_min, width=9)),
+            ("Max $", ttk.Entry(controls, textvariable=self.var_search_max, width=9)),
+            ("From", ttk.Entry(controls, textvariable=self.var_search_from, width=11)),
+            ("To", ttk.Entry(controls, textvariable=self.var_search_to, width=11)),
+        ]
+        for i, (label, widget) in enumerate(filters):
+            ttk.Label(controls, text=label, style="Text.TLabel").grid(
+                row=1, column=2 * i, padx=(20, 6), pady=8, sticky="w")
+            widget.grid(row=1, column=2 * i + 1, pady=8, sticky="w")
+            if isinstance(widget, ttk.Combobox):
+                widget.bind("<<ComboboxSelected>>", lambda e: self.run_search())
+            else:
+                widget.bind("<Return>", lambda e: self.run_search())
+        ttk.Button(controls, text="Search", style="Accent.TButton",
+                   command=self.run_search).grid(row=1, column=2 * len(filters), padx=20)
+
+        card = ttk.Frame(self.tab_search, style="Card.TFrame", padding=14)
+        card.pack(fill=tk.BOTH, expand=True)
+        self.search_table = VirtualTable(
+            card,
+            columns=("id", "date", "type", "category", "description", "amount"),
+            displaycolumns=("date", "type", "category", "description", "amount"),
+            formatters={
+                "id": int,
+                "date": lambda d: pd.Timestamp(d).strftime("%Y-%m-%d"),
+                "amount": format_money,
+            },
+            style="Card.TFrame",
+        )
+        for col in ("id", "date", "type", "category", "description", "amount"):
+            self.search_table.tree.heading(col, text=col.capitalize())
+        self.search_table.pack(fill=tk.BOTH, expand=True)
+
+        pager = ttk.Frame(card, style="Card.TFrame")
+        pager.pack(pady=10)
+        self.btn_search_prev = ttk.Button(pager, text="‹ Previous", style="Accent.TButton",
+                                          command=lambda: self.page_search(-1), state="disabled")
+        self.btn_search_prev.pack(side=tk.LEFT, padx=5)
+        self.lbl_search = ttk.Label(pager, foreground=self.text, background=self.card,
+                                    font=("Inter", 11))
+        self.lbl_search.pack(side=tk.LEFT, padx=14)
+        self.btn_search_next = ttk.Button(pager, text="Next ›", style="Accent.TButton",
+                                          command=lambda: self.page_search(1), state="disabled")
+        self.btn_search_next.pack(side=tk.LEFT, padx=5)
+
+    def build_add_transaction(self):
+        card = ttk.Frame(self.tab_add, style="Card.TFrame", padding=26)
+        card.pack(padx=60, pady=60, fill=tk.X)
+
+        labels = ["Date (YYYY-MM-DD)", "Type", "Category", "Description", "Amount", "Repeats"]
+        for i, text in enumerate(labels):
+            ttk.Label(card, text=text, foreground=self.gold, background=self.card,
+                      font=("Inter", 11, "bold")).grid(row=i, column=0, pady=10, sticky="w")
+
+        self.entry_date = ttk.Entry(card)
+        self.entry_date.grid(row=0, column=1, pady=10)
+        self.entry_date.insert(0, datetime.now().strftime("%Y-%m-%d"))
+
+        self.var_type = tk.StringVar(value="Expense")
+        self.combo_type = ttk.Combobox(card, textvariable=self.var_type,
+                                       values=["Income", "Expense"], state="readonly")
+        self.combo_type.grid(row=1, column=1, pady=10)
+
+        self.var_cat = tk.StringVar()
+        self.combo_category = ttk.Combobox(card, textvariable=self.var_cat,
+                                           values=self.category_names, state="readonly")
+        self.combo_category.grid(row=2, column=1, pady=10)
+
+        self.entry_desc = ttk.Entry(card)
+        self.entry_desc.grid(row=3, column=1, pady=10)
+
+        self.entry_amount = ttk.Entry(card)
+        self.entry_amount.grid(row=4, column=1, pady=10)
+
+        self.var_repeats = tk.StringVar(value="Never")
+        ttk.Combobox(card, textvariable=self.var_repeats, values=list(REPEATS),
+                     state="readonly").grid(row=5, column=1, pady=10)
+
+        ttk.Button(card, text="Add Transaction", style="Accent.TButton",
+                   command=self.add_transaction).grid(row=6, column=0, columnspan=2, pady=24)
+        ttk.Button(card, text="Import Bank Export…", style="Accent.TButton",
+                   command=self.import_file).grid(row=7, column=0, columnspan=2)
+
+    def build_budgets(self):
+        card = ttk.Frame(self.tab_budgets, style="Card.TFrame", padding=26)
+        card.pack(padx=60, pady=60, fill=tk.X)
+
+        ttk.Label(card, text="Monthly Budgets", foreground=self.gold,
+                  background=self.card, font=("Inter", 13, "bold")).pack(anchor="w")
+        row = ttk.Frame(card, style="Card.TFrame")
+        row.pack(fill=tk.X, pady=14)
+        self.list_budgets = tk.Listbox(row, height=12, bg=self.card2, fg=self.text, relief="flat",
+                                       selectbackground=self.accent, highlightthickness=0,
+                                       exportselection=False, font=("Inter", 11))
+        self.list_budgets.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.list_budgets.bind("<<ListboxSelect>>", self.on_budget_select)
+        self.budget_list = []
+
+        side = ttk.Frame(row, style="Card.TFrame")
+        side.pack(side=tk.LEFT, fill=tk.Y, padx=(14, 0))
+        self.var_budget_cat = tk.StringVar()
+        self.var_budget_amount = tk.StringVar()
+        self.var_budget_rollover = tk.StringVar(value=ROLLOVER_LABELS["None"])
+        fields = (
+            ("Category", ttk.Combobox(side, textvariable=self.var_budget_cat,
+                                      values=self.category_names, state="readonly")),
+            ("Amount a Month ($)", ttk.Entry(side, textvariable=self.var_budget_amount)),
+            ("At Month End", ttk.Combobox(side, textvariable=self.var_budget_rollover,
+                                          values=list(ROLLOVER_LABELS.values()), state="readonly",
+                                          width=36)),
+        )
+        for text, widget in fields:
+            ttk.Label(side, text=text, foreground=self.gold, background=self.card,
+                      font=("Inter", 11, "bold")).pack(anchor="w")
+            widget.pack(fill=tk.X, pady=(0, 10))
+        self.combo_budget_cat = fields[0][1]
+        ttk.Button(side, text="Set Budget", style="Accent.TButton",
+                   command=self.save_budget).pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(side, text="Remove Budget", style="Accent.TButton",
+                   command=self.remove_selected_budget).pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(card, text="Warn When a Budget Is This Full (%)", foreground=self.gold,
+                  background=self.card, font=("Inter", 13, "bold")).pack(anchor="w", pady=(24, 0))
+        self.var_alert_percent = tk.StringVar(value=str(self.settings["budget_alert_percent"]))
+        ttk.Entry(card, textvariable=self.var_alert_percent).pack(fill=tk.X, pady=14)
+        ttk.Button(card, text="Save", style="Accent.TButton",
+                   command=self.save_alert_percent).pack(pady=10)
+
+    def show_budgets(self):
+        """Update the dashboard's budget bars, and the Budgets list, from the live balances.
+
+        The widgets are made again only when the balances were rebuilt;
+        otherwise each bar is just set from its envelope's status.
+        """
+        balances = self.balances
+        if balances is not self.shown_balances:
+            self.shown_balances = balances
+            for widget in self.budget_strip.winfo_children():
+                widget.destroy()
+            self.budget_bars = {}
+            for i, category in enumerate(balances.envelopes):
+                cell = ttk.Frame(self.budget_strip, style="Dark.TFrame")
+                cell.grid(row=i // BUDGET_COLUMNS, column=i % BUDGET_COLUMNS, padx=20, pady=4, sticky="w")
+                ttk.Label(cell, text=category, style="Text.TLabel", width=14).pack(side=tk.LEFT)
+                var = tk.DoubleVar()
+                bar = ttk.Progressbar(cell, variable=var, maximum=100, length=180)
+                bar.pack(side=tk.LEFT, padx=8)
+                label = ttk.Label(cell, style="Text.TLabel", width=26)
+                label.pack(side=tk.LEFT)
+                self.budget_bars[category] = (var, bar, label)
+            if balances.envelopes:
+                self.budget_strip.pack(fill=tk.X, pady=(0, 10), before=self.dashboard_body)
+            else:
+                self.budget_strip.pack_forget()
+            self.budget_list = list(balances.envelopes.values())
+            self.list_budgets.delete(0, tk.END)
+            self.list_budgets.insert(tk.END, *(_describe_budget(envelope) for envelope in self.budget_list))
+        for status in balances.statuses():
+            var, bar, label = self.budget_bars[status.category]
+            var.set(min(status.percent, 100))
+            bar.configure(style=BUDGET_STYLES[status.state])
+            label["text"] = _budget_left(status)
+
+    def warn_budgets(self):
+        """Warn about envelopes the last change took to their alert line or over."""
+        alerts = self.balances.alerts()
+        if alerts:
+            messagebox.showwarning("Budget Alert", "\n".join(
+                f"{status.category}: {_budget_left(status)}" for status in alerts))
+
+    def on_budget_select(self, event):
+        sel = self.list_budgets.curselection()
+        if sel:
+            envelope = self.budget_list[sel[0]]
+            self.var_budget_cat.set(envelope.category)
+            self.var_budget_amount.set(cents_str(envelope.amount))
+            self.var_budget_rollover.set(ROLLOVER_LABELS[envelope.rollover])
+
+    def save_budget(self):
+        category_id = self.category_id(self.var_budget_cat.get())
+        if category_id is None:
+            messagebox.showerror("Invalid Category", "Choose a category.")
+            return
+        try:
+            amount = to_cents(self.var_budget_amount.get())
+        except ValueError:
+            messagebox.showerror("Invalid Amount", "Enter a number.")
+            return
+        rollover = next(rule for rule, label in ROLLOVER_LABELS.items()
+                        if label == self.var_budget_rollover.get())
+        self.tasks.write(lambda s: set_budget(s, category_id, amount, rollover),
+                         on_done=lambda _: self.reload_budgets())
+
+    def remove_selected_budget(self):
+        sel = self.list_budgets.curselection()
+        if not sel:
+            messagebox.showerror("Error", "Select a budget.")
+            return
+        envelope = self.budget_list[sel[0]]
+        self.tasks.write(lambda s: delete_budget(s, envelope.category_id),
+                         on_done=lambda _: self.reload_budgets())
+
+    def reload_budgets(self):
+        self.load_current_month()
+
+    def save_alert_percent(self):
+        try:
+            percent = int(self.var_alert_percent.get())
+            if not 1 <= percent <= 100:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Invalid Percentage", "Enter a whole number from 1 to 100.")
+            return
+        self.settings["budget_alert_percent"] = percent
+        self.balances.alert_percent = percent
+        self.request_refresh()
+        self.save_setting("budget_alert_percent", percent,
+                          on_done=lambda _: messagebox.showinfo("Saved", "Budget alerts updated."))
+
+    def build_settings_tab(self):
+        card = ttk.Frame(self.tab_settings, style="Card.TFrame", padding=26)
+        card.pack(padx=60, pady=60, fill=tk.X)
+
+        ttk.Label(card, text="Monthly Savings Goal ($)", foreground=self.gold,
+                  background=self.card, font=("Inter", 13, "bold")).pack(anchor="w")
+        self.var_goal = tk.StringVar(value=cents_str(self.settings["monthly_savings_goal"]))
+        ttk.Entry(card, textvariable=self.var_goal).pack(fill=tk.X, pady=14)
+        ttk.Button(card, text="Save Goal", style="Accent.TButton",
+                   command=self.save_goal).pack(pady=10)
+
+        ttk.Label(card, text="Categories", foreground=self.gold,
+                  background=self.card, font=("Inter", 13, "bold")).pack(anchor="w", pady=(24, 0))
+        row = ttk.Frame(card, style="Card.TFrame")
+        row.pack(fill=tk.X, pady=14)
+        self.list_categories = tk.Listbox(row, height=9, bg=self.card2, fg=self.text, relief="flat",
+                                          selectbackground=self.accent, highlightthickness=0,
+                                          exportselection=False, font=("Inter", 11))
+        self.list_categories.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.list_categories.bind("<<ListboxSelect>>", self.on_category_select)
+        side = ttk.Frame(row, style="Card.TFrame")
+        side.pack(side=tk.LEFT, fill=tk.Y, padx=(14, 0))
+        self.var_category_name = tk.StringVar()
+        ttk.Entry(side, textvariable=self.var_category_name).pack(fill=tk.X)
+        for text, command in (("Add", self.create_category), ("Rename", self.rename_selected_category),
+                              ("Delete", self.delete_selected_category)):
+            ttk.Button(side, text=text, style="Accent.TButton", command=command).pack(fill=tk.X, pady=(10, 0))
+        self.show_categories(self.categories)
+
+        ttk.Label(card, text="Recurring Transactions", foreground=self.gold,
+                  background=self.card, font=("Inter", 13, "bold")).pack(anchor="w", pady=(24, 0))
+        self.list_rules = tk.Listbox(card, height=6, bg=self.card2, fg=self.text, relief="flat",
+                                     selectbackground=self.accent, highlightthickness=0,
+                                     exportselection=False, font=("Inter", 11))
+        self.list_rules.pack(fill=tk.X, pady=14)
+        self.rules = []
+        ttk.Button(card, text="Stop Selected", style="Accent.TButton",
+                   command=self.stop_selected_rule).pack(pady=10)
+        self.reload_rules()
+
+    def schedule_recurring(self):
+        """Write due recurring transactions now, and again every RECURRING_CHECK_MS."""
+        self.run_recurring()
+        self.master.after(RECURRING_CHECK_MS, self.schedule_recurring)
+
+    def run_recurring(self):
+        def ran(result):
+            if result.inserted:
+                # Occurrences may land in any month, so reload this month's window.
+                self.load_current_month()
+            if result.rules:
+                self.reload_rules()
+
+        self.tasks.write_raw(run_due_rules, on_done=ran)
+
+    def schedule_watch(self):
+        """Look for other connections' changes on a reader thread.
+
+        The poll and whatever it calls for loading, this month's store
+        and balances included, run off the Tk thread; the next look is
+        scheduled once this one is applied, so looks never overlap and
+        none of their results is dropped. A look that reloads the month
+        shows as busy. What carries into an envelope depends on earlier
+        months, so envelopes are loaded again when rows outside this month
+        changed too.
+        """
+        start, end = month_bounds(datetime.now())
+        reload = self.month_stale or (start, end) != (self.store.start, self.store.end)
+        self.month_stale = False
+        self.watching = True
+        watcher = self.watcher
+        alert_percent = self.settings["budget_alert_percent"]
+
+        def look():
+            changes = watcher.poll(start, end)
+            if changes is None and not reload:
+                return None
+            tables = changes.tables if changes else frozenset()
+            whole = reload or changes.reload
+            envelopes = (load_envelopes(start) if whole or "budgets" in tables or changes.elsewhere()
+                         else None)
+            store = balances = None
+            if whole:
+                store = TransactionStore(self.load_transactions_df(start, end), start, end)
+                balances = BudgetBalances(envelopes, store, alert_percent)
+            return (changes, store, balances, envelopes,
+                    self.load_settings() if "settings" in tables else None)
+
+        def failed(error):
+            self.month_stale = self.month_stale or reload
+            self.schedule_next_look()
+            self.show_error(error)
+
+        self.tasks.submit(look, on_done=self.apply_outside_changes, on_error=failed,
+                          key="watch", busy=reload)
+
+    def schedule_next_look(self):
+        """Look again after WATCH_MS, or at once if the month is to be reloaded."""
+        self.watching = False
+        self.watch_after = self.master.after(0 if self.month_stale else WATCH_MS, self.schedule_watch)
+
+    def apply_outside_changes(self, found):
+        """Follow what other windows and processes, and this one's writer, committed.
+
+        Changed rows are applied to the store and balances like local
+        edits, so the month is not reloaded; rows the store already has,
+        like those a local write's callback applied, are skipped. Rules,
+        budgets, settings and categories are reloaded only when the log
+        shows their tables changed.
+        """
+        self.schedule_next_look()
+        if found is None:
+            return
+        changes, store, balances, envelopes, settings = found
+        tables = changes.tables if changes else frozenset()
+        if settings is not None:
+            self.settings = settings
+        if store is not None:
+            self.store, self.balances = store, balances
+            if "categories" in tables:
+                self.reload_categories()
+        else:
+            rows = [row for row in changes.rows if self.store.row(row["id"]) != row]
+            stale = changes.stale(self.store.ids())
+            if not (rows or stale or tables):
+                return
+            for row in rows:
+                self.store.update(row)
+                self.balances.update(row)
+            for tx_id in stale:
+                self.store.delete(tx_id)
+                self.balances.delete(tx_id)
+            if envelopes is not None and envelopes != list(self.balances.envelopes.values()):
+                self.balances = BudgetBalances(envelopes, self.store, self.settings["budget_alert_percent"])
+        self.balances.alert_percent = self.settings["budget_alert_percent"]
+        if "recurring_rules" in tables:
+            self.reload_rules()
+        if store is not None:
+            self.refresh_dashboard()  # now, so the busy state runs on into the refresh
+        else:
+            self.request_refresh()
+        self.warn_budgets()
+
+    def reload_rules(self):
+        self.tasks.submit(load_rules, on_done=self.show_rules, key="rules")
+
+    def show_rules(self, rules):
+        self.rules = rules
+        self.list_rules.delete(0, tk.END)
+        self.list_rules.insert(tk.END, *(_describe_rule(rule) for rule in rules))
+
+    def stop_selected_rule(self):
+        sel = self.list_rules.curselection()
+        if not sel:
+            messagebox.showerror("Error", "Select a recurring transaction.")
+            return
+        rule = self.rules[sel[0]]
+        if not messagebox.askyesno("Confirm", "Stop this recurring transaction? "
+                                              "Transactions it already added are kept."):
+            return
+        self.tasks.write(lambda s: delete_rule(s, rule["id"]), on_done=lambda _: self.reload_rules())
+
+    @property
+    def category_names(self):
+        return list(self.categories.values())
+
+    def category_id(self, name):
+        return next((i for i, n in self.categories.items() if n == name), None)
+
+    def selected_category(self):
+        sel = self.list_categories.curselection()
+        if not sel:
+            messagebox.showerror("Error", "Select a category.")
+            return None
+        return list(self.categories)[sel[0]]
+
+    def on_category_select(self, event):
+        sel = self.list_categories.curselection()
+        if sel:
+            self.var_category_name.set(self.category_names[sel[0]])
+
+    def create_category(self):
+        name = self.var_category_name.get()
+        self.tasks.write(lambda s: add_category(s, name), on_done=lambda _: self.reload_categories())
+
+    def rename_selected_category(self):
+        category_id = self.selected_category()
+        if category_id is None:
+            return
+        name = self.var_category_name.get()
+
+        def renamed(_):
+            # Loaded rows carry the old name, so reload them too.
+            self.reload_categories()
+            self.load_current_month()
+
+        self.tasks.write(lambda s: rename_category(s, category_id, name), on_done=renamed)
+
+    def delete_selected_category(self):
+        category_id = self.selected_category()
+        if category_id is None:
+            return
+        budgeted = self.categories[category_id] in self.balances.envelopes
+
+        def deleted(_):
+            self.reload_categories()
+            if budgeted:  # its budget went with it
+                self.reload_budgets()
+
+        self.tasks.write(lambda s: delete_category(s, category_id), on_done=deleted)
+
+    def reload_categories(self):
+        self.tasks.submit(load_categories, on_done=self.show_categories, key="categories")
+
+    def show_categories(self, categories):
+        """Apply a freshly loaded category list to the settings list and pickers."""
+        self.categories = categories
+        names = self.category_names
+        self.list_categories.delete(0, tk.END)
+        self.list_categories.insert(tk.END, *names)
+        self.combo_category["values"] = names
+        self.combo_budget_cat["values"] = names
+        self.combo_search_cat["values"] = ["All", *names]
+        if self.var_cat.get() not in names:
+            self.var_cat.set("")
+        if self.var_search_cat.get() not in ("All", *names):
+            self.var_search_cat.set("All")
+
+    def add_transaction(self):
+        try:
+            date_val = datetime.strptime(self.entry_date.get().strip(), "%Y-%m-%d")
+        except:
+            messagebox.showerror("Invalid Date", "Please use YYYY-MM-DD.")
+            return
+        try:
+            amt = to_cents(self.entry_amount.get())
+        except:
+            messagebox.showerror("Invalid Amount", "Enter a number.")
+            return
+        category_id = self.category_id(self.var_cat.get())
+        if category_id is None:
+            messagebox.showerror("Invalid Category", "Choose a category.")
+            return
+        repeats = REPEATS[self.var_repeats.get()]
+        if repeats:
+            frequency, interval = repeats
+            rule = (date_val.date(), self.var_type.get(), category_id,
+                    self.entry_desc.get().strip(), amt, frequency, interval)
+
+            def added(_):
+                self.reload_rules()
+                self.run_recurring()
+                messagebox.showinfo("Success", "Recurring transaction added.")
+
+            self.tasks.write(lambda s: add_rule(s, *rule), on_done=added)
+            return
+        tx = Transaction(
+            date=date_val,
+            type=self.var_type.get(),
+            category_id=category_id,
+            description=self.entry_desc.get().strip(),
+            amount=amt,
+        )
+
+        def insert(s):
+            s.add(tx)
+            s.flush()
+            return transaction_row(tx)
+
+        def inserted(row):
+            # The change watcher may have applied the row already.
+            self.store.update(row)
+            self.balances.update(row)
+            self.request_refresh()
+            messagebox.showinfo("Success", "Transaction added.")
+            self.warn_budgets()
+
+        self.tasks.write(insert, on_done=inserted)
+
+    def import_file(self):
+        path = filedialog.askopenfilename(
+            title="Import Bank Export",
+            filetypes=[("Bank exports", "*.csv *.ofx *.qfx"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+
+        def progress(read, inserted):
+            self.tasks.post(self.lbl_status.configure, {"text": f"Importing… {read:,} rows read"})
+
+        def imported(result):
+            # Imported rows may land anywhere, so reload this month's window.
+            self.load_current_month()
+            messagebox.showinfo(
+                "Import Complete",
+                f"{result.inserted:,} added, {result.duplicates:,} duplicates skipped, "
+                f"{result.rejected:,} invalid rows.",
+            )
+
+        self.tasks.write_raw(functools.partial(import_transactions, path, progress=progress),
+                             on_done=imported)
+
+    def save_goal(self):
+        try:
+            goal = to_cents(self.var_goal.get())
+        except:
+            messagebox.showerror("Invalid Goal", "Must be a number.")
+            return
+        self.settings["monthly_savings_goal"] = goal
+        self.request_refresh()
+        self.save_setting("monthly_savings_goal", cents_str(goal),
+                          on_done=lambda _: messagebox.showinfo("Saved", "Goal updated."))
+
+    @diagnostics.timed("refresh_dashboard")
+    def refresh_dashboard(self):
+        """Update summary stats, table, and charts for current month."""
+        if self.refresh_started is None:
+            self.refresh_started = time.perf_counter()
+        self.tasks.submit(load_month_summary, self.store.start,
+                          on_done=self.show_dashboard, key="summary")
+        self.tasks.submit(load_monthly_history, on_done=self.show_history, key="history")
+        if self.search_page is not None:
+            self.run_search(self.search_page.offset)
+
+    @diagnostics.timed("show_dashboard")
+    def show_dashboard(self, summary):
+        """Apply a freshly loaded month summary to the widgets."""
+        if not summary.equals(self.summary):
+            self.summary = summary
+            self.summary_version += 1
+        month_df = self.transactions_df
+        totals = month_totals(self.summary, self.settings["monthly_savings_goal"])
+        self.lbl_income["text"] = f"Income: {format_money(totals.income)}"
+        self.lbl_expenses["text"] = f"Expenses: {format_money(totals.expenses)}"
+        self.lbl_balance["text"] = f"Net: {format_money(totals.net)}"
+        self.lbl_goal["text"] = f"Goal: {format_money(totals.goal)}"
+        self.lbl_remaining["text"] = f"Remaining: {format_money(totals.remaining)}"
+        self.progress_var.set(totals.progress)
+        self.table.set_rows(month_df, sort_by=["date"])
+        self.show_budgets()
+        self.draw_chart()
+        if self.refresh_started is not None:
+            # From the refresh request to a drawn dashboard, waits included.
+            diagnostics.record("refresh_dashboard.total", (time.perf_counter() - self.refresh_started) * 1000)
+            self.refresh_started = None
+
+    def show_history(self, history):
+        """Apply freshly loaded monthly history to the History tab."""
+        goal = self.settings["monthly_savings_goal"]
+        if history.equals(self.history) and goal == self.history_goal:
+            return
+        self.history = history
+        self.history_goal = goal
+        months = sorted(history["month"].dt.strftime("%Y-%m").unique(), reverse=True)
+        self.combo_history_month["values"] = months
+        if self.var_history_month.get() not in months:
+            self.var_history_month.set(months[0] if months else "")
+        self.show_trends()
+        self.draw_history()
+
+    def show_trends(self):
+        """Fill the trend table for the selected month and type."""
+        trends = category_trends(self.history, self.var_history_type.get())
+        month = self.var_history_month.get()
+        if month:
+            in_month = trends.index.get_level_values("month") == pd.Timestamp(f"{month}-01")
+            rows = trends[in_month].reset_index(level="month", drop=True).reset_index()
+        else:
+            rows = pd.DataFrame(columns=TREND_COLUMNS)
+        self.trend_table.set_rows(rows[list(TREND_COLUMNS)], sort_by=["category"])
+
+    @diagnostics.timed("draw_history")
+    def draw_history(self):
+        """Plot spending with rolling averages, and net savings against the goal."""
+        fig = self.history_figure
+        fig.clear()
+        spend_ax, goal_ax = fig.subplots(2, 1, sharex=True)
+        for ax in (spend_ax, goal_ax):
+            ax.set_facecolor(self.card)
+            ax.tick_params(colors=self.text)
+        if self.history.empty:
+            spend_ax.text(0.5, 0.5, "No Data", ha="center", color=self.text)
+            self.history_canvas.draw_idle()
+            return
+
+        spending = spending_trend(self.history) / 100  # plot dollars
+        spend_ax.plot(spending.index, spending["total"], color=self.accent, label="Expenses")
+        for window, color in zip(TREND_WINDOWS, (self.gold, "#FF6F6F", "#00E8A2")):
+            spend_ax.plot(spending.index, spending[f"avg_{window}"], color=color, linewidth=1,
+                          label=f"{window}-mo avg")
+        spend_ax.set_title("Monthly Spending", color=self.text)
+        spend_ax.legend(fontsize=8, facecolor=self.card2, labelcolor=self.text, edgecolor=self.card2)
+
+        goal = self.history_goal
+        goals = goal_attainment(self.history, goal)
+        good = goals["attained"] if goal > 0 else goals["net"] >= 0
+        goal_ax.bar(goals.index, goals["net"] / 100, width=20, color=np.where(good, "#00E8A2", "#FF6F6F"))
+        title = "Net Savings"
+        if goal > 0:
+            goal_ax.axhline(goal / 100, color=self.gold, linestyle="--", linewidth=1)
+            window = TREND_WINDOWS[-1]
+            title += f" vs Goal ({goals[f'rate_{window}'].iloc[-1]:.0f}% of the last {window} months met)"
+        goal_ax.set_title(title, color=self.text)
+        fig.tight_layout()
+        self.history_canvas.draw_idle()
+
+    def search_filters(self):
+        """Keyword arguments for search_transactions from the Search tab."""
+        filters = {"text": self.var_search.get()}
+        if self.var_search_type.get() != "All":
+            filters["types"] = [self.var_search_type.get()]
+        if self.var_search_cat.get() != "All":
+            filters["categories"] = [self.var_search_cat.get()]
+        for key, var in (("min_amount", self.var_search_min), ("max_amount", self.var_search_max)):
+            if var.get().strip():
+                filters[key] = to_cents(var.get())
+        if self.var_search_from.get().strip():
+            filters["start"] = datetime.strptime(self.var_search_from.get().strip(), "%Y-%m-%d").date()
+        if self.var_search_to.get().strip():
+            day = datetime.strptime(self.var_search_to.get().strip(), "%Y-%m-%d").date()
+            filters["end"] = day + timedelta(days=1)  # the To date is inclusive
+        return filters
+
+    def run_search(self, offset=0):
+        try:
+            filters = self.search_filters()
+        except ValueError:
+            self.lbl_search["text"] = "Amounts must be numbers and dates YYYY-MM-DD."
+            return
+        self.tasks.submit(lambda: search_transactions(**filters, offset=offset, limit=SEARCH_PAGE_SIZE),
+                          on_done=self.show_search, key="search")
+
+    def page_search(self, step):
+        if self.search_page is not None:
+            self.run_search(max(0, self.search_page.offset + step * SEARCH_PAGE_SIZE))
+
+    def show_search(self, page):
+        self.search_page = page
+        self.search_table.set_rows(page.rows, sort_by=["date"], descending=True)
+        shown = len(page.rows)
+        if not shown:
+            self.lbl_search["text"] = "No matches"
+        else:
+            total = f"{page.total:,}+" if page.capped else f"{page.total:,}"
+            self.lbl_search["text"] = f"{page.offset + 1:,}–{page.offset + shown:,} of {total}"
+        more = page.capped or page.offset + shown < page.total
+        self.btn_search_prev["state"] = "normal" if page.offset else "disabled"
+        self.btn_search_next["state"] = "normal" if shown and more else "disabled"
+
+    def switch_chart(self, name):
+        self.current_chart = name
+        self.draw_chart()
+
+    @diagnostics.timed("draw_chart")
+    def draw_chart(self):
+        """Render category breakdown or income vs expenses chart.
+
+        Each chart kind keeps its own axes and bar artists. Toggling only
+        swaps which axes is visible; new totals for the same bars update
+        their heights and are blitted when the y-limits still fit. Axes are
+        rebuilt, with a layout pass, only when the set of bars changes.
+        """
+        kind = self.current_chart
+        key = (kind, self.store.start, self.summary_version)
+        if key == self.chart_key:
+            return
+        self.chart_key = key
+        ax = self.chart_axes.get(kind)
+        if ax is None:
+            ax = self.chart_axes[kind] = self.figure.add_subplot(111)
+        toggled = ax is not self.chart_ax
+        if toggled:
+            for other in self.chart_axes.values():
+                other.set_visible(other is ax)
+            self.chart_ax = ax
+
+        data_key = key[1:]
+        cached = self.chart_state.get(kind)
+        if cached and cached["data_key"] == data_key:
+            self.redraw_chart()
+            return
+
+        labels, values, colors, message = self.chart_data(kind)
+        if cached and labels and cached["labels"] == labels:
+            for bar, value in zip(cached["bars"], values):
+                bar.set_height(value)
+            cached["data_key"] = data_key
+            top = max(values)
+            if not toggled and 0 < top <= ax.get_ylim()[1] and self.chart_bg is not None:
+                self.blit_bars(ax, cached["bars"])
+            else:
+                ax.relim()
+                ax.autoscale_view()
+                self.redraw_chart()
+            return
+
+        ax.clear()
+        ax.set_facecolor(self.card)
+        ax.tick_params(colors=self.text)
+        bars = ()
+        if message:
+            ax.text(0.5, 0.5, message, ha="center", color=self.text)
+        else:
+            bars = ax.bar(labels, values, color=colors, animated=True)
+            ax.set_title(CHART_TITLES[kind], color=self.text)
+        self.chart_state[kind] = {"data_key": data_key, "labels": labels, "bars": bars}
+        self.figure.tight_layout()
+        self.redraw_chart()
+
+    def chart_data(self, kind):
+        """Return (labels, values, colors, message) for a chart kind."""
+        df = self.summary
+        if df.empty:
+            return None, None, None, "No Data"
+        if kind == "category":
+            labels, values = category_spending(df)
+            if not labels:
+                return None, None, None, "No Expenses"
+            return labels, [v / 100 for v in values], self.accent, None
+        totals = month_totals(df)
+        return ("Income", "Expenses"), [totals.income / 100, totals.expenses / 100], ["#00E8A2", "#FF6F6F"], None
+
+    def redraw_chart(self):
+        """Schedule a full draw; the saved blit background is stale until it runs."""
+        self.chart_bg = None
+        self.chart_canvas.draw_idle()
+
+    def blit_bars(self, ax, bars):
+        self.chart_canvas.restore_region(self.chart_bg)
+        for bar in bars:
+            ax.draw_artist(bar)
+        self.chart_canvas.blit(ax.bbox)
+
+    def on_chart_draw(self, event):
+        """After a full draw, save the background and paint the animated bars."""
+        self.chart_bg = self.chart_canvas.copy_from_bbox(self.figure.bbox)
+        state = self.chart_state.get(self.current_chart)
+        ax = self.chart_axes.get(self.current_chart)
+        if state and ax is not None:
+            for bar in state["bars"]:
+                ax.draw_artist(bar)
+
+    def delete_selected(self):
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showerror("Error", "Select a row.")
+            return
+        tx_id = self.tree.item(sel[0])["values"][0]
+
+        def deleted(count):
+            if count:
+                self.store.delete(tx_id)
+                self.balances.delete(tx_id)
+                self.request_refresh()
+                messagebox.showinfo("Deleted", "Transaction removed.")
+            else:
+                messagebox.showerror("Error", "Could not delete.")
+
+        self.tasks.write(lambda s: s.query(Transaction).filter(Transaction.id == tx_id).delete(),
+                         on_done=deleted)
+
+    def edit_selected(self):
+        """Open dialog to edit the selected transaction."""
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showerror("Error", "Select a row to edit.")
+            return
+        
+        values = self.tree.item(sel[0])["values"]
+        tx_id = values[0]
+        
+        # Create edit dialog
+        dialog = tk.Toplevel(self.master)
+        dialog.title("Edit Transaction")
+        dialog.geometry("400x350")
+        dialog.configure(bg=self.card)
+        dialog.transient(self.master)
+        dialog.grab_set()
+        
+        # Center the dialog
+        dialog.update_idletasks()
+        x = self.master.winfo_x() + (self.master.winfo_width() // 2) - (400 // 2)
+        y = self.master.winfo_y() + (self.master.winfo_height() // 2) - (350 // 2)
+        dialog.geometry(f"+{x}+{y}")
+        
+        # Form fields
+        labels = ["Date (YYYY-MM-DD)", "Type", "Category", "Description", "Amount"]
+        for i, text in enumerate(labels):
+            ttk.Label(dialog, text=text, foreground=self.gold, background=self.card,
+                      font=("Inter", 11, "bold")).grid(row=i, column=0, pady=10, padx=20, sticky="w")
+        
+        # Date entry
+        edit_date = ttk.Entry(dialog, width=25)
+        edit_date.grid(row=0, column=1, pady=10, padx=10)
+        edit_date.insert(0, values[1])  # date from treeview
+        
+        # Type combobox
+        edit_type_var = tk.StringVar(value=values[2])
+        edit_type = ttk.Combobox(dialog, textvariable=edit_type_var,
+                                 values=["Income", "Expense"], state="readonly", width=22)
+        edit_type.grid(row=1, column=1, pady=10, padx=10)
+        
+        # Category combobox
+        edit_cat_var = tk.StringVar(value=values[3])
+        edit_cat = ttk.Combobox(dialog, textvariable=edit_cat_var,
+                                values=self.category_names, state="readonly", width=22)
+        edit_cat.grid(row=2, column=1, pady=10, padx=10)
+        
+        # Description entry
+        edit_desc = ttk.Entry(dialog, width=25)
+        edit_desc.grid(row=3, column=1, pady=10, padx=10)
+        edit_desc.insert(0, values[4] if values[4] else "")
+        
+        # Amount entry (strip $ and commas from displayed value)
+        edit_amount = ttk.Entry(dialog, width=25)
+        edit_amount.grid(row=4, column=1, pady=10, padx=10)
+        amount_str = str(values[5]).replace("$", "").replace(",", "")
+        edit_amount.insert(0, amount_str)
+        
+        def save_changes():
+            # Validate date
+            try:
+                date_val = datetime.strptime(edit_date.get().strip(), "%Y-%m-%d")
+            except:
+                messagebox.showerror("Invalid Date", "Please use YYYY-MM-DD.", parent=dialog)
+                return
+            
+            # Validate amount
+            try:
+                amt = to_cents(edit_amount.get())
+            except:
+                messagebox.showerror("Invalid Amount", "Enter a valid number.", parent=dialog)
+                return
+
+            category_id = self.category_id(edit_cat_var.get())
+            if category_id is None:
+                messagebox.showerror("Invalid Category", "Choose a category.", parent=dialog)
+                return
+            
+            fields = {
+                "date": date_val,
+                "type": edit_type_var.get(),
+                "category_id": category_id,
+                "description": edit_desc.get().strip(),
+                "amount": amt,
+            }
+
+            # Update database on the writer thread
+            def update(s):
+                tx = s.query(Transaction).filter(Transaction.id == tx_id).first()
+                if not tx:
+                    return None
+                for name, value in fields.items():
+                    setattr(tx, name, value)
+                s.flush()
+                s.expire(tx, ["category"])  # follow the new category_id
+                return transaction_row(tx)
+
+            def updated(row):
+                if row:
+                    # Patch the cached row and redraw
+                    self.store.update(row)
+                    self.balances.update(row)
+                    self.request_refresh()
+                    dialog.destroy()
+                    messagebox.showinfo("Success", "Transaction updated.")
+                    self.warn_budgets()
+                else:
+                    messagebox.showerror("Error", "Transaction not found.", parent=dialog)
+
+            self.tasks.write(update, on_done=updated)
+        
+        # Buttons
+        btn_frame = ttk.Frame(dialog, style="Card.TFrame")
+        btn_frame.grid(row=5, column=0, columnspan=2, pady=20)
+        
+        ttk.Button(btn_frame, text="Save Changes", style="Accent.TButton",
+                   command=save_changes).pack(side=tk.LEFT, padx=10)
+        ttk.Button(btn_frame, text="Cancel", style="Accent.TButton",
+                   command=dialog.destroy).pack(side=tk.LEFT, padx=10)
+
+
+def run():
+    root = tk.Tk()
+    BudgetWiseApp(root)
+    root.mainloop()
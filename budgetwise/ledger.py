@@ -0,0 +1,400 @@
+"""Ledger reads and writes shared by the GUI, the CLI and scripts."""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from . import diagnostics
+from .categories import category_labels, read_categories
+from .db import get_engine, session_scope
+from .models import Category, MonthlySummary, Setting, Transaction
+from .money import format_money, to_cents
+from .schema import REBUILD_SEARCH_SQL, REBUILD_SUMMARY_SQL
+
+
+@diagnostics.timed("rebuild_monthly_summary")
+def rebuild_monthly_summary(bind=None):
+    """Recompute monthly_summary from the ledger to repair any drift."""
+    with (bind or get_engine()).begin() as conn:
+        raw = conn.connection.driver_connection
+        for sql in REBUILD_SUMMARY_SQL:
+            raw.execute(sql)
+        return raw.execute("SELECT COUNT(*) FROM monthly_summary").fetchone()[0]
+
+
+@diagnostics.timed("rebuild_search_index")
+def rebuild_search_index(bind=None):
+    """Re-create the full-text index of transaction descriptions."""
+    with (bind or get_engine()).begin() as conn:
+        raw = conn.connection.driver_connection
+        for sql in REBUILD_SEARCH_SQL:
+            raw.execute(sql)
+
+
+def upsert_setting(session, key, value):
+    row = session.query(Setting).filter_by(key=key).first()
+    if not row:
+        session.add(Setting(key=key, value=str(value)))
+    else:
+        row.value = str(value)
+
+
+BUDGET_ALERT_PERCENT = 90  # warn when an envelope is this full, unless set otherwise
+
+
+def load_settings():
+    """Stored settings; the savings goal is saved in dollars and returned in cents."""
+    with session_scope() as s:
+        stored = dict(s.query(Setting.key, Setting.value)
+                      .filter(Setting.key.in_(("monthly_savings_goal", "budget_alert_percent"))))
+    goal = stored.get("monthly_savings_goal")
+    return {
+        "monthly_savings_goal": to_cents(goal) if goal is not None else 0,
+        "budget_alert_percent": int(stored.get("budget_alert_percent", BUDGET_ALERT_PERCENT)),
+    }
+
+
+def load_month_summary(day):
+    """Per (type, category) totals, in cents, for the month containing ``day``."""
+    with session_scope() as s:
+        rows = (
+            s.query(MonthlySummary.type, Category.name, MonthlySummary.total)
+            .join(Category, Category.id == MonthlySummary.category_id)
+            .filter(MonthlySummary.year == day.year, MonthlySummary.month == day.month)
+            .order_by(MonthlySummary.type, Category.name)
+            .all()
+        )
+    return pd.DataFrame(rows, columns=["type", "category", "total"])
+
+
+@diagnostics.timed("load_monthly_history")
+def load_monthly_history(start=None, end=None):
+    """Per (month, type, category) totals in cents from monthly_summary.
+
+    ``month`` is the first day of each month as datetime64; ``start``/``end``
+    bound a half-open date range by the months they fall in. The summary
+    table holds one row per month and category, so this stays small and
+    fast however many transactions the ledger has.
+    """
+    sql = ("SELECT year, month, type, name, total FROM monthly_summary "
+           "JOIN categories ON categories.id = monthly_summary.category_id")
+    where, params = month_range(start, end)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    with get_engine().connect() as conn:
+        rows = conn.connection.driver_connection.execute(sql + " ORDER BY year, month", params).fetchall()
+    return history_frame(rows)
+
+
+def month_range(start=None, end=None):
+    """WHERE conditions and parameters keeping monthly_summary rows in the
+    months of the half-open date range [start, end)."""
+    where, params = [], []
+    if start is not None:
+        where.append("year * 12 + month >= ?")
+        params.append(start.year * 12 + start.month)
+    if end is not None:
+        last = _as_date(end) - timedelta(days=1)
+        where.append("year * 12 + month <= ?")
+        params.append(last.year * 12 + last.month)
+    return where, params
+
+
+def history_frame(rows, ledgers=None):
+    """Monthly history frame from (year, month, type, category, total) rows.
+
+    With ``ledgers``, the name of the ledger each row came from, the frame
+    gets a ``ledger`` column as well.
+    """
+    if not rows:
+        frame = pd.DataFrame({"month": pd.Series(dtype="datetime64[ns]"), "type": pd.Categorical([]),
+                              "category": pd.Categorical([]), "total": pd.Series(dtype=np.int64)})
+    else:
+        years, months, types, categories, totals = (np.array(c) for c in zip(*rows))
+        month_index = (years - 1970) * 12 + months - 1
+        frame = pd.DataFrame({
+            "month": month_index.astype("datetime64[M]").astype("datetime64[ns]"),
+            "type": pd.Categorical(types),
+            "category": pd.Categorical(categories),
+            "total": totals.astype(np.int64),
+        })
+    if ledgers is not None:
+        frame.insert(0, "ledger", pd.Categorical(ledgers))
+    return frame
+
+
+TRANSACTION_COLUMNS = ["id", "date", "type", "category", "description", "amount"]
+TRANSACTION_TYPES = ("Income", "Expense")
+
+# TRANSACTION_COLUMNS of ``transactions t`` as transactions_frame takes
+# them: type as its code in TRANSACTION_TYPES, category as its id.
+TRANSACTION_SELECT = "t.id, t.date, t.type = 'Expense', t.category_id, t.description, t.amount"
+
+
+def transaction_row(tx):
+    """Return a plain dict of a Transaction's column values."""
+    return {
+        "id": tx.id,
+        "date": tx.date,
+        "type": tx.type,
+        "category": tx.category.name,
+        "description": tx.description,
+        "amount": tx.amount,
+    }
+
+
+def month_bounds(day):
+    """Return the half-open [first of month, first of next month) around ``day``."""
+    start = date(day.year, day.month, 1)
+    end = date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+    return start, end
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def load_transactions_frame(start=None, end=None, batch_size=50_000):
+    """Bulk-load transactions into typed DataFrame columns.
+
+    ``start``/``end`` bound the half-open date range and are pushed down to
+    SQLite, where the (date, type, category) index serves them; omit both
+    to load the whole ledger. Reads through the raw DBAPI cursor in
+    ``fetchmany`` batches, skipping ORM hydration. Dates are parsed by numpy
+    from SQLite's ISO strings, ``amount`` is int64 cents, and ``type`` and
+    ``category`` are categoricals decoded from integer codes, so no string
+    is built per row.
+    """
+    sql = f"SELECT {TRANSACTION_SELECT} FROM transactions t"
+    where, params = [], []
+    if start is not None:
+        where.append("t.date >= ?")
+        params.append(_as_date(start).isoformat())
+    if end is not None:
+        where.append("t.date < ?")
+        params.append(_as_date(end).isoformat())
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    chunks = {col: [] for col in TRANSACTION_COLUMNS}
+    with get_engine().connect() as conn:
+        raw = conn.connection.driver_connection
+        cursor = raw.cursor()
+        cursor.execute(sql, params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for col, values in zip(TRANSACTION_COLUMNS, zip(*batch)):
+                chunks[col].append(values)
+        cursor.close()
+        categories = read_categories(raw)  # after the rows, so it covers their ids
+    return transactions_frame(chunks, categories)
+
+
+def transactions_frame(chunks, categories):
+    """Typed transactions DataFrame from per-column lists of value batches.
+
+    The batches hold rows selected with TRANSACTION_SELECT; ``categories``
+    maps category ids to names.
+    """
+    if not chunks["id"]:
+        return pd.DataFrame(columns=TRANSACTION_COLUMNS)
+
+    def column(col, dtype):
+        return np.concatenate([np.array(c, dtype=dtype) for c in chunks[col]])
+
+    return pd.DataFrame({
+        "id": column("id", np.int64),
+        "date": column("date", "datetime64[D]").astype("datetime64[ns]"),
+        "type": pd.Categorical.from_codes(column("type", np.int8), TRANSACTION_TYPES),
+        "category": category_labels(column("category", np.int64), categories),
+        "description": column("description", object),
+        "amount": column("amount", np.int64),
+    }, columns=TRANSACTION_COLUMNS)
+
+
+class TransactionStore:
+    """Columnar in-memory copy of the transactions in a date window.
+
+    Each column lives in a preallocated numpy buffer and an id -> slot map
+    locates rows, so an insert, update or delete touches a single slot
+    instead of reloading the ledger. Rows dated outside [start, end) are
+    ignored, and an edit that moves a row across the boundary inserts or
+    drops it. Row order is not preserved; callers sort for display.
+    Amounts are int64 cents, so totals over the buffers are exact. Type and
+    category are held as small integer codes, and new category names
+    seen in inserted rows are appended to the store's category list.
+    """
+
+    DTYPES = {
+        "id": np.int64,
+        "date": "datetime64[ns]",
+        "type": np.int8,
+        "category": np.int32,
+        "description": object,
+        "amount": np.int64,
+    }
+
+    def __init__(self, df=None, start=None, end=None):
+        self.start = start
+        self.end = end
+        self.version = 0
+        self._frame = None
+        self.reset(df if df is not None else pd.DataFrame(columns=TRANSACTION_COLUMNS))
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, tx_id):
+        return tx_id in self._slots
+
+    def reset(self, df):
+        """Replace the buffers with the contents of a full DataFrame."""
+        n = len(df)
+        capacity = max(16, n)
+        categories = pd.Categorical(df["category"])
+        self._categories = list(categories.categories)
+        self._category_codes = {name: code for code, name in enumerate(self._categories)}
+        encoded = {
+            "date": pd.to_datetime(df["date"]),
+            "type": pd.Categorical(df["type"], categories=TRANSACTION_TYPES).codes,
+            "category": categories.codes,
+        }
+        self._cols = {}
+        for col, dtype in self.DTYPES.items():
+            buf = np.empty(capacity, dtype=dtype)
+            if n:
+                buf[:n] = np.asarray(encoded.get(col, df[col]), dtype=dtype)
+            self._cols[col] = buf
+        self._size = n
+        self._slots = {int(tx_id): i for i, tx_id in enumerate(self._cols["id"][:n])}
+        self._touch()
+
+    def frame(self):
+        """Return the rows as a DataFrame, rebuilt only after a mutation."""
+        if self._frame is None:
+            n = self._size
+            labels = {"type": list(TRANSACTION_TYPES), "category": self._categories}
+            self._frame = pd.DataFrame({
+                col: pd.Categorical.from_codes(buf[:n].copy(), labels[col]) if col in labels else buf[:n].copy()
+                for col, buf in self._cols.items()
+            }, columns=TRANSACTION_COLUMNS)
+        return self._frame
+
+    def ids(self):
+        """Ids of the loaded rows, in no particular order."""
+        return self._cols["id"][:self._size].copy()
+
+    def row(self, tx_id):
+        """The loaded row with id ``tx_id``, as a transaction_row dict, or None."""
+        slot = self._slots.get(int(tx_id))
+        if slot is None:
+            return None
+        return {
+            "id": int(tx_id),
+            "date": pd.Timestamp(self._cols["date"][slot]).date(),
+            "type": TRANSACTION_TYPES[self._cols["type"][slot]],
+            "category": self._categories[self._cols["category"][slot]],
+            "description": self._cols["description"][slot],
+            "amount": int(self._cols["amount"][slot]),
+        }
+
+    def covers(self, day):
+        """Whether ``day`` falls inside the store's date window."""
+        day = _as_date(day)
+        return (self.start is None or day >= self.start) and (self.end is None or day < self.end)
+
+    def insert(self, row):
+        """Append one row (a dict with every column, including id)."""
+        if not self.covers(row["date"]):
+            return
+        tx_id = int(row["id"])
+        if tx_id in self._slots:
+            raise KeyError(f"Transaction {tx_id} already loaded")
+        if self._size == len(self._cols["id"]):
+            self._grow()
+        slot = self._size
+        self._size += 1
+        self._slots[tx_id] = slot
+        self._write(slot, row)
+        self._touch()
+
+    def update(self, row):
+        """Apply a full row for an edited transaction."""
+        tx_id = int(row["id"])
+        if tx_id not in self._slots:
+            self.insert(row)
+        elif not self.covers(row["date"]):
+            self.delete(tx_id)
+        else:
+            self._write(self._slots[tx_id], row)
+            self._touch()
+
+    def delete(self, tx_id):
+        """Remove a row by moving the last row into its slot."""
+        slot = self._slots.pop(int(tx_id), None)
+        if slot is None:
+            return
+        last = self._size - 1
+        if slot != last:
+            for buf in self._cols.values():
+                buf[slot] = buf[last]
+            self._slots[int(self._cols["id"][slot])] = slot
+        for buf in self._cols.values():
+            if buf.dtype == object:
+                buf[last] = None
+        self._size = last
+        self._touch()
+
+    def check_consistency(self, session):
+        """Compare the store with SQLite; return a list of discrepancies."""
+        q = session.query(
+            func.count(Transaction.id),
+            func.coalesce(func.sum(Transaction.id), 0),
+            func.coalesce(func.sum(Transaction.amount), 0),
+        )
+        if self.start is not None:
+            q = q.filter(Transaction.date >= self.start)
+        if self.end is not None:
+            q = q.filter(Transaction.date < self.end)
+        count, id_sum, amount_sum = q.one()
+        n = self._size
+        problems = []
+        if count != n:
+            problems.append(f"row count: db={count} store={n}")
+        if id_sum != int(self._cols["id"][:n].sum()):
+            problems.append("id checksum differs")
+        store_sum = int(self._cols["amount"][:n].sum())
+        if amount_sum != store_sum:
+            problems.append(f"amount total: db={format_money(amount_sum)} store={format_money(store_sum)}")
+        return problems
+
+    def _write(self, slot, row):
+        for col, value in row.items():
+            if col == "date":
+                value = pd.Timestamp(value).to_datetime64()
+            elif col == "type":
+                value = TRANSACTION_TYPES.index(value)
+            elif col == "category":
+                value = self._category_code(value)
+            self._cols[col][slot] = value
+
+    def _category_code(self, name):
+        code = self._category_codes.get(name)
+        if code is None:
+            code = self._category_codes[name] = len(self._categories)
+            self._categories.append(name)
+        return code
+
+    def _grow(self):
+        self._cols = {col: self._doubled(buf) for col, buf in self._cols.items()}
+
+    def _doubled(self, buf):
+        bigger = np.empty(len(buf) * 2, dtype=buf.dtype)
+        bigger[:self._size] = buf[:self._size]
+        return bigger
+
+    def _touch(self):
+        self.version += 1
+        self._frame = None
@@ -0,0 +1,67 @@
+"""ORM models for the ledger tables."""
+from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey
+from sqlalchemy.orm import declarative_base, relationship
+
+Base = declarative_base()
+
+
+# Database models
+class Category(Base):
+    __tablename__ = "categories"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+
+class Transaction(Base):
+    __tablename__ = "transactions"
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    type = Column(String(20), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    category = relationship(Category)
+    description = Column(Text)
+    amount = Column(Integer, nullable=False)  # cents; see budgetwise.money
+    import_hash = Column(Integer)  # set by bulk import; unique, see MIGRATIONS
+    recurrence_key = Column(Integer)  # set by budgetwise.recurring; unique, see MIGRATIONS
+
+
+class RecurringRule(Base):
+    __tablename__ = "recurring_rules"
+    id = Column(Integer, primary_key=True)
+    description = Column(Text)
+    type = Column(String(20), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    category = relationship(Category)
+    amount = Column(Integer, nullable=False)  # cents
+    frequency = Column(String(10), nullable=False)  # see budgetwise.recurring.FREQUENCIES
+    interval = Column(Integer, nullable=False, default=1)
+    start = Column(Date, nullable=False)
+    until = Column(Date)  # last possible day, inclusive; open-ended when NULL
+    next_due = Column(Date)  # first occurrence not yet written; NULL once the rule has ended
+
+
+class Budget(Base):
+    __tablename__ = "budgets"
+    id = Column(Integer, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False, unique=True)
+    category = relationship(Category)
+    amount = Column(Integer, nullable=False)  # cents a month
+    rollover = Column(String(10), nullable=False, default="None")  # see budgetwise.budgets.ROLLOVERS
+    start = Column(Date, nullable=False)  # first day of the first budgeted month
+
+
+class Setting(Base):
+    __tablename__ = "settings"
+    id = Column(Integer, primary_key=True)
+    key = Column(String(50), unique=True)
+    value = Column(String(200))
+
+
+class MonthlySummary(Base):
+    __tablename__ = "monthly_summary"
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    type = Column(String(20), primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)  # cents
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,43 @@
+"""Money amounts as integer cents.
+
+The ledger stores and sums amounts in cents, so totals are exact however
+many rows they cover. Dollars only appear at the edges: parsing what the
+user typed, and formatting what is on screen.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+_CENT = Decimal("0.01")
+
+
+def to_cents(value):
+    """Parse a dollar amount such as ``"1,200.50"``, ``"$7"`` or ``7.5`` into cents.
+
+    Fractions of a cent round half away from zero. Raises ValueError for
+    anything that is not a number.
+    """
+    text = str(value).strip().replace("$", "").replace(",", "")
+    try:
+        dollars = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"Not an amount: {value!r}") from None
+    if not dollars.is_finite():
+        raise ValueError(f"Not an amount: {value!r}")
+    return int(dollars.quantize(_CENT, rounding=ROUND_HALF_UP) * 100)
+
+
+def cents_str(cents):
+    """Plain decimal dollars, e.g. ``-1234`` cents -> ``"-12.34"``."""
+    sign, whole, frac = _split(cents)
+    return f"{sign}{whole}.{frac:02d}"
+
+
+def format_money(cents):
+    """Display form of a cents amount, e.g. ``123456`` -> ``"$1,234.56"``."""
+    sign, whole, frac = _split(cents)
+    return f"{sign}${whole:,}.{frac:02d}"
+
+
+def _split(cents):
+    cents = int(round(cents))
+    whole, frac = divmod(abs(cents), 100)
+    return "-" if cents < 0 else "", whole, frac
@@ -0,0 +1,191 @@
+"""Recurring transactions: RRULE-style rules and the catch-up scheduler.
+
+A rule repeats every ``interval`` days, weeks, months or years from its
+``start`` date, up to an optional ``until``. Monthly and yearly rules keep
+the start's day of the month, or the month's last day where the month is
+shorter, so a rule starting on 31 January lands on 28 or 29 February.
+
+run_due_rules writes every occurrence from a rule's ``next_due`` up to
+today. The k-th occurrence is found from k directly, never by walking the
+calendar, and all of them go in one transaction. Each carries a
+recurrence_key unique to its (rule, date), so a run that is repeated or
+races another writes every occurrence once.
+"""
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from . import diagnostics
+from .db import get_engine, session_scope
+from .ledger import TRANSACTION_TYPES
+from .models import RecurringRule
+from .schema import INDEX_SEARCH_SQL, LOG_WRITTEN_SQL
+
+FREQUENCIES = ("Daily", "Weekly", "Monthly", "Yearly")
+
+RecurringResult = namedtuple("RecurringResult", "rules inserted")
+
+_STEP_DAYS = {"Daily": 1, "Weekly": 7}
+_STEP_MONTHS = {"Monthly": 1, "Yearly": 12}
+_ORDINAL_OFFSET = date(1970, 1, 1).toordinal()  # datetime64[D] + this = date.toordinal()
+
+_DUE_RULES_SQL = (
+    "SELECT id, description, type, category_id, amount, frequency, interval, start, until, next_due "
+    "FROM recurring_rules WHERE next_due <= ? ORDER BY id"
+)
+_INSERT_OCCURRENCE_SQL = (
+    "INSERT OR IGNORE INTO transactions (date, type, category_id, description, amount, recurrence_key) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_INDEX_WRITTEN_SQL = INDEX_SEARCH_SQL + " WHERE id > ?"
+_SUMMARIZE_WRITTEN_SQL = (
+    "INSERT INTO monthly_summary (year, month, type, category_id, total, count) "
+    "SELECT CAST(strftime('%Y', date) AS INTEGER), CAST(strftime('%m', date) AS INTEGER), "
+    "type, category_id, SUM(amount), COUNT(*) FROM transactions WHERE id > ? GROUP BY 1, 2, 3, 4 "
+    "ON CONFLICT (year, month, type, category_id) "
+    "DO UPDATE SET total = total + excluded.total, count = count + excluded.count"
+)
+
+
+def occurrences(frequency, interval, start, first, last):
+    """Dates, as datetime64[D], on which a rule falls within [first, last].
+
+    The indexes of the first and last occurrence in range come from one
+    division each, so the cost is the number of dates returned.
+    """
+    start, first, last = (np.datetime64(d, "D") for d in (start, first, last))
+    first = max(first, start)
+    if first > last:
+        return np.empty(0, dtype="datetime64[D]")
+    if frequency in _STEP_DAYS:
+        step = _STEP_DAYS[frequency] * interval
+        lo = -(-int((first - start).astype(np.int64)) // step)
+        hi = int((last - start).astype(np.int64)) // step
+        return start + np.arange(lo, hi + 1, dtype=np.int64) * step
+    step = _STEP_MONTHS[frequency] * interval
+    anchor = start.astype("datetime64[M]")
+    lo = int((first.astype("datetime64[M]") - anchor).astype(np.int64)) // step
+    hi = int((last.astype("datetime64[M]") - anchor).astype(np.int64)) // step
+    months = anchor + np.arange(lo, hi + 1, dtype=np.int64) * step
+    month_starts = months.astype("datetime64[D]")
+    month_lengths = (months + 1).astype("datetime64[D]") - month_starts
+    day = start - anchor.astype("datetime64[D]")
+    dates = month_starts + np.minimum(day, month_lengths - 1)
+    return dates[(dates >= first) & (dates <= last)]
+
+
+def next_occurrence(frequency, interval, start, after, until=None):
+    """The first date after ``after`` on which a rule falls, or None if it has ended."""
+    first = max(np.datetime64(after, "D") + 1, np.datetime64(start, "D"))
+    if frequency in _STEP_DAYS:
+        span = _STEP_DAYS[frequency] * interval
+    else:
+        span = 31 * (_STEP_MONTHS[frequency] * interval + 1)
+    found = occurrences(frequency, interval, start, first, first + span)
+    if until is not None and found[0] > np.datetime64(until, "D"):
+        return None
+    return found[0].item()
+
+
+def recurrence_keys(rule_id, dates):
+    """recurrence_key of each of a rule's ``dates``: the rule id in the high
+    32 bits and the date's ordinal in the low 32."""
+    return (rule_id << 32) | (dates.astype(np.int64) + _ORDINAL_OFFSET)
+
+
+@diagnostics.timed("run_due_rules")
+def run_due_rules(today=None):
+    """Write the occurrences of every rule that fall on or before ``today``.
+
+    Occurrences already in the ledger are skipped, as are any the user
+    deleted since: a rule's next_due only moves forward. Like bulk import,
+    the write suspends the per-row triggers and updates monthly_summary and
+    the search index with one statement each.
+    Returns a RecurringResult with the number of rules that were due and
+    the number of transactions written.
+    """
+    today = np.datetime64(today or date.today(), "D")
+    with get_engine().connect() as conn:
+        raw = conn.connection.driver_connection
+        try:
+            raw.execute("BEGIN IMMEDIATE")
+            rules = raw.execute(_DUE_RULES_SQL, (str(today),)).fetchall()
+            params, advanced = [], []
+            for (rule_id, description, type_, category_id, amount, frequency, interval,
+                 start, until, next_due) in rules:
+                last = min(today, np.datetime64(until, "D")) if until else today
+                dates = occurrences(frequency, interval, start, next_due, last)
+                params.extend((day, type_, category_id, description, amount, key) for day, key in zip(
+                    dates.astype(str).tolist(), recurrence_keys(rule_id, dates).tolist()))
+                following = next_occurrence(frequency, interval, start, today, until)
+                advanced.append((following.isoformat() if following else None, rule_id))
+            inserted = 0
+            if params:
+                last_id = raw.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+                raw.execute("INSERT INTO bulk_load_guard (id) VALUES (1)")
+                raw.executemany(_INSERT_OCCURRENCE_SQL, params)
+                raw.execute(_INDEX_WRITTEN_SQL, (last_id,))
+                raw.execute(LOG_WRITTEN_SQL, (last_id,))
+                raw.execute(_SUMMARIZE_WRITTEN_SQL, (last_id,))
+                raw.execute("DELETE FROM bulk_load_guard")
+                inserted = raw.execute("SELECT COUNT(*) FROM transactions WHERE id > ?",
+                                       (last_id,)).fetchone()[0]
+            raw.executemany("UPDATE recurring_rules SET next_due = ? WHERE id = ?", advanced)
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+    return RecurringResult(len(rules), inserted)
+
+
+def add_rule(session, start, type, category_id, description, amount, frequency,
+             interval=1, until=None):
+    """Create a rule whose first occurrence is ``start`` and return its id.
+
+    Nothing is written until run_due_rules next runs.
+    """
+    if type not in TRANSACTION_TYPES:
+        raise ValueError(f"Unknown transaction type: {type}")
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Frequency must be one of {', '.join(FREQUENCIES)}")
+    if int(interval) < 1:
+        raise ValueError("A rule repeats at least once per period")
+    if until is not None and until < start:
+        raise ValueError("A rule cannot end before it starts")
+    rule = RecurringRule(start=start, type=type, category_id=category_id, description=description,
+                         amount=amount, frequency=frequency, interval=int(interval), until=until,
+                         next_due=start)
+    session.add(rule)
+    session.flush()
+    return rule.id
+
+
+def delete_rule(session, rule_id):
+    """Stop a rule; the transactions it already wrote are kept."""
+    rule = session.get(RecurringRule, rule_id)
+    if rule is None:
+        raise ValueError(f"No recurring rule with id {rule_id}")
+    session.delete(rule)
+
+
+def load_rules():
+    """Recurring rules as plain dicts, in the order they were created."""
+    with session_scope() as s:
+        return [rule_row(rule) for rule in s.query(RecurringRule).order_by(RecurringRule.id)]
+
+
+def rule_row(rule):
+    """Return a plain dict of a RecurringRule's values, with its category's name."""
+    return {
+        "id": rule.id,
+        "start": rule.start,
+        "type": rule.type,
+        "category": rule.category.name,
+        "description": rule.description,
+        "amount": rule.amount,
+        "frequency": rule.frequency,
+        "interval": rule.interval,
+        "until": rule.until,
+        "next_due": rule.next_due,
+    }
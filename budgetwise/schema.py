@@ -0,0 +1,391 @@
+"""Schema migrations and the SQL that keeps monthly_summary in step.
+
+A new database is built directly at the latest version: create_all makes
+the tables from the models and SCHEMA adds everything else. Existing
+files are brought up to date by replaying MIGRATIONS from their
+user_version.
+"""
+
+# Seeded into the categories table of every new or migrated database.
+DEFAULT_CATEGORIES = ("Salary", "Scholarship", "Food", "Rent", "Utilities", "Transport",
+                      "Entertainment", "Savings", "Other")
+
+# The summary helpers take the name of the category column, which was
+# ``category`` (the name itself) up to migration 6 and ``category_id`` since.
+
+
+def _summary_key(row, category="category"):
+    """SQL matching the monthly_summary key of trigger row ``row`` (NEW/OLD)."""
+    return (f"year = CAST(strftime('%Y', {row}.date) AS INTEGER) "
+            f"AND month = CAST(strftime('%m', {row}.date) AS INTEGER) "
+            f"AND type = {row}.type AND {category} = {row}.{category}")
+
+
+def _summary_add(row, category="category"):
+    return (f"INSERT INTO monthly_summary (year, month, type, {category}, total, count) "
+            f"VALUES (CAST(strftime('%Y', {row}.date) AS INTEGER), "
+            f"CAST(strftime('%m', {row}.date) AS INTEGER), {row}.type, {row}.{category}, {row}.amount, 1) "
+            f"ON CONFLICT (year, month, type, {category}) "
+            f"DO UPDATE SET total = total + excluded.total, count = count + 1;")
+
+
+def _summary_remove(row, category="category"):
+    return (f"UPDATE monthly_summary SET total = total - {row}.amount, count = count - 1 "
+            f"WHERE {_summary_key(row, category)}; "
+            f"DELETE FROM monthly_summary WHERE count <= 0 AND {_summary_key(row, category)};")
+
+
+def _rebuild_summary_sql(category="category"):
+    return [
+        "DELETE FROM monthly_summary",
+        f"INSERT INTO monthly_summary (year, month, type, {category}, total, count) "
+        f"SELECT CAST(strftime('%Y', date) AS INTEGER), CAST(strftime('%m', date) AS INTEGER), "
+        f"type, {category}, SUM(amount), COUNT(*) FROM transactions GROUP BY 1, 2, 3, 4",
+    ]
+
+
+REBUILD_SUMMARY_SQL = _rebuild_summary_sql("category_id")
+
+
+def _search_key(row):
+    """SQL for the transactions_fts rowid of ``row``: its date's day number
+    in the high bits and its id in the low 32, so rowid order is date order."""
+    return f"((CAST(julianday({row}.date) AS INTEGER) << 32) | {row}.id)"
+
+
+def _fts_add(row):
+    return (f"INSERT INTO transactions_fts (rowid, description) "
+            f"VALUES ({_search_key(row)}, {row}.description);")
+
+
+def _fts_remove(row):
+    return (f"INSERT INTO transactions_fts (transactions_fts, rowid, description) "
+            f"VALUES ('delete', {_search_key(row)}, {row}.description);")
+
+
+INDEX_SEARCH_SQL = (f"INSERT INTO transactions_fts (rowid, description) "
+                    f"SELECT {_search_key('transactions')}, description FROM transactions")
+
+REBUILD_SEARCH_SQL = [
+    "INSERT INTO transactions_fts (transactions_fts) VALUES ('delete-all')",
+    INDEX_SEARCH_SQL,
+]
+
+
+def _create_triggers(triggers, create="CREATE TRIGGER", skip=()):
+    """DDL for a dict of trigger name to definition, leaving out the names in ``skip``."""
+    return [f"{create} {name} {definition}" for name, definition in triggers.items() if name not in skip]
+
+
+def _add_column(table, column, ddl):
+    """Migration step adding ``column`` unless create_all already did."""
+    def step(raw):
+        existing = {row[1] for row in raw.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            raw.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+    return step
+
+
+def _rebuild_table(raw, table, ddl, columns, select):
+    """Re-create ``table`` from ``ddl``, filling ``columns`` from ``select``.
+
+    SQLite cannot change a column's type or meaning in place. The old
+    table's indexes and triggers are dropped with it; callers re-create
+    them.
+    """
+    raw.execute(f"CREATE TABLE {table}_new ({ddl})")
+    raw.execute(f"INSERT INTO {table}_new ({columns}) {select}")
+    raw.execute(f"DROP TABLE {table}")
+    # Legacy mode renames without re-checking the triggers of other
+    # tables, which may point at ``table`` while it is missing.
+    raw.execute("PRAGMA legacy_alter_table = ON")
+    raw.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    raw.execute("PRAGMA legacy_alter_table = OFF")
+
+
+def _retype_to_cents(table, column, ddl):
+    """Migration step converting a REAL dollars ``column`` to INTEGER cents.
+
+    ``table`` is rebuilt from ``ddl``; its indexes and triggers are read
+    from sqlite_master first and re-created afterwards. Skipped when the
+    column is INTEGER already.
+    """
+    def step(raw):
+        types = {row[1]: row[2].upper() for row in raw.execute(f"PRAGMA table_info({table})")}
+        if types[column] == "INTEGER":
+            return
+        saved = [sql for (sql,) in raw.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+            "AND sql IS NOT NULL", (table,))]
+        select = ", ".join(f"CAST(ROUND({name} * 100) AS INTEGER)" if name == column else name
+                           for name in types)
+        _rebuild_table(raw, table, ddl, ", ".join(types), f"SELECT {select} FROM {table}")
+        for sql in saved:
+            raw.execute(sql)
+    return step
+
+
+def _seed_categories(raw):
+    raw.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)",
+                    [(name,) for name in DEFAULT_CATEGORIES])
+
+
+def _categories_to_ids(raw):
+    """Migration step replacing category names with categories.id keys."""
+    raw.execute("INSERT OR IGNORE INTO categories (name) "
+                "SELECT DISTINCT category FROM transactions ORDER BY category")
+    _rebuild_table(
+        raw, "transactions", TRANSACTIONS_DDL,
+        "id, date, type, category_id, description, amount, import_hash",
+        "SELECT t.id, t.date, t.type, c.id, t.description, t.amount, t.import_hash "
+        "FROM transactions t JOIN categories c ON c.name = t.category",
+    )
+    _rebuild_table(
+        raw, "monthly_summary", MONTHLY_SUMMARY_DDL,
+        "year, month, type, category_id, total, count",
+        "SELECT s.year, s.month, s.type, c.id, s.total, s.count "
+        "FROM monthly_summary s JOIN categories c ON c.name = s.category",
+    )
+
+
+# Table definitions as of migration 6, matching what create_all makes from
+# the models.
+TRANSACTIONS_DDL = (
+    "id INTEGER NOT NULL, date DATE NOT NULL, type VARCHAR(20) NOT NULL, "
+    "category_id INTEGER NOT NULL, description TEXT, amount INTEGER NOT NULL, "
+    "import_hash INTEGER, PRIMARY KEY (id), FOREIGN KEY(category_id) REFERENCES categories (id)"
+)
+MONTHLY_SUMMARY_DDL = (
+    "year INTEGER NOT NULL, month INTEGER NOT NULL, type VARCHAR(20) NOT NULL, "
+    "category_id INTEGER NOT NULL, total INTEGER NOT NULL, count INTEGER NOT NULL, "
+    "PRIMARY KEY (year, month, type, category_id)"
+)
+
+# Indexes and triggers on transactions as of migration 6. Rebuilding the
+# table drops them, so that migration re-creates them from here, as does
+# SCHEMA for a new database.
+TRANSACTION_INDEXES = [
+    "CREATE INDEX ix_transactions_date_type_category ON transactions (date, type, category_id)",
+    "CREATE UNIQUE INDEX ix_transactions_import_hash ON transactions (import_hash)",
+]
+# Unique keys only bulk import and recurring rules set, as of migration
+# 10. They are partial, so rows that leave a key NULL, like every
+# imported row's recurrence_key, add nothing to that index.
+KEY_INDEXES = [
+    "CREATE UNIQUE INDEX ix_transactions_import_hash ON transactions (import_hash) "
+    "WHERE import_hash IS NOT NULL",
+    "CREATE UNIQUE INDEX ix_transactions_recurrence_key ON transactions (recurrence_key) "
+    "WHERE recurrence_key IS NOT NULL",
+]
+TRANSACTION_TRIGGERS = {
+    "trg_monthly_summary_insert":
+        f"AFTER INSERT ON transactions "
+        f"WHEN NOT EXISTS (SELECT 1 FROM bulk_load_guard) BEGIN {_summary_add('NEW', 'category_id')} END",
+    "trg_monthly_summary_delete":
+        f"AFTER DELETE ON transactions BEGIN {_summary_remove('OLD', 'category_id')} END",
+    "trg_monthly_summary_update":
+        f"AFTER UPDATE OF date, type, category_id, amount ON transactions "
+        f"BEGIN {_summary_remove('OLD', 'category_id')} {_summary_add('NEW', 'category_id')} END",
+    "trg_transactions_fts_insert":
+        f"AFTER INSERT ON transactions "
+        f"WHEN NOT EXISTS (SELECT 1 FROM bulk_load_guard) BEGIN {_fts_add('NEW')} END",
+    "trg_transactions_fts_delete":
+        f"AFTER DELETE ON transactions BEGIN {_fts_remove('OLD')} END",
+    "trg_transactions_fts_update":
+        f"AFTER UPDATE OF date, description ON transactions "
+        f"BEGIN {_fts_remove('OLD')} {_fts_add('NEW')} END",
+}
+
+# Every change to transactions is logged as a range of ids, so a window
+# open on the ledger can re-read just those rows when another connection
+# commits; see budgetwise.changes. Per-row writes log their own id, and
+# bulk writers, which suspend the insert trigger, log everything they
+# wrote as one range with LOG_WRITTEN_SQL.
+CHANGE_LOG_TABLE = ("CREATE TABLE IF NOT EXISTS transaction_log (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                    "first_id INTEGER NOT NULL, last_id INTEGER NOT NULL)")
+CHANGE_LOG_TRIGGERS = {
+    "trg_transaction_log_insert":
+        "AFTER INSERT ON transactions WHEN NOT EXISTS (SELECT 1 FROM bulk_load_guard) "
+        "BEGIN INSERT INTO transaction_log (first_id, last_id) VALUES (NEW.id, NEW.id); END",
+    "trg_transaction_log_update":
+        "AFTER UPDATE ON transactions "
+        "BEGIN INSERT INTO transaction_log (first_id, last_id) VALUES (NEW.id, NEW.id); END",
+    "trg_transaction_log_delete":
+        "AFTER DELETE ON transactions "
+        "BEGIN INSERT INTO transaction_log (first_id, last_id) VALUES (OLD.id, OLD.id); END",
+}
+# As of migration 10, one trigger does all of an inserted row's upkeep
+# in place of the three above, so the bulk_load_guard check and the
+# trigger call happen once per row.
+INSERT_TRIGGER_NAME = "trg_transactions_insert"
+INSERT_TRIGGER = (
+    f"CREATE TRIGGER {INSERT_TRIGGER_NAME} AFTER INSERT ON transactions "
+    f"WHEN NOT EXISTS (SELECT 1 FROM bulk_load_guard) "
+    f"BEGIN {_summary_add('NEW', 'category_id')} {_fts_add('NEW')} "
+    f"INSERT INTO transaction_log (first_id, last_id) VALUES (NEW.id, NEW.id); END"
+)
+_SPLIT_INSERT_TRIGGERS = ("trg_monthly_summary_insert", "trg_transactions_fts_insert",
+                          "trg_transaction_log_insert")
+# As of migration 11 the log also notes, with a table_name, each change
+# to the other tables a window shows, so it reloads only what changed.
+# Their entries carry no ids.
+LOGGED_TABLES = ("categories", "settings", "budgets", "recurring_rules")
+LOG_TABLE_NAME = _add_column("transaction_log", "table_name", "TEXT NOT NULL DEFAULT 'transactions'")
+TABLE_LOG_TRIGGERS = {
+    f"trg_{table}_log_{event.lower()}":
+        f"AFTER {event} ON {table} "
+        f"BEGIN INSERT INTO transaction_log (first_id, last_id, table_name) VALUES (0, 0, '{table}'); END"
+    for table in LOGGED_TABLES for event in ("INSERT", "UPDATE", "DELETE")
+}
+LOG_WRITTEN_SQL = (
+    "INSERT INTO transaction_log (first_id, last_id) SELECT first_id, last_id FROM "
+    "(SELECT MIN(id) AS first_id, MAX(id) AS last_id FROM transactions WHERE id > ?) "
+    "WHERE first_id IS NOT NULL"
+)
+
+# As of migration 12 the search index records only which rows hold a
+# word, not where: search asks for no phrases, NEAR or ranking, and the
+# index is cheaper to write.
+SEARCH_TABLE = ("CREATE VIRTUAL TABLE transactions_fts USING fts5(description, content='', "
+                "detail=none, columnsize=0, tokenize='unicode61 remove_diacritics 2')")
+
+# Everything a new database needs besides the tables create_all makes.
+SCHEMA = [
+    "CREATE TABLE bulk_load_guard (id INTEGER PRIMARY KEY)",
+    SEARCH_TABLE,
+    TRANSACTION_INDEXES[0],
+    *KEY_INDEXES,
+    CHANGE_LOG_TABLE,
+    LOG_TABLE_NAME,
+    *_create_triggers(TRANSACTION_TRIGGERS, skip=_SPLIT_INSERT_TRIGGERS),
+    *_create_triggers(CHANGE_LOG_TRIGGERS, "CREATE TRIGGER IF NOT EXISTS", skip=_SPLIT_INSERT_TRIGGERS),
+    INSERT_TRIGGER,
+    *_create_triggers(TABLE_LOG_TRIGGERS),
+    _seed_categories,
+]
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Append new steps; never edit or reorder existing ones.
+MIGRATIONS = [
+    # 1: month-window dashboard queries filter on date, then type/category.
+    ["CREATE INDEX IF NOT EXISTS ix_transactions_date_type_category "
+     "ON transactions (date, type, category)"],
+    # 2: keep monthly_summary in step with transactions inside the writing
+    # transaction, whichever code path does the write.
+    ["CREATE TABLE IF NOT EXISTS monthly_summary (year INTEGER NOT NULL, month INTEGER NOT NULL, "
+     "type VARCHAR(20) NOT NULL, category VARCHAR(50) NOT NULL, total FLOAT NOT NULL, "
+     "count INTEGER NOT NULL, PRIMARY KEY (year, month, type, category))",
+     f"CREATE TRIGGER IF NOT EXISTS trg_monthly_summary_insert AFTER INSERT ON transactions "
+     f"BEGIN {_summary_add('NEW')} END",
+     f"CREATE TRIGGER IF NOT EXISTS trg_monthly_summary_delete AFTER DELETE ON transactions "
+     f"BEGIN {_summary_remove('OLD')} END",
+     f"CREATE TRIGGER IF NOT EXISTS trg_monthly_summary_update "
+     f"AFTER UPDATE OF date, type, category, amount ON transactions "
+     f"BEGIN {_summary_remove('OLD')} {_summary_add('NEW')} END",
+     *_rebuild_summary_sql()],
+    # 3: bulk import dedupes on a content hash, and may suspend the
+    # per-row summary trigger by holding a bulk_load_guard row inside its
+    # own transaction while it updates monthly_summary per chunk instead.
+    [_add_column("transactions", "import_hash", "INTEGER"),
+     "CREATE UNIQUE INDEX IF NOT EXISTS ix_transactions_import_hash ON transactions (import_hash)",
+     "CREATE TABLE IF NOT EXISTS bulk_load_guard (id INTEGER PRIMARY KEY)",
+     "DROP TRIGGER IF EXISTS trg_monthly_summary_insert",
+     f"CREATE TRIGGER trg_monthly_summary_insert AFTER INSERT ON transactions "
+     f"WHEN NOT EXISTS (SELECT 1 FROM bulk_load_guard) BEGIN {_summary_add('NEW')} END"],
+    # 4: full-text search over descriptions. transactions_fts is a
+    # contentless FTS5 index keyed by _search_key, so matches come out
+    # newest first and a date range is a rowid range; triggers keep it in
+    # step, and bulk import indexes each chunk in one statement.
+    ["CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+     "description, content='', tokenize='unicode61 remove_diacritics 2')",
+     f"CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert AFTER INSERT ON transactions "
+     f"WHEN NOT EXISTS (SELECT 1 FROM bulk_load_guard) BEGIN {_fts_add('NEW')} END",
+     f"CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete AFTER DELETE ON transactions "
+     f"BEGIN {_fts_remove('OLD')} END",
+     f"CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update "
+     f"AFTER UPDATE OF date, description ON transactions "
+     f"BEGIN {_fts_remove('OLD')} {_fts_add('NEW')} END",
+     *REBUILD_SEARCH_SQL],
+    # 5: amounts are integer cents, so sums are exact; the ids, and with
+    # them the search index, are unchanged.
+    [_retype_to_cents("transactions", "amount",
+                      "id INTEGER NOT NULL, date DATE NOT NULL, type VARCHAR(20) NOT NULL, "
+                      "category VARCHAR(50) NOT NULL, description TEXT, amount INTEGER NOT NULL, "
+                      "import_hash INTEGER, PRIMARY KEY (id)"),
+     _retype_to_cents("monthly_summary", "total",
+                      "year INTEGER NOT NULL, month INTEGER NOT NULL, type VARCHAR(20) NOT NULL, "
+                      "category VARCHAR(50) NOT NULL, total INTEGER NOT NULL, count INTEGER NOT NULL, "
+                      "PRIMARY KEY (year, month, type, category)")],
+    # 6: categories live in their own table, user-editable, and rows refer
+    # to them by id; monthly_summary is keyed by the id too.
+    ["CREATE TABLE IF NOT EXISTS categories (id INTEGER NOT NULL, name VARCHAR(50) NOT NULL, "
+     "PRIMARY KEY (id), UNIQUE (name))",
+     _seed_categories,
+     _categories_to_ids,
+     *TRANSACTION_INDEXES,
+     *_create_triggers(TRANSACTION_TRIGGERS)],
+    # 7: recurring rules. Each transaction a rule writes carries a unique
+    # recurrence_key, so catching up twice writes an occurrence once.
+    ["CREATE TABLE IF NOT EXISTS recurring_rules (id INTEGER NOT NULL, description TEXT, "
+     "type VARCHAR(20) NOT NULL, category_id INTEGER NOT NULL, amount INTEGER NOT NULL, "
+     "frequency VARCHAR(10) NOT NULL, interval INTEGER NOT NULL, start DATE NOT NULL, "
+     "until DATE, next_due DATE, PRIMARY KEY (id), "
+     "FOREIGN KEY(category_id) REFERENCES categories (id))",
+     _add_column("transactions", "recurrence_key", "INTEGER"),
+     "CREATE UNIQUE INDEX IF NOT EXISTS ix_transactions_recurrence_key ON transactions (recurrence_key)"],
+    # 8: monthly budget envelopes, at most one per category.
+    ["CREATE TABLE IF NOT EXISTS budgets (id INTEGER NOT NULL, category_id INTEGER NOT NULL, "
+     "amount INTEGER NOT NULL, rollover VARCHAR(10) NOT NULL, start DATE NOT NULL, "
+     "PRIMARY KEY (id), UNIQUE (category_id), FOREIGN KEY(category_id) REFERENCES categories (id))"],
+    # 9: the change log other windows and processes follow the ledger by.
+    [CHANGE_LOG_TABLE,
+     *_create_triggers(CHANGE_LOG_TRIGGERS, "CREATE TRIGGER IF NOT EXISTS")],
+    # 10: less upkeep per inserted row, for bulk import: the import_hash
+    # and recurrence_key indexes skip NULL keys, and one insert trigger
+    # replaces three.
+    ["DROP INDEX IF EXISTS ix_transactions_import_hash",
+     "DROP INDEX IF EXISTS ix_transactions_recurrence_key",
+     *KEY_INDEXES,
+     *(f"DROP TRIGGER IF EXISTS {name}" for name in _SPLIT_INSERT_TRIGGERS),
+     INSERT_TRIGGER],
+    # 11: changes to categories, settings, budgets and rules are logged
+    # too, by table, so windows reload those only when they changed.
+    [LOG_TABLE_NAME,
+     *_create_triggers(TABLE_LOG_TRIGGERS)],
+    # 12: a leaner search index, rebuilt from the ledger.
+    ["DROP TABLE IF EXISTS transactions_fts",
+     SEARCH_TABLE,
+     INDEX_SEARCH_SQL],
+]
+
+
+def migrate_schema(bind):
+    """Create a new database, or apply migrations newer than its user_version.
+
+    A step is a list of SQL strings or callables taking the DBAPI
+    connection. Steps only ever run against databases written by an
+    earlier version, never one create_all just made from the current
+    models.
+    """
+    from .models import Base
+
+    with bind.begin() as conn:
+        raw = conn.connection.driver_connection
+        current = raw.execute("PRAGMA user_version").fetchone()[0]
+        if current == 0 and not raw.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions'").fetchone():
+            Base.metadata.create_all(bind=conn)
+            _apply(raw, SCHEMA)
+            raw.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+            return
+        for version, statements in enumerate(MIGRATIONS[current:], start=current + 1):
+            _apply(raw, statements)
+            raw.execute(f"PRAGMA user_version = {version}")
+
+
+def _apply(raw, statements):
+    for sql in statements:
+        if callable(sql):
+            sql(raw)
+        else:
+            raw.execute(sql)
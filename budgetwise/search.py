@@ -0,0 +1,133 @@
+"""Full-text search over descriptions, combined with facet filters."""
+import re
+from collections import namedtuple
+
+import pandas as pd
+
+from . import diagnostics
+from .categories import read_categories
+from .db import get_engine
+from .ledger import TRANSACTION_COLUMNS, TRANSACTION_SELECT, _as_date, transactions_frame
+
+SearchPage = namedtuple("SearchPage", "rows total capped offset limit")
+
+# Letters and digits only: the index tokenizer splits at underscores too,
+# and a quoted word that it split in two would be a phrase, which the
+# index (detail=none) cannot match.
+_WORD = re.compile(r"[^\W_]+")
+_JULIAN_DAY = 1_721_424  # date.toordinal() + this = CAST(julianday(date) AS INTEGER)
+_ID_MASK = (1 << 32) - 1
+
+
+def match_query(text):
+    """FTS5 query requiring every word of ``text``.
+
+    The last word matches as a prefix, so results keep up while a word is
+    being typed; whole words are exact terms, which FTS5 resolves much
+    faster. Words are quoted, so punctuation and FTS operators typed by
+    the user are matched literally. Returns None when ``text`` has no
+    words.
+    """
+    words = [f'"{word}"' for word in _WORD.findall(text or "")]
+    if not words:
+        return None
+    words[-1] += "*"
+    return " ".join(words)
+
+
+@diagnostics.timed("search_transactions")
+def search_transactions(text=None, types=None, categories=None, min_amount=None, max_amount=None,
+                        start=None, end=None, offset=0, limit=200, count_limit=10_000):
+    """Return one page of matching transactions, newest first.
+
+    ``text`` is matched against descriptions through the transactions_fts
+    index; the other filters narrow by type, category, an inclusive range
+    of amounts in cents and a half-open [start, end) date range. ``rows`` is a DataFrame
+    shaped like load_transactions_frame's.
+
+    Text matches are read from the index in date order and the scan stops
+    once the page is full, so a common word costs no more than a rare one.
+    ``total`` counts matches up to ``count_limit`` (``capped`` is true when
+    there are more); pass ``count_limit=None`` for an exact count, or 0 to
+    skip counting.
+    """
+    source, where, params, order = _filters(text, types, categories, min_amount, max_amount,
+                                            start, end)
+    sql = f"SELECT {TRANSACTION_SELECT} FROM {source}{where} ORDER BY {order} LIMIT ? OFFSET ?"
+    with get_engine().connect() as conn:
+        raw = conn.connection.driver_connection
+        rows = raw.execute(sql, params + [limit, offset]).fetchall()
+        categories = read_categories(raw)
+        if count_limit == 0:
+            total = None
+        elif offset == 0 and len(rows) < limit:
+            total = len(rows)
+        elif count_limit is None:
+            total = raw.execute(f"SELECT COUNT(*) FROM {source}{where}", params).fetchone()[0]
+        else:
+            total = raw.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM {source}{where} LIMIT ?)",
+                                params + [count_limit + 1]).fetchone()[0]
+    capped = count_limit is not None and total is not None and total > count_limit
+    if capped:
+        total = count_limit
+    if rows:
+        frame = transactions_frame({col: [values] for col, values in zip(TRANSACTION_COLUMNS, zip(*rows))},
+                                   categories)
+    else:
+        frame = pd.DataFrame(columns=TRANSACTION_COLUMNS)
+    return SearchPage(frame, total, capped, offset, limit)
+
+
+@diagnostics.timed("search_facets")
+def search_facets(text=None, types=None, categories=None, min_amount=None, max_amount=None,
+                  start=None, end=None):
+    """Match count and amount total in cents per (type, category) for a search."""
+    source, where, params, _ = _filters(text, types, categories, min_amount, max_amount, start, end)
+    sql = (f"SELECT t.type, c.name, COUNT(*), SUM(t.amount) "
+           f"FROM {source} JOIN categories c ON c.id = t.category_id{where} "
+           f"GROUP BY t.type, t.category_id ORDER BY t.type, c.name")
+    with get_engine().connect() as conn:
+        rows = conn.connection.driver_connection.execute(sql, params).fetchall()
+    return pd.DataFrame(rows, columns=["type", "category", "count", "total"])
+
+
+def _filters(text, types, categories, min_amount, max_amount, start, end):
+    """FROM clause, WHERE clause, parameters and ORDER BY for a search."""
+    query = match_query(text)
+    where, params = [], []
+    if query:
+        # transactions_fts drives the join in rowid order, which is
+        # (date, id) order; a date range becomes a rowid range on it.
+        source = f"transactions_fts CROSS JOIN transactions t ON t.id = (transactions_fts.rowid & {_ID_MASK})"
+        order = "transactions_fts.rowid DESC"
+        where.append("transactions_fts MATCH ?")
+        params.append(query)
+        if start is not None:
+            where.append("transactions_fts.rowid >= ?")
+            params.append((_as_date(start).toordinal() + _JULIAN_DAY) << 32)
+        if end is not None:
+            where.append("transactions_fts.rowid < ?")
+            params.append((_as_date(end).toordinal() + _JULIAN_DAY) << 32)
+    else:
+        source = "transactions t"
+        order = "t.date DESC, t.id DESC"
+        if start is not None:
+            where.append("t.date >= ?")
+            params.append(_as_date(start).isoformat())
+        if end is not None:
+            where.append("t.date < ?")
+            params.append(_as_date(end).isoformat())
+    if types:
+        where.append(f"t.type IN ({', '.join('?' * len(types))})")
+        params.extend(types)
+    if categories:
+        where.append(f"t.category_id IN (SELECT id FROM categories WHERE name IN "
+                     f"({', '.join('?' * len(categories))}))")
+        params.extend(categories)
+    if min_amount is not None:
+        where.append("t.amount >= ?")
+        params.append(min_amount)
+    if max_amount is not None:
+        where.append("t.amount <= ?")
+        params.append(max_amount)
+    return source, (" WHERE " + " AND ".join(where)) if where else "", params, order
@@ -0,0 +1,161 @@
+"""Background execution of database work for the GUI."""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from .db import get_engine, session_scope
+
+
+class TaskRunner:
+    """Runs blocking work off the Tk main thread and hands results back to it.
+
+    Reads go to a small thread pool. Writes are serialized on one writer
+    thread that owns a dedicated SQLite connection, each wrapped in its own
+    session and committed (or rolled back) by the runner. Completion
+    callbacks are queued and drained on the main thread by a
+    ``master.after`` poll that only runs while work is in flight. Errors
+    without their own ``on_error`` go to the runner's ``on_error``, or are
+    re-raised in the poll when there is none. ``on_busy`` is told when
+    work the user waits on starts and when the last of it is done.
+    """
+
+    def __init__(self, master, readers=2, on_busy=None, on_error=None, poll_ms=30):
+        self.master = master
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="budgetwise-read")
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="budgetwise-write",
+                                          initializer=self._open_writer)
+        self._writer_conn = None
+        self._done = queue.SimpleQueue()
+        self._calls = queue.SimpleQueue()
+        self._pending = 0
+        self._busy = 0
+        self._polling = False
+        self._latest = {}
+        self._coalesced = {}
+        self._queued = set()  # reader futures not yet finished, for shutdown to cancel
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None, busy=True):
+        """Run ``fn(*args)`` on a reader thread.
+
+        When ``key`` is given, only the newest submission under that key
+        delivers its result; older ones still running are dropped. Work
+        submitted with ``busy=False``, like a periodic poll, does not
+        count as busy.
+        """
+        future = self._readers.submit(fn, *args)
+        self._queued.add(future)
+        future.add_done_callback(self._queued.discard)
+        if key is not None:
+            self._latest[key] = future
+        return self._track(future, on_done, on_error, key, busy)
+
+    def write(self, fn, on_done=None, on_error=None):
+        """Run ``fn(session)`` on the writer thread and commit its work."""
+        return self._track(self._writer.submit(self._run_write, fn), on_done, on_error, None)
+
+    def write_raw(self, fn, *args, on_done=None, on_error=None):
+        """Run ``fn(*args)`` on the writer thread, outside a session.
+
+        For bulk writers such as import_transactions and run_due_rules
+        that open their own connection and transactions: on the writer
+        thread that is the writer's connection, and they queue with the
+        other writes instead of contending for SQLite's write lock.
+        """
+        return self._track(self._writer.submit(fn, *args), on_done, on_error, None)
+
+    def post(self, fn, *args):
+        """From a worker thread, call ``fn(*args)`` on the main thread.
+
+        Delivered by the same poll as results, so only while a task is pending.
+        """
+        self._calls.put((fn, args))
+
+    def coalesce(self, key, fn, delay_ms=50):
+        """Call ``fn`` once on the main thread after a burst of requests."""
+        if key not in self._coalesced:
+            self._coalesced[key] = self.master.after(delay_ms, self._fire, key, fn)
+
+    def shutdown(self):
+        """Finish queued writes, then stop both pools."""
+        for after_id in self._coalesced.values():
+            self.master.after_cancel(after_id)
+        self._coalesced.clear()
+        # cancel_futures needs Python 3.9; cancelling by hand stops the same
+        # reads, those not yet started.
+        for future in list(self._queued):
+            future.cancel()
+        self._readers.shutdown(wait=False)
+        self._writer.submit(self._close_writer)
+        self._writer.shutdown(wait=True)
+
+    def _open_writer(self):
+        self._writer_conn = get_engine().connect()
+
+    def _close_writer(self):
+        if self._writer_conn is not None:
+            self._writer_conn.close()
+            self._writer_conn = None
+
+    def _run_write(self, fn):
+        with session_scope(self._writer_conn) as s:
+            return fn(s)
+
+    def _track(self, future, on_done, on_error, key, busy=True):
+        self._pending += 1
+        if busy:
+            self._busy += 1
+            if self._busy == 1 and self.on_busy:
+                self.on_busy(True)
+        future.add_done_callback(lambda f: self._done.put((f, on_done, on_error, key, busy)))
+        if not self._polling:
+            self._polling = True
+            self.master.after(self.poll_ms, self._drain)
+        return future
+
+    def _drain(self):
+        was_busy = self._busy
+        try:
+            self._deliver()
+        finally:
+            # Keep polling even if a callback raised, so later results still land.
+            if self._pending:
+                self.master.after(self.poll_ms, self._drain)
+            else:
+                self._polling = False
+            if was_busy and not self._busy and self.on_busy:
+                self.on_busy(False)
+
+    def _deliver(self):
+        while True:
+            try:
+                fn, args = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            fn(*args)
+        while True:
+            try:
+                future, on_done, on_error, key, busy = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            self._busy -= busy
+            if key is not None:
+                if self._latest.get(key) is not future:
+                    continue
+                del self._latest[key]
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                handler = on_error or self.on_error
+                if handler is None:
+                    raise error
+                handler(error)
+            elif on_done:
+                on_done(future.result())
+
+    def _fire(self, key, fn):
+        del self._coalesced[key]
+        fn()